@@ -0,0 +1,100 @@
+"""Fan out updates to simulated websocket clients and report delivery rate
+
+Every client subscribes to a few of the topics (some to all of them); a
+small share are slow consumers whose every send takes ``SLOW_SEND`` seconds.
+The engine run publishes all messages and waits until the fast clients have
+drained their queues. The sequential baseline awaits each client's send in
+turn, as ``broadcast_update`` used to, for a handful of messages only
+(the slow clients make it far too slow for more).
+
+Usage: python benchmarks/bench_broadcast.py [clients] [messages]
+"""
+import os
+import sys
+import time
+import json
+import asyncio
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.connectivity.broadcast import BroadcastEngine
+
+TOPICS = [f"table:{i}" for i in range(50)]
+SLOW_SHARE = 0.01
+SLOW_SEND = 0.05
+
+class Client:
+    def __init__(self, slow):
+        self.slow = slow
+        self.received = 0
+
+    async def send(self, payload):
+        if self.slow:
+            await asyncio.sleep(SLOW_SEND)
+        self.received += 1
+
+def make_clients(count, rng):
+    clients = []
+    for i in range(count):
+        client = Client(rng.random() < SLOW_SHARE)
+        topics = ["*"] if rng.random() < 0.05 else list(rng.choice(TOPICS, 3, replace=False))
+        clients.append((f"client-{i}", client, topics))
+    return clients
+
+def message(topic, i):
+    return {"type": "spin", "timestamp": time.time(), "data": {"table": topic, "number": i % 37}}
+
+async def run_engine(clients, messages, rng):
+    engine = BroadcastEngine(max_queue=64, send_timeout=None)
+    for connection_id, client, topics in clients:
+        engine.add(connection_id, client.send)
+        engine.subscribe(connection_id, topics)
+
+    fast = [client for _, client, _ in clients if not client.slow]
+    topics = rng.choice(TOPICS, messages)
+    expected = 0
+    started = time.perf_counter()
+    for i, topic in enumerate(topics):
+        expected += engine.publish(topic, message(topic, i))
+        if i % 10 == 0:
+            await asyncio.sleep(0)  # Let writers run, as a live publisher would
+    publish_seconds = time.perf_counter() - started
+    while any(engine.subscribers[cid].queue for cid, c, _ in clients if not c.slow):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+    stats = engine.stats()
+    await engine.close()
+    delivered = sum(client.received for client in fast)
+    return publish_seconds, elapsed, delivered, stats
+
+async def run_sequential(clients, messages, rng):
+    subscriptions = {cid: set(topics) for cid, _, topics in clients}
+    delivered = 0
+    started = time.perf_counter()
+    for i, topic in enumerate(rng.choice(TOPICS, messages)):
+        for connection_id, client, _ in clients:
+            if topic in subscriptions[connection_id] or "*" in subscriptions[connection_id]:
+                await client.send(json.dumps(message(topic, i)))
+                delivered += 1
+    return time.perf_counter() - started, delivered
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = np.random.default_rng(0)
+
+    clients = make_clients(count, rng)
+    slow = sum(client.slow for _, client, _ in clients)
+    publish_seconds, elapsed, delivered, stats = asyncio.run(run_engine(clients, messages, rng))
+    print(f"engine      {count} clients ({slow} slow), {messages} messages")
+    print(f"            publish {messages / publish_seconds:9.0f} msg/s   "
+          f"delivered {delivered / elapsed:9.0f} msg/s to fast clients ({elapsed:.2f}s)")
+    print(f"            slow clients: {stats['dropped']} dropped, {stats['queued']} still queued")
+
+    clients = make_clients(count, np.random.default_rng(0))
+    seconds, delivered = asyncio.run(run_sequential(clients, 5, rng))
+    print(f"sequential  5 messages in {seconds:.2f}s   delivered {delivered / seconds:9.0f} msg/s")
+
+if __name__ == "__main__":
+    main()
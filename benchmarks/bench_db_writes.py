@@ -0,0 +1,63 @@
+"""Benchmark DatabaseManager write throughput at different batch sizes
+
+Usage: python benchmarks/bench_db_writes.py
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database import DatabaseManager
+
+BATCH_SIZES = [1, 100, 10000]
+TOTAL_ROWS = 20000
+ROW_LIMIT_UNBATCHED = 2000  # Per-row commits are slow; keep this pass short
+
+def make_rows(count, offset=0):
+    return [
+        {
+            'url': 'roulette_spins',
+            'title': f'Spin {offset + i}',
+            'content': {'number': (offset + i) % 37}
+        }
+        for i in range(count)
+    ]
+
+def bench_save_per_row(db):
+    rows = make_rows(ROW_LIMIT_UNBATCHED)
+    start = time.perf_counter()
+    for row in rows:
+        db.save_website_data(**row)
+    return len(rows) / (time.perf_counter() - start)
+
+def bench_append_many(db, batch_size):
+    total = min(TOTAL_ROWS, ROW_LIMIT_UNBATCHED) if batch_size == 1 else TOTAL_ROWS
+    start = time.perf_counter()
+    for offset in range(0, total, batch_size):
+        db.append_many('website_data', make_rows(batch_size, offset))
+    return total / (time.perf_counter() - start)
+
+def bench_flusher(db, max_rows=1000):
+    db.start_flusher(max_rows=max_rows, max_interval=0.05)
+    start = time.perf_counter()
+    for row in make_rows(TOTAL_ROWS):
+        db.save_website_data(**row)
+    db.stop_flusher()
+    return TOTAL_ROWS / (time.perf_counter() - start)
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        
+        print(f"{'mode':<28}{'rows/sec':>12}")
+        print(f"{'save_website_data (per row)':<28}{bench_save_per_row(db):>12,.0f}")
+        for batch_size in BATCH_SIZES:
+            rate = bench_append_many(db, batch_size)
+            print(f"{f'append_many x{batch_size}':<28}{rate:>12,.0f}")
+        print(f"{'background flusher':<28}{bench_flusher(db):>12,.0f}")
+        db.engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Load-generate the micro-batcher and report latency percentiles and batch sizes
+
+The model stands in for the ensemble: a fixed per-call overhead (the cost of
+a Keras/XGBoost call regardless of batch size) plus a small per-row matmul.
+
+Usage: python benchmarks/bench_micro_batching.py [clients] [requests_per_client]
+"""
+import os
+import sys
+import time
+import asyncio
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ml.batching import MicroBatcher
+
+CALL_OVERHEAD = 0.002  # Seconds per model call
+FEATURES = 15
+WEIGHTS = np.random.default_rng(0).random((FEATURES, 37)).astype(np.float32)
+
+def model(X):
+    time.sleep(CALL_OVERHEAD)
+    logits = X @ WEIGHTS
+    return list(np.argmax(logits, axis=1))
+
+async def client(batcher, requests, rng):
+    for _ in range(requests):
+        await batcher.predict(rng.random(FEATURES, dtype=np.float32))
+        await asyncio.sleep(rng.exponential(0.001))
+
+async def run(clients, requests, max_batch_size, max_latency_ms):
+    batcher = MicroBatcher(model, max_batch_size=max_batch_size, max_latency_ms=max_latency_ms)
+    rng = np.random.default_rng(1)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(batcher, requests, rng) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    await batcher.stop()
+    return batcher.stats(), clients * requests / elapsed
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    for label, batch_size, latency_ms in (("unbatched", 1, 0.0), ("batched 5ms", 64, 5.0)):
+        stats, throughput = asyncio.run(run(clients, requests, batch_size, latency_ms))
+        print(f"{label:12s} {throughput:9.0f} req/s  p50 {stats['p50_ms']:7.2f} ms  "
+              f"p99 {stats['p99_ms']:7.2f} ms  mean batch {stats['mean_batch_size']:.1f}")
+        histogram = stats['batch_size_histogram']
+        buckets = {}
+        for size, count in histogram.items():
+            bucket = 1 << (size - 1).bit_length()
+            buckets[bucket] = buckets.get(bucket, 0) + count
+        print("             batch sizes (<= n): " +
+              ", ".join(f"{bucket}: {count}" for bucket, count in sorted(buckets.items())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Compare startup, latency and memory of the NumPy runtime with the framework path
+
+Each backend runs in a fresh interpreter so import time and resident memory
+are measured from a clean process. Two nets are covered:
+
+- ``lstm``: PredictionAgent's Keras LSTM(128) -> LSTM(64) -> Dense(32) -> Dense(37)
+- ``memory``: GameMemoryAnalyzer's torch LSTM x2 -> attention -> Dense(64) -> Dense(37)
+
+When TensorFlow/Torch are installed the trained-shape framework model is
+built, exported with ``src.ml.export`` and both paths are timed (and their
+outputs compared); otherwise only the NumPy path runs, on random weights.
+
+Usage: python benchmarks/bench_numpy_runtime.py [iterations]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+import importlib.util
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FEATURES = 15
+
+def _random_lstm(rng):
+    from src.ml.runtime import NumpyModel
+    shapes = [(FEATURES, 128), (128, 64)]
+    layers = [{'type': 'lstm', 'return_sequences': True}, {'type': 'lstm'}]
+    weights = [{
+        'kernel': rng.normal(0, 0.1, (n_in, 4 * n)),
+        'recurrent_kernel': rng.normal(0, 0.1, (n, 4 * n)),
+        'bias': np.zeros(4 * n)
+    } for n_in, n in shapes]
+    layers += [{'type': 'dense', 'activation': 'relu'}, {'type': 'dense', 'activation': 'softmax'}]
+    weights += [{'kernel': rng.normal(0, 0.1, (64, 32)), 'bias': np.zeros(32)},
+                {'kernel': rng.normal(0, 0.1, (32, 37)), 'bias': np.zeros(37)}]
+    return NumpyModel(layers, weights)
+
+def _random_memory(rng):
+    from src.ml.runtime import NumpyModel
+    layers = [{'type': 'lstm', 'return_sequences': True}, {'type': 'lstm', 'return_sequences': True},
+              {'type': 'attention', 'num_heads': 4, 'batch_first': False},
+              {'type': 'dense', 'activation': 'relu'}, {'type': 'dense'}]
+    weights = [
+        {'kernel': rng.normal(0, 0.1, (37, 512)), 'recurrent_kernel': rng.normal(0, 0.1, (128, 512)),
+         'bias': np.zeros(512)},
+        {'kernel': rng.normal(0, 0.1, (128, 512)), 'recurrent_kernel': rng.normal(0, 0.1, (128, 512)),
+         'bias': np.zeros(512)},
+        {'in_kernel': rng.normal(0, 0.1, (128, 384)), 'in_bias': np.zeros(384),
+         'out_kernel': rng.normal(0, 0.1, (128, 128)), 'out_bias': np.zeros(128)},
+        {'kernel': rng.normal(0, 0.1, (128, 64)), 'bias': np.zeros(64)},
+        {'kernel': rng.normal(0, 0.1, (64, 37)), 'bias': np.zeros(37)}
+    ]
+    return NumpyModel(layers, weights)
+
+def prepare(workdir):
+    """Write every model artifact; returns {net: {backend: path}}"""
+    from src.ml.export import export_model
+    rng = np.random.default_rng(0)
+    artifacts = {'lstm': {}, 'memory': {}}
+
+    if importlib.util.find_spec('tensorflow'):
+        from src.prediction.agent import PredictionAgent
+        model = PredictionAgent.create_lstm_model(None, (1, FEATURES))
+        path = os.path.join(workdir, 'lstm.keras')
+        model.save(path)
+        artifacts['lstm']['keras'] = path
+        artifacts['lstm']['numpy'] = str(export_model(model, os.path.join(workdir, 'lstm.npz')))
+    else:
+        path = os.path.join(workdir, 'lstm.npz')
+        _random_lstm(rng).save(path)
+        artifacts['lstm']['numpy'] = path
+
+    if importlib.util.find_spec('torch'):
+        import torch
+        from src.gaming.memory_network import AdvancedMemoryNetwork
+        network = AdvancedMemoryNetwork(input_size=37).eval()
+        path = os.path.join(workdir, 'memory.pt')
+        torch.save(network.state_dict(), path)
+        artifacts['memory']['torch'] = path
+        artifacts['memory']['numpy'] = str(export_model(
+            network, os.path.join(workdir, 'memory.npz'),
+            activations=AdvancedMemoryNetwork.EXPORT_ACTIVATIONS))
+    else:
+        path = os.path.join(workdir, 'memory.npz')
+        _random_memory(rng).save(path)
+        artifacts['memory']['numpy'] = path
+    return artifacts
+
+def inputs(net, batch):
+    rng = np.random.default_rng(1)
+    if net == 'lstm':
+        return rng.normal(size=(batch, 1, FEATURES)).astype(np.float32)
+    sequence = np.zeros((1, 50, 37), dtype=np.float32)
+    sequence[0, np.arange(50), rng.integers(0, 37, 50)] = 1
+    return sequence
+
+def child(net, backend, path, iterations):
+    """Runs in a fresh interpreter; prints one JSON line"""
+    import psutil
+    process = psutil.Process()
+    rss_start = process.memory_info().rss
+    started = time.perf_counter()
+
+    if backend == 'numpy':
+        from src.ml.runtime import load_runtime
+        model = load_runtime(path)
+        run = model
+    elif backend == 'keras':
+        import tensorflow as tf
+        model = tf.keras.models.load_model(path)
+        run = lambda X: np.asarray(model(X, training=False))
+    else:
+        import torch
+        from src.gaming.memory_network import AdvancedMemoryNetwork
+        model = AdvancedMemoryNetwork(input_size=37)
+        model.load_state_dict(torch.load(path))
+        model.eval()
+
+        def run(X):
+            with torch.no_grad():
+                return model(torch.from_numpy(X))[0].numpy()
+    load_seconds = time.perf_counter() - started
+
+    results = {'load_ms': load_seconds * 1000}
+    X = inputs(net, 1)
+    started = time.perf_counter()
+    output = run(X)
+    results['first_call_ms'] = (time.perf_counter() - started) * 1000
+    for batch in ((1, 64) if net == 'lstm' else (1,)):
+        X = inputs(net, batch)
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            run(X)
+            timings.append(time.perf_counter() - started)
+        results[f'p50_ms_b{batch}'] = float(np.percentile(timings, 50) * 1000)
+        results[f'p99_ms_b{batch}'] = float(np.percentile(timings, 99) * 1000)
+    results['rss_mb'] = process.memory_info().rss / 2**20
+    results['rss_added_mb'] = (process.memory_info().rss - rss_start) / 2**20
+    results['output'] = np.asarray(output, dtype=np.float64).ravel()[:64].tolist()
+    print(json.dumps(results))
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]))
+        return
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for net, paths in prepare(workdir).items():
+            outputs = {}
+            for backend, path in paths.items():
+                started = time.perf_counter()
+                result = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', net, backend, path,
+                     str(iterations)],
+                    capture_output=True, text=True, cwd=ROOT, check=True
+                )
+                wall = time.perf_counter() - started
+                stats = json.loads(result.stdout.strip().splitlines()[-1])
+                outputs[backend] = np.array(stats.pop('output'))
+                latency = "  ".join(f"{key.replace('_ms_', ' ')} {value:6.3f} ms"
+                                    for key, value in stats.items() if key.startswith('p'))
+                print(f"{net:7s} {backend:6s} process {wall:6.2f}s  load {stats['load_ms']:8.1f} ms  "
+                      f"first {stats['first_call_ms']:7.2f} ms  {latency}  "
+                      f"RSS {stats['rss_mb']:7.1f} MB (+{stats['rss_added_mb']:.1f})")
+            if len(outputs) > 1:
+                reference, exported = outputs.values()
+                print(f"{net:7s} max |framework - numpy| = {np.abs(reference - exported).max():.2e}")
+            else:
+                print(f"{net:7s} framework not installed; NumPy path on random weights only")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Buffer updates while offline, then drain them: JSON status file vs OfflineQueue
+
+- ``json``: the old ``pending_updates`` list in ``sync_status.json``,
+  rewritten after every append and every pop.
+- ``sqlite``: ``OfflineQueue``; one WAL insert per update, drained in
+  batches of ``drain_batch`` (read, then one delete transaction).
+
+Network time is excluded; this is the local cost of buffering and draining
+a backlog of ``updates`` entries.
+
+Usage: python benchmarks/bench_offline_queue.py [updates] [drain_batch]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.connectivity.offline_queue import OfflineQueue
+
+def update(i):
+    return {"type": "bet", "data": {"table": f"table_{i % 20}", "number": i % 37, "amount": 5},
+            "queued_at": "2024-03-03T12:00:00"}
+
+def json_file(root, updates):
+    path = Path(root) / "sync_status.json"
+    status = {"last_sync": {}, "pending_updates": []}
+
+    def save():
+        with open(path, 'w') as f:
+            json.dump(status, f)
+
+    started = time.perf_counter()
+    for i in range(updates):
+        status["pending_updates"].append(update(i))
+        save()
+    buffered = time.perf_counter() - started
+    started = time.perf_counter()
+    while status["pending_updates"]:
+        status["pending_updates"].pop(0)
+        save()
+    return buffered, time.perf_counter() - started
+
+def sqlite_queue(root, updates, drain_batch):
+    queue = OfflineQueue(Path(root) / "offline_queue.db")
+    started = time.perf_counter()
+    for i in range(updates):
+        queue.put(update(i))
+    buffered = time.perf_counter() - started
+    started = time.perf_counter()
+    while True:
+        entries = queue.due(drain_batch)
+        if not entries:
+            break
+        queue.ack(entries)
+    drained = time.perf_counter() - started
+    queue.close()
+    return buffered, drained
+
+def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    drain_batch = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    for name, run in (("json", lambda root: json_file(root, updates)),
+                      ("sqlite", lambda root: sqlite_queue(root, updates, drain_batch))):
+        with tempfile.TemporaryDirectory() as root:
+            buffered, drained = run(root)
+        print(f"{name:7s} {updates} updates  buffer {buffered:7.2f}s ({updates / buffered:9.0f}/s)  "
+              f"drain {drained:7.2f}s ({updates / drained:9.0f}/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Register/sync/status throughput under concurrency: blocking client vs RedisLayer
+
+Each simulated device registers, asks for its status three times and
+pulls one sync batch, with ``concurrency`` devices in flight at once.
+
+- ``blocking``: a synchronous ``redis.Redis`` called straight from the
+  coroutines, as ``RealTimeManager`` used to; every call stalls the loop.
+- ``layer``: ``RedisLayer`` (async pool, cached device metadata).
+
+With ``--url`` both run against that Redis server. Otherwise they share
+an in-process fakeredis server, and every round trip is delayed by
+``--rtt`` milliseconds to stand in for the network (time.sleep for the
+blocking client, asyncio.sleep for the async one; a pipeline counts once).
+
+Usage: python benchmarks/bench_redis_layer.py [--devices N] [--concurrency C] [--rtt MS] [--url URL]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.connectivity.redis_layer import RedisLayer
+
+SYNC_ENTRIES = 200
+
+class DelayedRedis:
+    """Client proxy adding a fixed round-trip time to every command"""
+
+    def __init__(self, client, rtt, asynchronous):
+        self._client = client
+        self._rtt = rtt
+        self._async = asynchronous
+
+    def pipeline(self, *args, **kwargs):
+        pipe = self._client.pipeline(*args, **kwargs)
+        execute = pipe.execute
+        if self._async:
+            async def delayed_execute(*a, **k):
+                await asyncio.sleep(self._rtt)
+                return await execute(*a, **k)
+        else:
+            def delayed_execute(*a, **k):
+                time.sleep(self._rtt)
+                return execute(*a, **k)
+        pipe.execute = delayed_execute
+        return pipe
+
+    def __getattr__(self, name):
+        command = getattr(self._client, name)
+        if self._async:
+            async def delayed(*args, **kwargs):
+                await asyncio.sleep(self._rtt)
+                return await command(*args, **kwargs)
+        else:
+            def delayed(*args, **kwargs):
+                time.sleep(self._rtt)
+                return command(*args, **kwargs)
+        return delayed
+
+def clients(args):
+    if args.url:
+        import redis
+        import redis.asyncio as aioredis
+        return redis.Redis.from_url(args.url), aioredis.Redis.from_url(args.url, max_connections=64)
+    import fakeredis
+    server = fakeredis.FakeServer()
+    rtt = args.rtt / 1000
+    return (DelayedRedis(fakeredis.FakeRedis(server=server), rtt, False),
+            DelayedRedis(fakeredis.aioredis.FakeRedis(server=server), rtt, True))
+
+def device_data(device_id):
+    return {
+        "device_id": device_id,
+        "info": {"device_type": "mobile", "platform": "Android", "version": "1.0.0",
+                 "capabilities": ["basic", "sync", "realtime"]},
+        "registered_at": datetime.now().isoformat(),
+        "last_seen": datetime.now().isoformat()
+    }
+
+async def blocking_device(redis, device_id):
+    data = device_data(device_id)
+    data["info"] = json.dumps(data["info"])
+    redis.hset(f"device:{device_id}", mapping=data)
+    for _ in range(3):
+        redis.hgetall(f"device:{device_id}")
+    redis.zrangebyscore("sync:shared:spins", min=0, max="+inf", start=0, num=100, withscores=True)
+
+async def layer_device(layer, device_id):
+    await layer.put_device(device_id, device_data(device_id))
+    for _ in range(3):
+        await layer.get_device(device_id)
+    await layer.sync_range("shared", "spins", 0, 0, 100)
+
+async def run(worker, target, devices, concurrency, prefix):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await worker(target, f"{prefix}-{i}")
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(devices)))
+    return time.perf_counter() - started
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rtt", type=float, default=0.5, help="simulated round trip, ms")
+    parser.add_argument("--url", help="benchmark a real Redis server instead")
+    args = parser.parse_args()
+
+    blocking, async_client = clients(args)
+    layer = RedisLayer(client=async_client)
+    await layer.add_sync_entries(("shared", "spins", {"number": i % 37, "epoch_ms": i}, float(i))
+                                 for i in range(SYNC_ENTRIES))
+    operations = args.devices * 5
+    for name, worker, target in (("blocking", blocking_device, blocking),
+                                 ("layer", layer_device, layer)):
+        seconds = await run(worker, target, args.devices, args.concurrency, name)
+        print(f"{name:9s} {args.devices} devices x 5 ops in {seconds:6.2f}s  "
+              f"{operations / seconds:9.0f} ops/s")
+    print(f"device cache: {layer.cache.hits} hits, {layer.cache.misses} misses")
+
+if __name__ == "__main__":
+    asyncio.run(main())
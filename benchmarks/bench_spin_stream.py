@@ -0,0 +1,83 @@
+"""Append-to-delivery latency of the spin stream
+
+A collector writes spins to a temporary ``SpinStore`` while ``subscribers``
+async consumers follow ``SpinStream.subscribe``; the time from each append
+returning to each subscriber receiving the spin is recorded.
+
+- ``thread``: the collector is a thread of the serving process, so the
+  store listener wakes subscribers directly.
+- ``process``: the collector is another process; subscribers are woken by
+  the ``poll_interval`` watcher.
+
+The benchmark stores microseconds since the epoch in ``epoch_ms`` so both
+sides can timestamp with ``time.time_ns``.
+
+Usage: python benchmarks/bench_spin_stream.py [subscribers] [spins]
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import threading
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.database.spin_store import SpinStore
+from src.connectivity.spin_stream import SpinStream
+
+INTERVAL = 0.01  # Seconds between spins
+
+def now_us():
+    return time.time_ns() // 1000
+
+def collect(root, spins, tables=4):
+    store = SpinStore(root)
+    for i in range(spins):
+        store.append_many([i % 37], np.array([now_us()]), table=f"table_{i % tables}")
+        time.sleep(INTERVAL)
+
+async def measure(root, mode, subscribers, spins):
+    stream = SpinStream(SpinStore(root), poll_interval=0.005)
+    latencies = []
+
+    async def follow():
+        received = 0
+        async for event in stream.subscribe(offset=0):
+            latencies.append(now_us() - event["epoch_ms"])
+            received += 1
+            if received == spins:
+                return
+
+    tasks = [asyncio.create_task(follow()) for _ in range(subscribers)]
+    await asyncio.sleep(0.1)
+    if mode == "thread":
+        writer = threading.Thread(target=collect, args=(root, spins))
+        writer.start()
+        await asyncio.gather(*tasks)
+        writer.join()
+    else:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__), "--collect", root, str(spins), cwd=ROOT)
+        await asyncio.gather(*tasks)
+        await process.wait()
+    await stream.close()
+    return np.array(latencies) / 1000
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--collect":
+        collect(sys.argv[2], int(sys.argv[3]))
+        return
+    subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    spins = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for mode in ("thread", "process"):
+        with tempfile.TemporaryDirectory() as root:
+            latencies = asyncio.run(measure(root, mode, subscribers, spins))
+        print(f"{mode:8s} {subscribers} subscribers x {spins} spins  "
+              f"p50 {np.percentile(latencies, 50):6.2f} ms  p99 {np.percentile(latencies, 99):6.2f} ms  "
+              f"max {latencies.max():6.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Startup time of the CLI, the API and each subsystem's imports
+
+Reports:
+
+- wall time of ``python src/main.py --help`` (target: under one second)
+- time until the API answers ``GET /`` when started with ``--api-only``
+  (target: under one second)
+- an ``-X importtime`` breakdown per subsystem: cumulative import time of
+  each module in a fresh interpreter and its slowest third-party imports
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+import os
+import sys
+import time
+import subprocess
+import urllib.request
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "src", "main.py")
+TARGET_SECONDS = 1.0
+
+SUBSYSTEMS = (
+    "src.api.server",
+    "src.agents.system_agent",
+    "src.analysis.roulette_analyzer",
+    "src.prediction.agent",
+    "src.ml.ml_manager",
+    "src.gaming.memory_analyzer",
+    "src.database.database",
+    "src.utils.installation_manager"
+)
+
+def time_help(runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, MAIN, "--help"], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def time_api_ready(url="http://127.0.0.1:8000/", timeout=60.0):
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, MAIN, "--api-only"], cwd=ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                error = process.stderr.read().strip().splitlines()
+                raise RuntimeError(error[-1] if error else f"exited with {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=0.5):
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("timed out")
+    finally:
+        process.terminate()
+        process.wait()
+
+def importtime(module):
+    """Cumulative import time of ``module`` and the third-party packages it spent it in (ms)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else f"exited with {result.returncode}")
+    rows = []
+    for line in result.stderr.splitlines():
+        try:
+            own, cumulative, name = line[len("import time:"):].split("|")
+            rows.append((int(own) / 1000, int(cumulative) / 1000, name))
+        except ValueError:
+            continue  # Header or unrelated output
+    # Entries are printed children first; the module's subtree is everything
+    # after the previous top-level (interpreter startup) import
+    end = max(i for i, (_, _, name) in enumerate(rows) if name.strip() == module)
+    start = end
+    while start > 0 and rows[start - 1][2].startswith("  "):
+        start -= 1
+    packages = {}
+    for own, _, name in rows[start:end + 1]:
+        top = name.strip().split(".")[0]
+        if top != "src":
+            packages[top] = packages.get(top, 0.0) + own
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:4]
+    return rows[end][1], slowest
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    timings = time_help(runs)
+    median = float(np.median(timings))
+    print(f"main.py --help   median {median * 1000:7.1f} ms  min {min(timings) * 1000:7.1f} ms  "
+          f"[{'ok' if median < TARGET_SECONDS else 'over target'}]")
+
+    try:
+        ready = time_api_ready()
+        print(f"API ready        {ready * 1000:7.1f} ms  "
+              f"[{'ok' if ready < TARGET_SECONDS else 'over target'}]")
+    except RuntimeError as e:
+        print(f"API ready        not measured: {e}")
+
+    print("\nimport time per subsystem (fresh interpreter, -X importtime)")
+    for module in SUBSYSTEMS:
+        try:
+            total, slowest = importtime(module)
+        except RuntimeError as e:
+            print(f"{module:34s}    failed: {e}")
+            continue
+        detail = ", ".join(f"{name} {ms:.0f}" for name, ms in slowest)
+        print(f"{module:34s} {total:8.1f} ms   {detail}")
+
+if __name__ == "__main__":
+    main()
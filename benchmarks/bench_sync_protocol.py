@@ -0,0 +1,101 @@
+"""Size and cost of catching up a device that was offline for a day
+
+A day of spins from ``TABLES`` tables (one spin every ~45 s per table) is
+synced twice. The legacy path pages through JSON responses of 100 entries,
+one per 5-second ``_sync_loop`` pass. The stream path encodes the same
+entries as frames of 500 rows for every format/compression pair installed
+here; it needs one request per 100k entries. Reported: bytes on the wire,
+server encode and client decode CPU time, and round trips.
+
+Usage: python benchmarks/bench_sync_protocol.py [tables]
+"""
+import os
+import sys
+import json
+import math
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.connectivity.sync_protocol import (available_compressions, available_formats, decode_frame,
+                                            encode_frame, length_prefixed, make_cursor, read_batches)
+
+DAY_MS = 24 * 3600 * 1000
+SPIN_EVERY_MS = 45000
+LEGACY_BATCH = 100
+LEGACY_POLL_SECONDS = 5
+FRAME_BATCH = 500
+STREAM_MAX_ENTRIES = 100000
+
+def make_entries(tables, rng):
+    """(json member, score) pairs as stored in the sync sorted set"""
+    entries = []
+    start = 1_700_000_000_000
+    for table in range(tables):
+        times = start + np.cumsum(rng.integers(SPIN_EVERY_MS - 5000, SPIN_EVERY_MS + 5000,
+                                               DAY_MS // SPIN_EVERY_MS))
+        for epoch_ms in times.tolist():
+            entry = {"number": int(rng.integers(0, 37)), "epoch_ms": epoch_ms,
+                     "table": f"table_{table}", "provider": "evolution"}
+            entries.append((json.dumps(entry), epoch_ms / 1000))
+    entries.sort(key=lambda e: e[1])
+    return entries
+
+def fetcher(entries):
+    scores = np.array([score for _, score in entries])
+
+    def fetch(score, offset, count):
+        first = int(np.searchsorted(scores, score, side='left')) + offset
+        return entries[first:first + count]
+    return fetch
+
+def legacy(entries):
+    wire = 0
+    started = time.perf_counter()
+    for start in range(0, len(entries), LEGACY_BATCH):
+        batch = entries[start:start + LEGACY_BATCH]
+        wire += len(json.dumps({"data": [json.loads(e) for e, _ in batch],
+                                "has_more": len(batch) == LEGACY_BATCH,
+                                "sync_time": "2024-01-01T00:00:00"}))
+    encode = time.perf_counter() - started
+    polls = math.ceil(len(entries) / LEGACY_BATCH)
+    return wire, encode, polls
+
+def stream(entries, fmt, compression):
+    frames = []
+    started = time.perf_counter()
+    cursor = make_cursor(0)
+    requests = 0
+    has_more = True
+    while has_more:
+        requests += 1
+        for members, cursor, has_more in read_batches(fetcher(entries), cursor, FRAME_BATCH,
+                                                      STREAM_MAX_ENTRIES):
+            rows = [json.loads(member) for member in members]
+            frames.append(length_prefixed(encode_frame(rows, cursor, has_more, None, fmt, compression)))
+    encode = time.perf_counter() - started
+
+    started = time.perf_counter()
+    received = sum(len(decode_frame(frame[4:])["data"]) for frame in frames)
+    decode = time.perf_counter() - started
+    assert received == len(entries)
+    return sum(len(frame) for frame in frames), encode, decode, requests
+
+def main():
+    tables = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    entries = make_entries(tables, np.random.default_rng(0))
+    print(f"{len(entries)} entries ({tables} tables, one day)")
+
+    wire, encode, polls = legacy(entries)
+    print(f"{'legacy json':18s} {wire / 1024:9.1f} KiB  encode {encode * 1000:7.1f} ms  "
+          f"{polls} polls = {polls * LEGACY_POLL_SECONDS / 60:.0f} min at one per {LEGACY_POLL_SECONDS}s")
+    for fmt in available_formats():
+        for compression in available_compressions():
+            size, encode, decode, requests = stream(entries, fmt, compression)
+            print(f"{fmt + '+' + compression:18s} {size / 1024:9.1f} KiB  encode {encode * 1000:7.1f} ms  "
+                  f"decode {decode * 1000:7.1f} ms  {requests} request(s)  "
+                  f"{wire / size:5.1f}x smaller")
+
+if __name__ == "__main__":
+    main()
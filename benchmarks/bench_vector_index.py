@@ -0,0 +1,64 @@
+"""Build a file-embedding VectorIndex and time top-k queries
+
+Embeddings are synthetic (clustered random 768-d vectors standing in for
+mpnet output), so this measures the index alone: bulk insert, reopening
+the memory-mapped index and query latency, with recall@k against an exact
+float32 scan.
+
+Usage: python benchmarks/bench_vector_index.py [files] [queries]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.vector_index import VectorIndex, _normalize
+
+DIM = 768
+K = 5
+
+def embeddings(count, rng, topics=500):
+    centers = rng.standard_normal((topics, DIM)).astype(np.float32)
+    noise = rng.standard_normal((count, DIM)).astype(np.float32)
+    return centers[rng.integers(0, topics, count)] + 0.7 * noise
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = np.random.default_rng(0)
+    vectors = embeddings(files, rng)
+    paths = [f"/project/file_{i}.py" for i in range(files)]
+
+    with tempfile.TemporaryDirectory() as root:
+        index = VectorIndex(root)
+        started = time.perf_counter()
+        for start in range(0, files, 1000):
+            batch = paths[start:start + 1000]
+            index.add(batch, vectors[start:start + len(batch)], [0.0] * len(batch))
+        index.save()
+        print(f"build    {files} files in {time.perf_counter() - started:.2f}s "
+              f"({'ivf, %d lists' % len(index.centroids) if index.centroids is not None else 'exact'})")
+
+        started = time.perf_counter()
+        index = VectorIndex(root)
+        print(f"reopen   {(time.perf_counter() - started) * 1000:.1f} ms  "
+              f"vectors {os.path.getsize(index.vectors_file) / 2**20:.0f} MB float16")
+
+        exact = _normalize(vectors)
+        targets = rng.integers(0, files, queries)
+        latencies, hits = [], 0
+        for target in targets:
+            query = exact[target] + 0.05 * rng.standard_normal(DIM).astype(np.float32)
+            started = time.perf_counter()
+            results = index.search(query, K)
+            latencies.append(time.perf_counter() - started)
+            truth = set(np.argpartition(-(exact @ _normalize(query)), K)[:K].tolist())
+            hits += len(truth & {int(path.rsplit('_', 1)[1][:-3]) for path, _ in results})
+        print(f"query    p50 {np.percentile(latencies, 50) * 1000:.2f} ms  "
+              f"p99 {np.percentile(latencies, 99) * 1000:.2f} ms  recall@{K} {hits / (K * queries):.3f}")
+
+if __name__ == "__main__":
+    main()
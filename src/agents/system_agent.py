@@ -3,28 +3,51 @@ import json
 import glob
 import shutil
 import psutil
-import pyautogui
 import webbrowser
 import subprocess
 from datetime import datetime
-import pandas as pd
-import numpy as np
-from bs4 import BeautifulSoup
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import torch
-from transformers import AutoTokenizer, AutoModel, pipeline
 import logging
 from pathlib import Path
 
+from ..utils.lazy_import import lazy_import, timed
+from .vector_index import VectorIndex
+
+# Heavy dependencies are imported on first use so that importing the agent
+# (and everything that imports it) stays fast
+pyautogui = lazy_import('pyautogui', 'system_agent')
+bs4 = lazy_import('bs4', 'system_agent')
+requests = lazy_import('requests', 'system_agent')
+webdriver = lazy_import('selenium.webdriver', 'selenium')
+torch = lazy_import('torch')
+transformers = lazy_import('transformers')
+
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+# Loaders of the AI models, run on first use of the matching attribute
+AI_MODELS = {
+    # Text understanding model
+    'tokenizer': lambda: transformers.AutoTokenizer.from_pretrained(EMBEDDING_MODEL),
+    'model': lambda: transformers.AutoModel.from_pretrained(EMBEDDING_MODEL),
+    # Text generation
+    'generator': lambda: transformers.pipeline('text-generation', model='gpt2'),
+    # Text classification
+    'classifier': lambda: transformers.pipeline('sentiment-analysis')
+}
+
 class SystemAgent:
+    """System control, file search and research agent
+    
+    The transformer models are loaded on first use (or all at once by
+    ``setup_ai``), so creating the agent costs no model loading. File
+    embeddings persist in a ``VectorIndex`` under the AI_OS cache directory.
+    """
+    
     def __init__(self):
         self.setup_logging()
-        self.setup_ai()
+        self._ai_models = {}
         self.command_history = []
         self.research_cache = {}
-        self.file_index = {}
+        self.file_index = VectorIndex(Path.home() / 'AppData' / 'Local' / 'AI_OS' / 'cache' / 'file_index')
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -43,67 +66,94 @@ class SystemAgent:
         )
 
     def setup_ai(self):
-        """Initialize AI models"""
+        """Initialize all AI models now instead of on first use"""
         try:
-            # Text understanding model
-            self.tokenizer = AutoTokenizer.from_pretrained("sentence-transformers/all-mpnet-base-v2")
-            self.model = AutoModel.from_pretrained("sentence-transformers/all-mpnet-base-v2")
-            
-            # Text generation
-            self.generator = pipeline('text-generation', model='gpt2')
-            
-            # Text classification
-            self.classifier = pipeline('sentiment-analysis')
-            
+            for name in AI_MODELS:
+                self._ai_model(name)
+                
         except Exception as e:
             logging.error(f"Error setting up AI models: {str(e)}")
             
-    def index_files(self, directory):
-        """Index all files in a directory for quick search"""
+    def _ai_model(self, name):
+        model = self._ai_models.get(name)
+        if model is None:
+            with timed(f"system_agent.{name}"):
+                model = self._ai_models[name] = AI_MODELS[name]()
+        return model
+        
+    @property
+    def tokenizer(self):
+        return self._ai_model('tokenizer')
+        
+    @property
+    def model(self):
+        return self._ai_model('model')
+        
+    @property
+    def generator(self):
+        return self._ai_model('generator')
+        
+    @property
+    def classifier(self):
+        return self._ai_model('classifier')
+            
+    def embed_texts(self, texts):
+        """Mean-pooled mpnet embeddings of a batch of texts, as a float32 array"""
+        inputs = self.tokenizer(list(texts), return_tensors="pt", max_length=512,
+                                truncation=True, padding=True)
+        with torch.no_grad():
+            hidden = self.model(**inputs).last_hidden_state
+        # Average over real tokens only; padding would dilute shorter texts
+        mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+        embeddings = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return embeddings.numpy()
+        
+    def index_files(self, directory, batch_size=32):
+        """Index all files in a directory for quick search
+        
+        Only files that are new or modified since they were last embedded
+        are read and embedded, ``batch_size`` at a time; files that
+        disappeared from the directory are dropped from the index.
+        """
         try:
+            mtimes = {}
             for root, dirs, files in os.walk(directory):
                 for file in files:
-                    path = os.path.join(root, file)
+                    if file.endswith(('.txt', '.py', '.md', '.json')):
+                        path = os.path.join(root, file)
+                        try:
+                            mtimes[path] = os.path.getmtime(path)
+                        except OSError as e:
+                            logging.error(f"Error indexing file {path}: {str(e)}")
+                            
+            self.file_index.remove(path for path in self.file_index.paths_under(directory)
+                                   if path not in mtimes)
+            stale = self.file_index.stale(mtimes)
+            for start in range(0, len(stale), batch_size):
+                paths, contents = [], []
+                for path in stale[start:start + batch_size]:
                     try:
-                        if file.endswith(('.txt', '.py', '.md', '.json')):
-                            with open(path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                                # Create embeddings for content
-                                inputs = self.tokenizer(content, return_tensors="pt", 
-                                                      max_length=512, truncation=True)
-                                with torch.no_grad():
-                                    embeddings = self.model(**inputs).last_hidden_state.mean(dim=1)
-                                self.file_index[path] = {
-                                    'content': content,
-                                    'embeddings': embeddings,
-                                    'modified': os.path.getmtime(path)
-                                }
+                        with open(path, 'r', encoding='utf-8') as f:
+                            contents.append(f.read())
+                        paths.append(path)
                     except Exception as e:
                         logging.error(f"Error indexing file {path}: {str(e)}")
+                if paths:
+                    self.file_index.add(paths, self.embed_texts(contents),
+                                        [mtimes[path] for path in paths])
+            self.file_index.save()
+            return len(stale)
                         
         except Exception as e:
             logging.error(f"Error walking directory {directory}: {str(e)}")
+            return 0
 
-    def search_files(self, query):
+    def search_files(self, query, k=5):
         """Search indexed files using semantic similarity"""
         try:
             # Create query embedding
-            inputs = self.tokenizer(query, return_tensors="pt", 
-                                  max_length=512, truncation=True)
-            with torch.no_grad():
-                query_embedding = self.model(**inputs).last_hidden_state.mean(dim=1)
-
-            # Calculate similarities
-            results = []
-            for path, data in self.file_index.items():
-                similarity = torch.nn.functional.cosine_similarity(
-                    query_embedding, data['embeddings']
-                ).item()
-                results.append((path, similarity))
-
-            # Sort by similarity
-            results.sort(key=lambda x: x[1], reverse=True)
-            return results[:5]  # Return top 5 results
+            query_embedding = self.embed_texts([query])[0]
+            return self.file_index.search(query_embedding, k)  # Top (path, similarity) pairs
             
         except Exception as e:
             logging.error(f"Error searching files: {str(e)}")
@@ -198,7 +248,7 @@ class SystemAgent:
                 return self.research_cache[topic]
 
             # Setup Chrome options
-            chrome_options = Options()
+            chrome_options = webdriver.ChromeOptions()
             chrome_options.add_argument('--headless')
             
             results = []
@@ -206,7 +256,7 @@ class SystemAgent:
             # Search using DuckDuckGo
             url = f"https://duckduckgo.com/html/?q={topic}"
             response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = bs4.BeautifulSoup(response.text, 'html.parser')
             
             # Extract search results
             for result in soup.find_all('div', {'class': 'result'}):
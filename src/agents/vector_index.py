@@ -0,0 +1,245 @@
+import os
+import json
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+CHUNK_ROWS = 8192  # Rows converted from float16 at a time when scanning
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def _spherical_kmeans(data: np.ndarray, k: int, iterations: int = 10,
+                      seed: int = 0) -> np.ndarray:
+    """Unit-length centroids clustering unit vectors by cosine similarity"""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+        filled = np.bincount(assignments, minlength=k) > 0
+        centroids[filled] = _normalize(sums[filled])  # Empty clusters keep their centroid
+    return centroids
+
+class VectorIndex:
+    """Persistent cosine-similarity index of file embeddings
+
+    Unit-length embeddings live in a raw float16 matrix (``vectors.f16``)
+    that is memory-mapped for queries; ``manifest.json`` maps each path to
+    its row and the mtime it was embedded at, so reindexing only embeds
+    files that changed. Rows of removed files are reused by later
+    additions.
+
+    Small indexes are scanned exactly. From ``exact_threshold`` live rows
+    on, an inverted-file layer (spherical k-means over the vectors, about
+    2·sqrt(rows) lists) restricts each query to the ``nprobe`` closest
+    lists, so a 100k-file index answers in milliseconds. The clustering is rebuilt
+    whenever the index has doubled since it was trained.
+    """
+
+    def __init__(self, root: Union[str, Path], dim: int = 768,
+                 exact_threshold: int = 4096, nprobe: int = 8):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.exact_threshold = exact_threshold
+        self.nprobe = nprobe
+        self.vectors_file = self.root / "vectors.f16"
+        self.manifest_file = self.root / "manifest.json"
+        self.ivf_file = self.root / "ivf.npz"
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.memmap] = None
+        self._load()
+
+    def _load(self):
+        manifest = None
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r') as f:
+                manifest = json.load(f)
+        if manifest is None or manifest.get("dim") != self.dim:
+            manifest = {"dim": self.dim, "rows": 0, "entries": {}}
+            for path in (self.vectors_file, self.ivf_file):
+                path.unlink(missing_ok=True)
+        self.rows = manifest["rows"]
+        self.entries: Dict[str, Dict] = manifest["entries"]  # path -> {"row", "mtime"}
+        self.row_paths: List[Optional[str]] = [None] * self.rows
+        for path, entry in self.entries.items():
+            self.row_paths[entry["row"]] = path
+        self.free = [row for row, path in enumerate(self.row_paths) if path is None]
+
+        # Drop rows written after the last manifest save
+        size = self.rows * self.dim * 2
+        if self.vectors_file.exists() and self.vectors_file.stat().st_size != size:
+            with open(self.vectors_file, 'r+b') as f:
+                f.truncate(size)
+
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments: Optional[np.ndarray] = None
+        self.trained_rows = 0
+        if self.ivf_file.exists():
+            with np.load(self.ivf_file) as ivf:
+                if len(ivf["assignments"]) == self.rows:
+                    self.centroids = ivf["centroids"]
+                    self.assignments = ivf["assignments"]
+                    self.trained_rows = int(ivf["trained_rows"])
+
+    def save(self):
+        """Write the manifest (and clustering) so the index survives restarts"""
+        with self._lock:
+            manifest = {"dim": self.dim, "rows": self.rows, "entries": self.entries}
+            tmp_file = self.manifest_file.with_suffix(".tmp")
+            with open(tmp_file, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_file, self.manifest_file)
+            if self.centroids is not None:
+                tmp_file = self.root / "ivf.tmp.npz"
+                np.savez(tmp_file, centroids=self.centroids, assignments=self.assignments,
+                         trained_rows=self.trained_rows)
+                os.replace(tmp_file, self.ivf_file)
+            else:
+                self.ivf_file.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.entries
+
+    def matrix(self) -> np.ndarray:
+        """Memory-mapped (rows, dim) float16 matrix, including free rows"""
+        if self._matrix is None:
+            if self.rows == 0:
+                return np.empty((0, self.dim), dtype=np.float16)
+            self._matrix = np.memmap(self.vectors_file, dtype=np.float16, mode='r',
+                                     shape=(self.rows, self.dim))
+        return self._matrix
+
+    def stale(self, mtimes: Dict[str, float]) -> List[str]:
+        """Paths that are new or modified since they were embedded"""
+        return [
+            path for path, mtime in mtimes.items()
+            if path not in self.entries or self.entries[path]["mtime"] != mtime
+        ]
+
+    def paths_under(self, directory: str) -> List[str]:
+        """Indexed paths inside ``directory``"""
+        prefix = os.path.join(os.path.abspath(directory), '')
+        return [path for path in self.entries if os.path.abspath(path).startswith(prefix)]
+
+    def add(self, paths: Sequence[str], vectors: np.ndarray, mtimes: Sequence[float]):
+        """Insert or replace the embeddings of ``paths``"""
+        vectors = _normalize(vectors).reshape(len(paths), self.dim)
+        with self._lock:
+            rows = []
+            for path in paths:
+                entry = self.entries.get(path)
+                if entry is not None:
+                    rows.append(entry["row"])
+                elif self.free:
+                    rows.append(self.free.pop())
+                else:
+                    rows.append(self.rows)
+                    self.row_paths.append(None)
+                    self.rows += 1
+            with open(self.vectors_file, 'r+b' if self.vectors_file.exists() else 'w+b') as f:
+                data = vectors.astype(np.float16)
+                for row, vector in zip(rows, data):
+                    f.seek(row * self.dim * 2)
+                    f.write(vector.tobytes())
+            for path, row, mtime in zip(paths, rows, mtimes):
+                self.entries[path] = {"row": row, "mtime": mtime}
+                self.row_paths[row] = path
+            self._matrix = None
+
+            if self.assignments is not None:
+                grown = self.rows - len(self.assignments)
+                if grown > 0:
+                    self.assignments = np.concatenate(
+                        [self.assignments, np.full(grown, -1, dtype=np.int32)])
+                self.assignments[rows] = np.argmax(vectors @ self.centroids.T, axis=1)
+            self._maybe_train()
+
+    def remove(self, paths: Iterable[str]):
+        """Forget ``paths``; their rows are reused by later additions"""
+        with self._lock:
+            for path in paths:
+                entry = self.entries.pop(path, None)
+                if entry is None:
+                    continue
+                self.row_paths[entry["row"]] = None
+                self.free.append(entry["row"])
+                if self.assignments is not None:
+                    self.assignments[entry["row"]] = -1
+
+    def _maybe_train(self):
+        live = len(self.entries)
+        if live < self.exact_threshold:
+            return
+        if self.centroids is not None and live < 2 * self.trained_rows:
+            return
+        self.train()
+
+    def train(self, sample_size: int = 16, iterations: int = 10):
+        """(Re)build the inverted-file clustering over the live rows"""
+        with self._lock:
+            live_rows = np.array([entry["row"] for entry in self.entries.values()], dtype=np.int64)
+            if len(live_rows) == 0:
+                return
+            live_rows.sort()
+            lists = max(1, int(2 * np.sqrt(len(live_rows))))
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(live_rows, min(len(live_rows), lists * sample_size),
+                                        replace=False))
+            matrix = self.matrix()
+            centroids = _spherical_kmeans(_normalize(matrix[sample]), lists, iterations)
+
+            assignments = np.full(self.rows, -1, dtype=np.int32)
+            for start in range(0, len(live_rows), CHUNK_ROWS):
+                rows = live_rows[start:start + CHUNK_ROWS]
+                chunk = matrix[rows].astype(np.float32)
+                assignments[rows] = np.argmax(chunk @ centroids.T, axis=1)
+            self.centroids = centroids
+            self.assignments = assignments
+            self.trained_rows = len(live_rows)
+
+    def _candidates(self, query: np.ndarray) -> Optional[np.ndarray]:
+        """Rows in the lists closest to the query, or None for an exact scan"""
+        if self.centroids is None or len(self.entries) < self.exact_threshold:
+            return None
+        nprobe = min(self.nprobe, len(self.centroids))
+        scores = self.centroids @ query
+        probe = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        return np.flatnonzero(np.isin(self.assignments, probe))
+
+    def search(self, query: np.ndarray, k: int = 5) -> List[Tuple[str, float]]:
+        """Top-``k`` (path, cosine similarity) pairs for a query embedding"""
+        query = _normalize(query).reshape(self.dim)
+        with self._lock:
+            if not self.entries:
+                return []
+            matrix = self.matrix()
+            candidates = self._candidates(query)
+            if candidates is None:
+                scores = np.empty(self.rows, dtype=np.float32)
+                buffer = np.empty((min(CHUNK_ROWS, self.rows), self.dim), dtype=np.float32)
+                for start in range(0, self.rows, CHUNK_ROWS):
+                    chunk = buffer[:min(CHUNK_ROWS, self.rows - start)]
+                    chunk[...] = matrix[start:start + len(chunk)]
+                    np.dot(chunk, query, out=scores[start:start + len(chunk)])
+                candidates = np.arange(self.rows)
+            else:
+                scores = matrix[candidates].astype(np.float32) @ query
+
+            valid = np.fromiter((self.row_paths[row] is not None for row in candidates),
+                                dtype=bool, count=len(candidates))
+            candidates, scores = candidates[valid], scores[valid]
+            k = min(k, len(candidates))
+            if k == 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.row_paths[candidates[i]], float(scores[i])) for i in top]
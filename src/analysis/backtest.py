@@ -0,0 +1,213 @@
+import json
+import time
+import logging
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from sklearn.preprocessing import StandardScaler
+from .features import build_training_set
+
+def _probabilities(model: Any, X: np.ndarray) -> np.ndarray:
+    """(n, 37) probabilities from a scikit-learn style or Keras model"""
+    if hasattr(model, 'predict_proba'):
+        scores = model.predict_proba(X)
+        classes = np.asarray(getattr(model, 'classes_', np.arange(scores.shape[1])), dtype=np.int64)
+        probabilities = np.zeros((len(X), 37), dtype=np.float64)
+        # Classes never seen in training keep probability 0
+        probabilities[:, classes] = scores
+        return probabilities
+    return np.asarray(model.predict(X, batch_size=4096, verbose=0), dtype=np.float64)
+
+def _fit(model: Any, X: np.ndarray, y: np.ndarray, epochs: int):
+    if hasattr(model, 'compile'):
+        model.fit(X, y, epochs=epochs, batch_size=256, verbose=0)
+    else:
+        model.fit(X, y)
+
+class FrequencyModel:
+    """Baseline that predicts the training-period frequency of each number"""
+
+    def fit(self, X, y):
+        counts = np.bincount(y, minlength=37).astype(np.float64) + 1  # Laplace smoothing
+        self.distribution = counts / counts.sum()
+        return self
+
+    def predict_proba(self, X):
+        return np.tile(self.distribution, (len(X), 1))
+
+def score(probabilities: np.ndarray, actual: np.ndarray, bins: int = 10) -> Dict:
+    """Hit rates, log-loss and calibration of predicted distributions"""
+    if len(actual) == 0:
+        return {'predictions': 0}
+    rows = np.arange(len(actual))
+    predicted = np.argmax(probabilities, axis=1)
+    confidence = probabilities[rows, predicted]
+    hits = predicted == actual
+    top_3 = np.argpartition(-probabilities, 3, axis=1)[:, :3]
+
+    # Reliability of the top-1 confidence, in equal-width bins
+    bin_index = np.minimum((confidence * bins).astype(np.int64), bins - 1)
+    counts = np.bincount(bin_index, minlength=bins)
+    confidence_sums = np.bincount(bin_index, weights=confidence, minlength=bins)
+    hit_sums = np.bincount(bin_index, weights=hits, minlength=bins)
+    filled = counts > 0
+    mean_confidence = np.divide(confidence_sums, counts, out=np.zeros(bins), where=filled)
+    accuracy = np.divide(hit_sums, counts, out=np.zeros(bins), where=filled)
+    ece = float(np.sum(counts * np.abs(mean_confidence - accuracy)) / len(actual))
+
+    return {
+        'predictions': int(len(actual)),
+        'hit_rate': float(hits.mean()),
+        'top_3_hit_rate': float((top_3 == actual[:, None]).any(axis=1).mean()),
+        'log_loss': float(-np.mean(np.log(np.clip(probabilities[rows, actual], 1e-15, 1.0)))),
+        'expected_calibration_error': ece,
+        'calibration': [
+            {'bin': int(i), 'count': int(counts[i]), 'confidence': float(mean_confidence[i]),
+             'accuracy': float(accuracy[i])}
+            for i in np.flatnonzero(filled)
+        ]
+    }
+
+class WalkForwardBacktester:
+    """Walk-forward evaluation of next-spin models
+
+    The features of every window are built once up front. Models are then
+    retrained on all rows before each retrain point (every ``retrain_every``
+    rows, optionally capped at the latest ``max_train`` rows) and score the
+    whole following segment in one ``predict_proba`` call, so a 100k-spin
+    evaluation costs a few dozen fits instead of one inference per spin.
+    """
+
+    def __init__(self, model_factories: Dict[str, Callable[[], Any]],
+                 window_size: int = 10, retrain_every: int = 1000,
+                 min_train: int = 1000, max_train: Optional[int] = None,
+                 scale: bool = True, epochs: int = 10,
+                 results_dir: Optional[Union[str, Path]] = None):
+        self.model_factories = model_factories
+        self.window_size = window_size
+        self.retrain_every = retrain_every
+        self.min_train = min_train
+        self.max_train = max_train
+        self.scale = scale
+        self.epochs = epochs
+        self.results_dir = Path(results_dir) if results_dir else None
+
+    def config(self) -> Dict:
+        return {
+            'models': list(self.model_factories),
+            'window_size': self.window_size,
+            'retrain_every': self.retrain_every,
+            'min_train': self.min_train,
+            'max_train': self.max_train,
+            'scale': self.scale,
+            'epochs': self.epochs
+        }
+
+    def predict(self, numbers: Sequence[int]) -> Dict:
+        """Walk forward over one sequence
+
+        Returns the actual numbers, each model's (n, 37) probabilities (plus an
+        ``ensemble`` average when there are several models) and retrain points
+        as row indices into the feature matrix.
+        """
+        X, y = build_training_set(numbers, self.window_size)
+        start = max(self.min_train, 1)
+        probabilities = {name: [] for name in self.model_factories}
+        retrain_points = []
+
+        for segment_start in range(start, len(y), self.retrain_every):
+            segment_end = min(segment_start + self.retrain_every, len(y))
+            train_start = 0 if self.max_train is None else max(segment_start - self.max_train, 0)
+            X_train, y_train = X[train_start:segment_start], y[train_start:segment_start]
+            X_test = X[segment_start:segment_end]
+            if self.scale:
+                scaler = StandardScaler().fit(X_train)
+                X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+
+            for name, factory in self.model_factories.items():
+                model = factory()
+                _fit(model, X_train, y_train, self.epochs)
+                probabilities[name].append(_probabilities(model, X_test))
+            retrain_points.append(segment_start)
+
+        actual = y[start:] if start < len(y) else y[:0]
+        probabilities = {
+            name: np.concatenate(parts) if parts else np.empty((0, 37))
+            for name, parts in probabilities.items()
+        }
+        if len(probabilities) > 1:
+            probabilities['ensemble'] = np.mean(list(probabilities.values()), axis=0)
+        return {'actual': actual, 'probabilities': probabilities, 'retrain_points': retrain_points}
+
+    def summarize(self, walk: Dict, table: str = 'default') -> Dict:
+        """Score every model of a ``predict`` result"""
+        return {
+            'table': table,
+            'predictions': int(len(walk['actual'])),
+            'retrain_points': len(walk['retrain_points']),
+            'models': {
+                name: score(probabilities, walk['actual'])
+                for name, probabilities in walk['probabilities'].items()
+            }
+        }
+
+    def run(self, numbers: Sequence[int], table: str = 'default') -> Dict:
+        """Backtest one table and score every model"""
+        started = time.perf_counter()
+        result = self.summarize(self.predict(numbers), table)
+        result['spins'] = int(len(numbers))
+        result['elapsed_seconds'] = time.perf_counter() - started
+        return result
+
+    def run_store(self, store, tables: Optional[Sequence[str]] = None) -> Dict:
+        """Backtest every table of a SpinStore (or the given ones) and persist the results"""
+        results = {
+            'created_at': datetime.now().isoformat(),
+            'config': self.config(),
+            'tables': {}
+        }
+        for table in (tables if tables is not None else list(store.tables())):
+            try:
+                results['tables'][table] = self.run(store.numbers(table), table)
+            except Exception as e:
+                logging.error(f"Error backtesting table {table}: {str(e)}")
+        if self.results_dir is not None:
+            self.save(results)
+        return results
+
+    def save(self, results: Dict, name: Optional[str] = None) -> Path:
+        """Write results to ``results_dir`` for later comparison"""
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        name = name or f"backtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        path = self.results_dir / f"{name}.json"
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        return path
+
+    @staticmethod
+    def load_results(results_dir: Union[str, Path]) -> List[Dict]:
+        """Load every saved run, oldest first"""
+        runs = []
+        for path in sorted(Path(results_dir).glob("backtest_*.json")):
+            with open(path, 'r') as f:
+                run = json.load(f)
+            run['name'] = path.stem
+            runs.append(run)
+        return runs
+
+    @staticmethod
+    def compare(runs: Sequence[Dict], metric: str = 'log_loss') -> List[Dict]:
+        """Flatten runs into one row per (run, table, model) for a metric"""
+        rows = []
+        for run in runs:
+            for table, result in run.get('tables', {}).items():
+                for model, scores in result['models'].items():
+                    rows.append({
+                        'run': run.get('name', run.get('created_at')),
+                        'table': table,
+                        'model': model,
+                        metric: scores.get(metric)
+                    })
+        return rows
@@ -0,0 +1,183 @@
+import numpy as np
+from scipy import stats
+from typing import Dict, List, Optional, Sequence
+
+class BiasMonitor:
+    """Streaming wheel-bias tests for many tables at once
+
+    Every table owns one row of 2-D arrays: all-time counts, a per-number
+    CUSUM statistic and a per-number SPRT log-likelihood ratio. A spin costs
+    O(37) and never looks at the history again. The chi-square test runs from
+    the count row every ``check_every`` spins of a table, while CUSUM and SPRT
+    raise alerts on the spin that crosses their threshold.
+
+    The sequential tests watch each number as a Bernoulli stream: in-control
+    probability 1/37 against a biased alternative of ``bias_ratio``/37.
+    """
+
+    def __init__(self, check_every: int = 100, alpha: float = 0.01,
+                 bias_ratio: float = 1.5, cusum_threshold: float = 8.0,
+                 sprt_beta: float = 0.1, capacity: int = 64):
+        self.check_every = check_every
+        self.alpha = alpha
+        p0 = 1 / 37
+        p1 = bias_ratio / 37
+        # Log-likelihood ratio increments for a hit and a miss of a number
+        self.llr_hit = np.log(p1 / p0)
+        self.llr_miss = np.log((1 - p1) / (1 - p0))
+        self.cusum_threshold = cusum_threshold
+        self.sprt_upper = np.log((1 - sprt_beta) / alpha)
+        self.sprt_lower = np.log(sprt_beta / (1 - alpha))
+
+        self.table_index: Dict[str, int] = {}
+        self.table_names: List[str] = []  # Row -> table, kept alongside table_index
+        self.counts = np.zeros((capacity, 37), dtype=np.int64)
+        self.totals = np.zeros(capacity, dtype=np.int64)
+        self.cusum = np.zeros((capacity, 37))
+        self.sprt = np.zeros((capacity, 37))
+        self.last_check: Dict[str, Dict] = {}
+
+    def _row(self, table: str) -> int:
+        row = self.table_index.get(table)
+        if row is not None:
+            return row
+        row = len(self.table_index)
+        if row == len(self.totals):
+            self._grow()
+        self.table_index[table] = row
+        self.table_names.append(table)
+        return row
+
+    def _grow(self):
+        capacity = 2 * len(self.totals)
+        for name in ('counts', 'totals', 'cusum', 'sprt'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    @property
+    def tables(self) -> List[str]:
+        return list(self.table_names)
+
+    def update(self, table: str, number: int) -> List[Dict]:
+        """Add one spin of a table and return any alerts it raised"""
+        return self.update_many([table], [number])
+
+    def update_many(self, tables: Sequence[str], numbers: Sequence[int]) -> List[Dict]:
+        """Add spins from any mix of tables, in arrival order
+
+        Spins are applied in rounds where each table appears at most once, so
+        hundreds of tables reporting a spin each are one vectorized step.
+        """
+        numbers = np.asarray(numbers, dtype=np.int64)
+        if numbers.size and (numbers.min() < 0 or numbers.max() > 36):
+            raise ValueError("Numbers must be between 0 and 36")
+        rows = np.fromiter((self._row(t) for t in tables), dtype=np.int64, count=len(numbers))
+
+        # Rank of each spin among the spins of its own table
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        rank = np.empty(len(rows), dtype=np.int64)
+        rank[order] = np.arange(len(rows)) - np.searchsorted(sorted_rows, sorted_rows, side="left")
+
+        alerts = []
+        for step in range(int(rank.max()) + 1 if len(rank) else 0):
+            batch = rank == step
+            alerts.extend(self._step(rows[batch], numbers[batch]))
+        return alerts
+
+    def _step(self, rows: np.ndarray, numbers: np.ndarray) -> List[Dict]:
+        """Apply one spin to each of ``rows`` (no row repeats)"""
+        self.counts[rows, numbers] += 1
+        self.totals[rows] += 1
+
+        for name in ('cusum', 'sprt'):
+            statistic = getattr(self, name)
+            statistic[rows] += self.llr_miss
+            statistic[rows, numbers] += self.llr_hit - self.llr_miss
+        self.cusum[rows] = np.maximum(self.cusum[rows], 0)
+
+        alerts = []
+        names = self.table_names
+
+        # CUSUM alarms restart the statistic so a persistent bias keeps reporting
+        hit_rows, hit_numbers = np.nonzero(self.cusum[rows] > self.cusum_threshold)
+        for r, n in zip(rows[hit_rows], hit_numbers):
+            alerts.append(self._alert(names[r], 'cusum', int(n), float(self.cusum[r, n])))
+            self.cusum[r, n] = 0
+
+        # SPRT decides biased above the upper bound and fair below the lower
+        sprt = self.sprt[rows]
+        biased_rows, biased_numbers = np.nonzero(sprt >= self.sprt_upper)
+        for r, n in zip(rows[biased_rows], biased_numbers):
+            alerts.append(self._alert(names[r], 'sprt', int(n), float(self.sprt[r, n])))
+        decided = (sprt >= self.sprt_upper) | (sprt <= self.sprt_lower)
+        sprt[decided] = 0
+        self.sprt[rows] = sprt
+
+        due = rows[self.totals[rows] % self.check_every == 0]
+        if len(due):
+            for table, result in zip((names[r] for r in due), self._chi_square(due)):
+                self.last_check[table] = result
+                if result['bias_detected']:
+                    alerts.append(self._alert(table, 'chi_square', None,
+                                              result['chi_square_stat'], result['p_value']))
+        return alerts
+
+    def _alert(self, table: str, test: str, number: Optional[int],
+               statistic: float, p_value: Optional[float] = None) -> Dict:
+        row = self.table_index[table]
+        return {
+            'table': table,
+            'test': test,
+            'number': number,
+            'statistic': statistic,
+            'p_value': p_value,
+            'total_spins': int(self.totals[row])
+        }
+
+    def _chi_square(self, rows: np.ndarray) -> List[Dict]:
+        """Chi-square goodness of fit against a uniform wheel for several tables"""
+        observed = self.counts[rows]
+        expected = self.totals[rows, None] / 37
+        chi2 = ((observed - expected) ** 2 / expected).sum(axis=1)
+        p_values = stats.chi2.sf(chi2, df=36)
+        return [
+            {
+                'chi_square_stat': float(c),
+                'p_value': float(p),
+                'bias_detected': bool(p < self.alpha),
+                'total_spins': int(t)
+            }
+            for c, p, t in zip(chi2, p_values, self.totals[rows])
+        ]
+
+    def check(self, table: str) -> Dict:
+        """Run the chi-square test for a table now, from its running counts"""
+        if table not in self.table_index:
+            raise KeyError(f"Unknown table: {table}")
+        row = self.table_index[table]
+        if self.totals[row] == 0:
+            return {'chi_square_stat': 0.0, 'p_value': 1.0, 'bias_detected': False, 'total_spins': 0}
+        result = self._chi_square(np.array([row]))[0]
+        self.last_check[table] = result
+        return result
+
+    def suspect_numbers(self, table: str, min_ratio: float = 0.5) -> List[int]:
+        """Numbers whose CUSUM is at least ``min_ratio`` of the alarm threshold"""
+        row = self.table_index.get(table)
+        if row is None:
+            return []
+        cusum = self.cusum[row]
+        flagged = np.flatnonzero(cusum >= min_ratio * self.cusum_threshold)
+        return flagged[np.argsort(-cusum[flagged], kind="stable")].tolist()
+
+    def reset(self, table: str):
+        """Forget a table's state, e.g. after a wheel change"""
+        row = self.table_index.get(table)
+        if row is None:
+            return
+        for name in ('counts', 'totals', 'cusum', 'sprt'):
+            getattr(self, name)[row] = 0
+        self.last_check.pop(table, None)
@@ -0,0 +1,60 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Sequence, Tuple
+
+from .wheel import COLOR, DOZEN, PARITY, HIGH_LOW
+
+FEATURE_NAMES = (
+    'mean', 'std', 'max', 'min',
+    'first_12', 'second_12', 'third_12', 'zero',
+    'red', 'black',
+    'even', 'high'
+)
+
+def _window_sums(values: np.ndarray, window_size: int) -> np.ndarray:
+    """Sum of every length-``window_size`` window via a running cumulative sum"""
+    totals = np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+    return totals[window_size:] - totals[:-window_size]
+
+def window_features(numbers: Sequence[int], window_size: int = 10) -> np.ndarray:
+    """Build the feature row of every window of ``window_size`` consecutive spins
+
+    Returns a C-contiguous float32 matrix with one row per window (including the
+    final window) and the columns listed in ``FEATURE_NAMES``.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    rows = len(numbers) - window_size + 1
+    features = np.empty((max(rows, 0), len(FEATURE_NAMES)), dtype=np.float32)
+    if rows <= 0:
+        return features
+
+    # Integer sums are exact, so mean/std match np.mean/np.std per window
+    sums = _window_sums(numbers, window_size)
+    squares = _window_sums(numbers * numbers, window_size)
+    features[:, 0] = sums / window_size
+    features[:, 1] = np.sqrt(np.maximum(window_size * squares - sums * sums, 0)) / window_size
+
+    windows = sliding_window_view(numbers, window_size)
+    features[:, 2] = windows.max(axis=1)
+    features[:, 3] = windows.min(axis=1)
+
+    dozens = DOZEN[numbers]
+    colors = COLOR[numbers]
+    ratio_flags = (
+        dozens == 1, dozens == 2, dozens == 3, dozens == 0,
+        colors == 1, colors == 2,
+        PARITY[numbers] == 2,
+        HIGH_LOW[numbers] == 2
+    )
+    for column, flags in enumerate(ratio_flags, start=4):
+        features[:, column] = _window_sums(flags, window_size) / window_size
+
+    return features
+
+def build_training_set(numbers: Sequence[int], window_size: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """Feature matrix of each window paired with the spin that followed it"""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if len(numbers) <= window_size:
+        return np.empty((0, len(FEATURE_NAMES)), dtype=np.float32), np.empty(0, dtype=np.int64)
+    features = window_features(numbers[:-1], window_size)
+    return features, numbers[window_size:]
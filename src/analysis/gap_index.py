@@ -0,0 +1,107 @@
+import numpy as np
+from typing import List, Sequence
+
+class WindowCounter:
+    """Per-number counts over the last ``window`` spins, backed by a ring buffer"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buffer = np.zeros(window, dtype=np.int8)
+        self.counts = np.zeros(37, dtype=np.int64)
+        self.total = 0
+
+    def update(self, number: int):
+        slot = self.total % self.window
+        if self.total >= self.window:
+            self.counts[self.buffer[slot]] -= 1
+        self.buffer[slot] = number
+        self.counts[number] += 1
+        self.total += 1
+
+    def extend(self, numbers: Sequence[int]):
+        """Add many spins; long batches rebuild the window in one step"""
+        numbers = np.asarray(numbers, dtype=np.int64)
+        if len(numbers) < self.window:
+            for number in numbers:
+                self.update(number)
+            return
+        self.total += len(numbers)
+        tail = numbers[-self.window:]
+        positions = np.arange(self.total - self.window, self.total) % self.window
+        self.buffer[positions] = tail
+        self.counts[:] = np.bincount(tail, minlength=37)
+
+    def recent(self, count: int) -> np.ndarray:
+        """Last ``count`` spins in the window, oldest first"""
+        count = min(count, self.total, self.window)
+        return self.buffer[np.arange(self.total - count, self.total) % self.window]
+
+    @property
+    def size(self) -> int:
+        """Number of spins currently inside the window"""
+        return min(self.total, self.window)
+
+class GapIndex:
+    """Last-seen position of every number, giving gaps as O(37) reads"""
+
+    def __init__(self):
+        self.last_seen = np.full(37, -1, dtype=np.int64)
+        self.total = 0
+
+    def update(self, number: int):
+        self.last_seen[number] = self.total
+        self.total += 1
+
+    def extend(self, numbers: Sequence[int]):
+        numbers = np.asarray(numbers, dtype=np.int64)
+        positions = np.arange(self.total, self.total + len(numbers))
+        np.maximum.at(self.last_seen, numbers, positions)
+        self.total += len(numbers)
+
+    def gaps(self) -> np.ndarray:
+        """Spins since each number last appeared (total spins if never seen)"""
+        return np.where(self.last_seen >= 0, self.total - 1 - self.last_seen, self.total)
+
+    def due_numbers(self, limit: int = 5) -> List[int]:
+        """Previously seen numbers with the longest current gap"""
+        seen = np.flatnonzero(self.last_seen >= 0)
+        order = seen[np.argsort(self.last_seen[seen], kind="stable")]
+        return order[:limit].tolist()
+
+def _sorted_occurrences(numbers: np.ndarray):
+    """Row order grouped by number (then position) and each row's rank in its group"""
+    order = np.lexsort((np.arange(len(numbers)), numbers))
+    sorted_numbers = numbers[order]
+    group_start = np.searchsorted(sorted_numbers, sorted_numbers, side="left")
+    rank = np.empty(len(numbers), dtype=np.int64)
+    rank[order] = np.arange(len(numbers)) - group_start
+    return order, rank
+
+def gaps_since_previous(numbers: Sequence[int]) -> np.ndarray:
+    """For every spin, spins since the same number last appeared
+
+    A number's first appearance reports its index, i.e. the spins seen so far.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    positions = np.arange(len(numbers))
+    order, rank = _sorted_occurrences(numbers)
+    previous = np.empty(len(numbers), dtype=np.int64)
+    previous[order[1:]] = order[:-1]
+    return np.where(rank > 0, positions - previous, positions)
+
+def rolling_number_counts(numbers: Sequence[int], window: int) -> np.ndarray:
+    """For every spin, how often its number occurred in the window ending at it
+
+    Matches ``pd.get_dummies(numbers).rolling(window).sum()`` looked up at each
+    row's own number: rows before the first full window are NaN.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    positions = np.arange(len(numbers))
+    order, rank = _sorted_occurrences(numbers)
+    # Occurrences of the same number at or before i - window have left the window
+    keys = numbers[order] * (len(numbers) + 1) + order
+    left = np.searchsorted(keys, numbers * (len(numbers) + 1) + (positions - window), side="right")
+    group_start = np.searchsorted(keys, numbers * (len(numbers) + 1), side="left")
+    counts = (rank + 1 - np.maximum(left - group_start, 0)).astype(np.float64)
+    counts[:window - 1] = np.nan
+    return counts
@@ -0,0 +1,171 @@
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from .wheel import CATEGORIES
+from .gap_index import GapIndex, WindowCounter
+
+class IncrementalStats:
+    """Running roulette statistics that cost O(1) per spin
+
+    Keeps the all-time frequency vector, counts over the last N spins for each
+    configured window, per-category streak state and the last-seen position
+    of every number. Queries only ever touch 37-entry arrays or the ring
+    buffer of recent spins, never the full history.
+    """
+
+    WINDOWS = (10, 50, 100, 1000)
+
+    def __init__(self, windows: Sequence[int] = WINDOWS):
+        self.windows = tuple(sorted(windows))
+        self.capacity = self.windows[-1]
+        self.total = 0
+        self.frequency = np.zeros(37, dtype=np.int64)
+        self.counters = {w: WindowCounter(w) for w in self.windows}
+        self.gap_index = GapIndex()
+        self.category_counts = {
+            name: np.zeros(len(labels), dtype=np.int64)
+            for name, (_, labels) in CATEGORIES.items()
+        }
+        self.streaks = {
+            name: {"value": -1, "length": 0, "max_value": -1, "max_length": 0}
+            for name in CATEGORIES
+        }
+
+    def update(self, number: int):
+        """Add a spin to every statistic"""
+        number = int(number)
+        if not 0 <= number <= 36:
+            raise ValueError(f"Invalid number: {number}")
+
+        for counter in self.counters.values():
+            counter.update(number)
+        self.gap_index.update(number)
+        self.frequency[number] += 1
+        self.total += 1
+
+        for name, (table, _) in CATEGORIES.items():
+            code = int(table[number])
+            self.category_counts[name][code] += 1
+            streak = self.streaks[name]
+            if streak["value"] == code:
+                streak["length"] += 1
+            else:
+                streak["value"] = code
+                streak["length"] = 1
+            if streak["length"] > streak["max_length"]:
+                streak["max_value"] = code
+                streak["max_length"] = streak["length"]
+
+    def update_many(self, numbers: Sequence[int]):
+        for number in numbers:
+            self.update(number)
+
+    def recent(self, count: int = 10) -> List[int]:
+        """Get the last ``count`` spins, oldest first"""
+        return self.counters[self.capacity].recent(count).tolist()
+
+    def recent_categories(self, category: str, count: int = 10) -> List[str]:
+        """Get category labels (e.g. colors) of the last ``count`` spins"""
+        table, labels = CATEGORIES[category]
+        return [labels[table[n]] for n in self.recent(count)]
+
+    def counts(self, window: Optional[int] = None) -> np.ndarray:
+        """Get per-number counts over a window, or all-time when window is None"""
+        if window is None:
+            return self.frequency.copy()
+        if window not in self.counters:
+            raise ValueError(f"Untracked window: {window}")
+        return self.counters[window].counts.copy()
+
+    def gaps(self) -> np.ndarray:
+        """Spins since each number last appeared (total spins if never seen)"""
+        return self.gap_index.gaps()
+
+    def most_common(self, limit: int = 5, window: Optional[int] = None) -> Dict[int, int]:
+        counts = self.frequency if window is None else self.counters[window].counts
+        order = np.argsort(-counts, kind="stable")[:limit]
+        return {int(n): int(counts[n]) for n in order if counts[n] > 0}
+
+    def hot_numbers(self, window: int = 50, min_count: int = 2, limit: int = 5) -> List[int]:
+        """Numbers hit at least ``min_count`` times in the window, most frequent first"""
+        counts = self.counters[window].counts
+        order = np.argsort(-counts, kind="stable")
+        return [int(n) for n in order if counts[n] >= min_count][:limit]
+
+    def cold_numbers(self, window: int = 50, limit: int = 5) -> List[int]:
+        """Numbers that have not appeared in the window"""
+        return np.flatnonzero(self.counters[window].counts == 0)[:limit].tolist()
+
+    def due_numbers(self, limit: int = 5) -> List[int]:
+        """Previously seen numbers with the longest current gap"""
+        return self.gap_index.due_numbers(limit)
+
+    def distribution(self, category: str) -> Dict[str, int]:
+        """All-time counts per label of a category (labels never seen are omitted)"""
+        _, labels = CATEGORIES[category]
+        counts = self.category_counts[category]
+        return {labels[code]: int(count) for code, count in enumerate(counts) if count > 0}
+
+    def streak(self, category: str) -> Dict:
+        """Current and longest streak for a category"""
+        _, labels = CATEGORIES[category]
+        streak = self.streaks[category]
+        if streak["length"] == 0:
+            return {"current": None, "current_length": 0, "longest": None, "longest_length": 0}
+        return {
+            "current": labels[streak["value"]],
+            "current_length": streak["length"],
+            "longest": labels[streak["max_value"]],
+            "longest_length": streak["max_length"]
+        }
+
+    def snapshot(self) -> Dict:
+        """Get a JSON-serializable copy of the full state"""
+        return {
+            "windows": list(self.windows),
+            "total": self.total,
+            "recent": self.recent(self.capacity),
+            "frequency": self.frequency.tolist(),
+            "last_seen": self.gap_index.last_seen.tolist(),
+            "category_counts": {k: v.tolist() for k, v in self.category_counts.items()},
+            "streaks": {k: dict(v) for k, v in self.streaks.items()}
+        }
+
+    @classmethod
+    def restore(cls, snapshot: Dict) -> "IncrementalStats":
+        """Rebuild the engine from a snapshot without replaying history"""
+        stats = cls(snapshot["windows"])
+        stats.total = snapshot["total"]
+        stats.frequency[:] = snapshot["frequency"]
+        stats.gap_index.last_seen[:] = snapshot["last_seen"]
+        stats.gap_index.total = stats.total
+        for name, counts in snapshot["category_counts"].items():
+            stats.category_counts[name][:] = counts
+        for name, streak in snapshot["streaks"].items():
+            stats.streaks[name].update(streak)
+
+        recent = np.asarray(snapshot["recent"], dtype=np.int64)
+        for window, counter in stats.counters.items():
+            tail = recent[-window:]
+            counter.total = stats.total - len(tail)
+            counter.extend(tail)
+        return stats
+
+    def save(self, path: Union[str, Path]):
+        """Write a snapshot to disk"""
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], windows: Sequence[int] = WINDOWS) -> "IncrementalStats":
+        """Restore from a snapshot file, or start empty if there is none"""
+        path = Path(path)
+        if not path.exists():
+            return cls(windows)
+        with open(path, 'r') as f:
+            return cls.restore(json.load(f))
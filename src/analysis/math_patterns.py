@@ -1,11 +1,16 @@
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from dataclasses import dataclass
 from collections import defaultdict
 import pandas as pd
 from scipy import stats
 from sklearn.cluster import KMeans
 from datetime import datetime, timedelta
+from .sequence_miner import mine_sequences
+from .gap_index import GapIndex, WindowCounter
+from .spin_array import SpinArray, as_spin_array
+from .wheel import DOZEN_NAMES
+from .bias_monitor import BiasMonitor
 
 @dataclass
 class RouletteNumber:
@@ -36,8 +41,14 @@ class RouletteNumber:
             return 0
         return ((self.number - 1) // 12) + 1
 
+Spins = Union[SpinArray, List[RouletteNumber]]
+
 class MathematicalAnalyzer:
-    """Advanced mathematical analysis for roulette patterns"""
+    """Advanced mathematical analysis for roulette patterns
+    
+    The ``analyze_*``/``find_*``/``detect_*`` methods accept a ``SpinArray``
+    directly; lists of ``RouletteNumber`` are converted to one first.
+    """
     
     def __init__(self):
         self.number_mapping = {
@@ -86,6 +97,22 @@ class MathematicalAnalyzer:
         self.cold_numbers = set(range(37))
         self.sector_trends = defaultdict(list)
         self.time_patterns = []
+        # Streaming state per table, like the bias monitor's rows
+        self.window_counters: Dict[str, WindowCounter] = {}
+        self.gap_indexes: Dict[str, GapIndex] = {}
+        self.bias_monitor = BiasMonitor()
+        
+    def observe(self, number: int, table: str = 'default') -> List[Dict]:
+        """Track a new spin of a table in its rolling window counts, gap index and bias monitor row
+        
+        Returns any bias alerts raised by the spin.
+        """
+        if table not in self.window_counters:
+            self.window_counters[table] = WindowCounter(100)
+            self.gap_indexes[table] = GapIndex()
+        self.window_counters[table].update(number)
+        self.gap_indexes[table].update(number)
+        return self.bias_monitor.update(table, number)
         
     def create_roulette_number(self, number: int, timestamp: datetime) -> RouletteNumber:
         """Create a RouletteNumber object with full metadata"""
@@ -97,57 +124,48 @@ class MathematicalAnalyzer:
             timestamp=timestamp
         )
     
-    def analyze_sequence(self, numbers: List[int], window_size: int = 5) -> Dict:
+    def analyze_sequence(self, numbers: Union[SpinArray, List[int]], window_size: int = 5) -> Dict:
         """Analyze number sequences for patterns"""
-        sequences = defaultdict(int)
-        for i in range(len(numbers) - window_size + 1):
-            seq = tuple(numbers[i:i + window_size])
-            sequences[seq] += 1
-            
+        if isinstance(numbers, SpinArray):
+            numbers = numbers.numbers
         # Find most common sequences
-        common_sequences = sorted(
-            sequences.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:10]
+        top = mine_sequences(numbers, window_size, window_size, top_k=10, min_count=1)[window_size]
+        common_sequences = [(seq['sequence'], seq['count']) for seq in top]
         
         return {
             'sequences': dict(common_sequences),
             'most_frequent': common_sequences[0] if common_sequences else None
         }
     
-    def analyze_sector_distribution(self, numbers: List[RouletteNumber]) -> Dict:
+    def analyze_sector_distribution(self, numbers: Spins) -> Dict:
         """Analyze sector distribution and trends"""
-        sector_counts = defaultdict(int)
-        sector_sequences = []
-        
-        for num in numbers:
-            sector_counts[num.sector] += 1
-            sector_sequences.append(num.sector)
+        spins = as_spin_array(numbers)
+        sectors = spins.dozen
         
         # Calculate sector probabilities
-        total = len(numbers)
+        total = len(spins)
+        sector_counts = np.bincount(sectors, minlength=len(DOZEN_NAMES))
         sector_probs = {
-            sector: count/total 
-            for sector, count in sector_counts.items()
+            DOZEN_NAMES[code]: int(count)/total 
+            for code, count in enumerate(sector_counts) if count > 0
         }
         
-        # Detect sector streaks
-        current_streak = {'sector': None, 'count': 0}
+        # Detect sector streaks from run lengths
         max_streak = {'sector': None, 'count': 0}
-        
-        for sector in sector_sequences:
-            if sector == current_streak['sector']:
-                current_streak['count'] += 1
-                if current_streak['count'] > max_streak['count']:
-                    max_streak = current_streak.copy()
-            else:
-                current_streak = {'sector': sector, 'count': 1}
+        if total:
+            run_starts = np.flatnonzero(np.diff(sectors, prepend=-1))
+            run_lengths = np.diff(np.append(run_starts, total))
+            longest = int(np.argmax(run_lengths))
+            if run_lengths[longest] > 1:
+                max_streak = {
+                    'sector': DOZEN_NAMES[sectors[run_starts[longest]]],
+                    'count': int(run_lengths[longest])
+                }
         
         return {
             'distributions': sector_probs,
             'max_streak': max_streak,
-            'current_trend': self._detect_sector_trend(sector_sequences[-10:])
+            'current_trend': self._detect_sector_trend(spins[-10:].labels('dozen'))
         }
     
     def _detect_sector_trend(self, recent_sectors: List[str]) -> str:
@@ -172,28 +190,23 @@ class MathematicalAnalyzer:
         else:
             return "decreasing"
     
-    def analyze_time_patterns(self, numbers: List[RouletteNumber]) -> Dict:
+    def analyze_time_patterns(self, numbers: Spins) -> Dict:
         """Analyze temporal patterns in number occurrence"""
-        time_diffs = []
-        number_times = defaultdict(list)
-        
-        for i in range(1, len(numbers)):
-            diff = (numbers[i].timestamp - numbers[i-1].timestamp).total_seconds()
-            time_diffs.append(diff)
-            number_times[numbers[i].number].append(numbers[i].timestamp)
+        spins = as_spin_array(numbers)
+        time_diffs = np.diff(spins.epoch_ms) / 1000.0
         
         # Calculate timing statistics
-        avg_time = np.mean(time_diffs) if time_diffs else 0
-        std_time = np.std(time_diffs) if time_diffs else 0
+        avg_time = np.mean(time_diffs) if len(time_diffs) else 0
+        std_time = np.std(time_diffs) if len(time_diffs) else 0
         
         # Find numbers with regular timing
         regular_numbers = {}
-        for num, times in number_times.items():
-            if len(times) > 2:
-                time_diffs = np.diff([t.timestamp() for t in times])
-                regularity = np.std(time_diffs)
-                if regularity < std_time:
-                    regular_numbers[num] = regularity
+        later = spins[1:]
+        for num in np.flatnonzero(later.counts() > 2):
+            times = later.epoch_ms[later.numbers == num] / 1000.0
+            regularity = np.std(np.diff(times))
+            if regularity < std_time:
+                regular_numbers[int(num)] = regularity
         
         return {
             'avg_spin_time': avg_time,
@@ -202,14 +215,20 @@ class MathematicalAnalyzer:
         }
     
     def find_hot_cold_numbers(self, 
-                            numbers: List[RouletteNumber], 
-                            window: int = 100) -> Tuple[List[int], List[int]]:
-        """Identify hot and cold numbers"""
-        recent_numbers = numbers[-window:] if len(numbers) > window else numbers
-        number_freq = defaultdict(int)
+                            numbers: Optional[Spins] = None, 
+                            window: int = 100,
+                            table: str = 'default') -> Tuple[List[int], List[int]]:
+        """Identify hot and cold numbers
         
-        for num in recent_numbers:
-            number_freq[num.number] += 1
+        Without ``numbers`` the counts come straight from the table's rolling
+        window maintained by ``observe``.
+        """
+        if numbers is None:
+            counter = self.window_counters.get(table) or WindowCounter(100)
+            number_freq = counter.counts
+            window = counter.window
+        else:
+            number_freq = as_spin_array(numbers)[-window:].counts()
             
         # Calculate expected frequency
         expected_freq = window / 37
@@ -219,7 +238,7 @@ class MathematicalAnalyzer:
         cold_numbers = []
         
         for num in range(37):
-            freq = number_freq[num]
+            freq = int(number_freq[num])
             if freq > expected_freq * 1.5:
                 hot_numbers.append((num, freq))
             elif freq < expected_freq * 0.5:
@@ -230,16 +249,39 @@ class MathematicalAnalyzer:
             sorted(cold_numbers, key=lambda x: x[1])
         )
     
-    def detect_biases(self, numbers: List[RouletteNumber]) -> Dict:
-        """Detect potential biases in the wheel"""
-        number_counts = defaultdict(int)
-        total_spins = len(numbers)
+    def find_due_numbers(self, limit: int = 5, table: str = 'default') -> List[Tuple[int, int]]:
+        """Numbers of a table with the longest gap since they last appeared, with their gaps"""
+        gap_index = self.gap_indexes.get(table)
+        if gap_index is None:
+            return []
+        gaps = gap_index.gaps()
+        return [(num, int(gaps[num])) for num in gap_index.due_numbers(limit)]
+    
+    def detect_biases(self, numbers: Optional[Spins] = None, table: str = 'default') -> Dict:
+        """Detect potential biases in the wheel
         
-        for num in numbers:
-            number_counts[num.number] += 1
+        Without ``numbers`` the result comes from the streaming bias monitor
+        fed by ``observe``: the chi-square uses its running counts and the
+        bias group holds the numbers its CUSUM currently suspects.
+        """
+        if numbers is None:
+            if table not in self.bias_monitor.table_index:  # Nothing observed yet
+                return {'chi_square_stat': 0.0, 'p_value': 1.0, 'bias_detected': False, 'bias_groups': {}}
+            result = self.bias_monitor.check(table)
+            suspects = self.bias_monitor.suspect_numbers(table)
+            return {
+                'chi_square_stat': result['chi_square_stat'],
+                'p_value': result['p_value'],
+                'bias_detected': result['bias_detected'] or bool(suspects),
+                'bias_groups': {0: suspects} if suspects else {}
+            }
+        
+        spins = as_spin_array(numbers)
+        total_spins = len(spins)
+        number_counts = spins.counts()
         
         # Calculate chi-square test for uniformity
-        observed = np.array([number_counts[i] for i in range(37)])
+        observed = number_counts
         expected = np.full(37, total_spins/37)
         chi2, p_value = stats.chisquare(observed, expected)
         
@@ -263,20 +305,28 @@ class MathematicalAnalyzer:
         }
     
     def predict_patterns(self, 
-                        numbers: List[RouletteNumber],
-                        confidence_threshold: float = 0.6) -> Dict:
-        """Generate pattern-based predictions"""
+                        numbers: Spins,
+                        confidence_threshold: float = 0.6,
+                        table: Optional[str] = None) -> Dict:
+        """Generate pattern-based predictions
+        
+        When ``table`` has been fed through ``observe`` the bias check reads
+        the monitor's full-history state instead of testing the last 20 spins.
+        """
         if len(numbers) < 20:
             return {'confidence': 0, 'predictions': []}
             
-        recent = numbers[-20:]
+        recent = as_spin_array(numbers)[-20:]
         
         # Analyze various patterns
-        sequence_analysis = self.analyze_sequence([n.number for n in recent])
+        sequence_analysis = self.analyze_sequence(recent)
         sector_analysis = self.analyze_sector_distribution(recent)
         time_analysis = self.analyze_time_patterns(recent)
         hot_cold = self.find_hot_cold_numbers(recent)
-        biases = self.detect_biases(recent)
+        if table is not None and table in self.bias_monitor.table_index:
+            biases = self.detect_biases(table=table)
+        else:
+            biases = self.detect_biases(recent)
         
         # Generate predictions based on pattern strength
         predictions = []
@@ -4,10 +4,12 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
-import tensorflow as tf
 from datetime import datetime, timedelta
 import json
 from ..database.database import DatabaseManager
+from ..ml.incremental import continue_training, new_rows
+from .features import FEATURE_NAMES, build_training_set, window_features
+from .backtest import WalkForwardBacktester
 
 class RouletteAnalyzer:
     def __init__(self):
@@ -18,75 +20,40 @@ class RouletteAnalyzer:
             'neural_network': None
         }
         self.feature_importance = {}
+        # Spins the in-memory models were trained on; the models themselves are
+        # never saved, so neither is this
+        self.watermark = 0
         
     def prepare_features(self, numbers, window_size=10):
-        """Prepare features for prediction"""
-        features = []
-        targets = []
+        """Prepare features for prediction
         
-        for i in range(len(numbers) - window_size):
-            # Historical numbers
-            window = numbers[i:i+window_size]
-            
-            # Calculate features
-            feature_vector = [
-                np.mean(window),  # Average
-                np.std(window),   # Standard deviation
-                max(window),      # Maximum
-                min(window),      # Minimum
-                self._calculate_sector_ratios(window),  # Sector distribution
-                self._calculate_color_ratios(window),   # Color distribution
-                self._calculate_even_odd_ratio(window), # Even/Odd ratio
-                self._calculate_high_low_ratio(window)  # High/Low ratio
-            ]
-            
-            features.append(feature_vector)
-            targets.append(numbers[i+window_size])
-            
-        return np.array(features), np.array(targets)
-        
-    def _calculate_sector_ratios(self, numbers):
-        """Calculate ratios of numbers in different sectors"""
-        sectors = {
-            'first_12': sum(1 for n in numbers if 1 <= n <= 12),
-            'second_12': sum(1 for n in numbers if 13 <= n <= 24),
-            'third_12': sum(1 for n in numbers if 25 <= n <= 36),
-            'zero': sum(1 for n in numbers if n == 0)
-        }
-        total = len(numbers)
-        return [count/total for count in sectors.values()]
-        
-    def _calculate_color_ratios(self, numbers):
-        """Calculate red/black ratios"""
-        red_numbers = [1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36]
-        red_count = sum(1 for n in numbers if n in red_numbers)
-        black_count = sum(1 for n in numbers if n > 0 and n not in red_numbers)
-        total = len(numbers)
-        return [red_count/total, black_count/total]
+        Returns a float32 matrix with one row per window (mean, std, max, min,
+        dozen/zero ratios, red/black ratios, even ratio, high ratio) and the
+        number that followed each window as targets.
+        """
+        return build_training_set(numbers, window_size)
         
-    def _calculate_even_odd_ratio(self, numbers):
-        """Calculate even/odd ratio"""
-        even_count = sum(1 for n in numbers if n > 0 and n % 2 == 0)
-        return even_count / len(numbers)
+    def train_models(self, training_data=None, incremental=False):
+        """Train prediction models
         
-    def _calculate_high_low_ratio(self, numbers):
-        """Calculate high/low number ratio"""
-        high_count = sum(1 for n in numbers if n > 18)
-        return high_count / len(numbers)
-        
-    def train_models(self, training_data=None):
-        """Train prediction models"""
+        With ``incremental=True`` and trained models at hand, only spins added
+        since the last training are used: the forest grows extra trees
+        (``warm_start``) and the network runs a few more epochs.
+        """
         try:
             if training_data is None:
-                # Get data from database
-                data = self.db.get_website_data(url='roulette_spins')
-                if not data:
+                # Get data from the spin store
+                numbers = self.db.spins.numbers()
+                if len(numbers) == 0:
                     raise ValueError("No training data available")
-                    
-                numbers = [d.content['number'] for d in data]
             else:
                 numbers = training_data
                 
+            if incremental:
+                result = self._update_models(numbers)
+                if result is not None:
+                    return result
+                
             # Prepare features
             X, y = self.prepare_features(numbers)
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
@@ -102,18 +69,7 @@ class RouletteAnalyzer:
             rf_accuracy = accuracy_score(y_test, rf_pred)
             
             # Train Neural Network
-            nn_model = tf.keras.Sequential([
-                tf.keras.layers.Dense(64, activation='relu', input_shape=(X_train.shape[1],)),
-                tf.keras.layers.Dropout(0.2),
-                tf.keras.layers.Dense(32, activation='relu'),
-                tf.keras.layers.Dropout(0.2),
-                tf.keras.layers.Dense(37, activation='softmax')  # 37 possible outcomes (0-36)
-            ])
-            
-            nn_model.compile(optimizer='adam',
-                           loss='sparse_categorical_crossentropy',
-                           metrics=['accuracy'])
-                           
+            nn_model = self._build_neural_network(X_train.shape[1])
             nn_model.fit(X_train_scaled, y_train, epochs=50, batch_size=32, verbose=0)
             nn_accuracy = nn_model.evaluate(X_test_scaled, y_test, verbose=0)[1]
             
@@ -129,6 +85,7 @@ class RouletteAnalyzer:
             # Save models to database
             self._save_model('random_forest', rf_model, {'accuracy': rf_accuracy})
             self._save_model('neural_network', nn_model, {'accuracy': nn_accuracy})
+            self.watermark = len(numbers)
             
             return {
                 'random_forest_accuracy': rf_accuracy,
@@ -140,6 +97,41 @@ class RouletteAnalyzer:
             print(f"Error training models: {str(e)}")
             return None
             
+    def _update_models(self, numbers, window_size=10, extra_trees=10, epochs=5):
+        """Continue training on spins after the watermark, or None if a full retrain is needed"""
+        if self.models['random_forest'] is None or self.models['neural_network'] is None:
+            return None
+        rows = new_rows(len(numbers), self.watermark, context=window_size)
+        if rows is None:
+            return None
+            
+        # The context rows make the first new window end right before the first new spin
+        X, y = self.prepare_features(numbers[rows], window_size)
+        if len(y) == 0:
+            return {'new_spins': 0}
+        X_scaled = self.scaler.transform(X)
+        continue_training(self.models['random_forest'], X_scaled, y, extra_trees=extra_trees)
+        continue_training(self.models['neural_network'], X_scaled, y, epochs=epochs)
+        self.watermark = len(numbers)
+        
+        return {'new_spins': len(y), 'watermark': len(numbers)}
+        
+    def _build_neural_network(self, input_dim):
+        """Build the compiled softmax network over the window features"""
+        import tensorflow as tf
+        nn_model = tf.keras.Sequential([
+            tf.keras.layers.Dense(64, activation='relu', input_shape=(input_dim,)),
+            tf.keras.layers.Dropout(0.2),
+            tf.keras.layers.Dense(32, activation='relu'),
+            tf.keras.layers.Dropout(0.2),
+            tf.keras.layers.Dense(37, activation='softmax')  # 37 possible outcomes (0-36)
+        ])
+        
+        nn_model.compile(optimizer='adam',
+                       loss='sparse_categorical_crossentropy',
+                       metrics=['accuracy'])
+        return nn_model
+        
     def predict_next(self, recent_numbers, model_type='ensemble'):
         """Predict next number"""
         try:
@@ -147,7 +139,7 @@ class RouletteAnalyzer:
                 raise ValueError("Need at least 10 recent numbers for prediction")
                 
             # Prepare features
-            X, _ = self.prepare_features([recent_numbers[-10:]])
+            X = window_features(recent_numbers[-10:], window_size=10)
             X_scaled = self.scaler.transform(X)
             
             predictions = {}
@@ -206,31 +198,60 @@ class RouletteAnalyzer:
             metrics=metrics
         )
         
-    def analyze_prediction_accuracy(self, window_size=100):
-        """Analyze prediction accuracy over time"""
+    def analyze_prediction_accuracy(self, window_size=100, retrain_every=5000,
+                                    table=None, results_dir=None):
+        """Analyze prediction accuracy over time with a walk-forward backtest
+        
+        The models are retrained every ``retrain_every`` windows on the history
+        before that point (at least ``window_size`` windows) and score each
+        following segment in one batch, so no prediction sees its own future.
+        Pass ``results_dir`` to keep the run for later comparison.
+        """
         try:
-            data = self.db.get_website_data(url='roulette_spins')
-            if not data or len(data) < window_size:
+            numbers = self.db.spins.numbers(table)
+            if len(numbers) < window_size:
                 return None
                 
-            numbers = [d.content['number'] for d in data]
-            predictions = []
-            
-            for i in range(len(numbers) - window_size):
-                window = numbers[i:i+window_size]
-                pred = self.predict_next(window)
-                if pred:
-                    actual = numbers[i+window_size]
-                    predictions.append({
-                        'actual': actual,
-                        'predicted': pred['predictions'],
-                        'accuracy': any(p == actual for p in pred['predictions'].values())
-                    })
-                    
+            backtester = WalkForwardBacktester(
+                {
+                    'random_forest': lambda: RandomForestClassifier(
+                        n_estimators=100, random_state=42, n_jobs=-1),
+                    'neural_network': lambda: self._build_neural_network(len(FEATURE_NAMES))
+                },
+                window_size=10,
+                retrain_every=retrain_every,
+                min_train=window_size,
+                results_dir=results_dir
+            )
+            walk = backtester.predict(numbers)
+            actual = walk['actual']
+            predicted = {
+                name: np.argmax(probabilities, axis=1)
+                for name, probabilities in walk['probabilities'].items()
+            }
+            hits = np.zeros(len(actual), dtype=bool)
+            for values in predicted.values():
+                hits |= values == actual
+                
+            result = backtester.summarize(walk, table or 'all')
+            if results_dir is not None:
+                backtester.save({'config': backtester.config(),
+                                 'created_at': datetime.now().isoformat(),
+                                 'tables': {table or 'all': result}})
+                
+            names = list(predicted)
             return {
-                'total_predictions': len(predictions),
-                'accuracy_rate': sum(p['accuracy'] for p in predictions) / len(predictions),
-                'prediction_history': predictions
+                'total_predictions': int(len(actual)),
+                'accuracy_rate': float(hits.mean()) if len(actual) else 0.0,
+                'models': result['models'],
+                'prediction_history': [
+                    {
+                        'actual': int(actual[i]),
+                        'predicted': {name: int(predicted[name][i]) for name in names},
+                        'accuracy': bool(hits[i])
+                    }
+                    for i in range(len(actual))
+                ]
             }
             
         except Exception as e:
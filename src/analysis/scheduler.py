@@ -0,0 +1,262 @@
+import re
+import json
+import time
+import logging
+import numpy as np
+import concurrent.futures
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from scipy import stats
+from .spin_array import SpinArray
+from .math_patterns import MathematicalAnalyzer
+
+_ENTRY_PATTERN = re.compile(r"\{(.*?)\}", re.S)
+_FIELD_PATTERN = re.compile(r"(\w+)\s*:\s*(?:'([^']*)'|\"([^\"]*)\"|(true|false))")
+
+def _parse_list_js(path: Path) -> List[Dict]:
+    """Pull table entries out of a ``roulette/list.*.js`` file without a JS parser"""
+    tables = []
+    for entry in _ENTRY_PATTERN.findall(path.read_text(encoding='utf-8')):
+        fields = {}
+        for name, single, double, flag in _FIELD_PATTERN.findall(entry):
+            fields[name] = flag == 'true' if flag else (single or double)
+        if 'redisKey' not in fields or fields.get('use') is False:
+            continue
+        tables.append({
+            'key': fields['redisKey'],
+            'provider': fields.get('providerAlias', 'unknown'),
+            'description': fields.get('description', ''),
+            'path': fields.get('path', '')
+        })
+    return tables
+
+def _parse_scraper_config(config_dir: Path) -> List[Dict]:
+    """Tables of every provider configured in ``roulette_scraper/config``"""
+    sites_file = config_dir / "sites.json"
+    if not sites_file.exists():
+        return []
+    with open(sites_file, 'r') as f:
+        providers = json.load(f).get('providers', {})
+
+    tables = []
+    for alias, provider in providers.items():
+        provider_file = config_dir / "providers" / provider.get('config_file', f"{alias}.json")
+        if not provider_file.exists():
+            continue
+        with open(provider_file, 'r') as f:
+            for table in json.load(f).get('tables', []):
+                tables.append({
+                    'key': f"{provider['id']}-{table['id']}",
+                    'provider': alias,
+                    'description': table.get('description', ''),
+                    'path': table.get('path', '')
+                })
+    return tables
+
+def load_table_catalog(base_path: Union[str, Path]) -> List[Dict]:
+    """List every known table from ``roulette/list.*.js`` and the scraper config
+
+    Tables are keyed by their ``redisKey`` (``<providerId>-<gameId>``); the
+    first source to mention a key wins.
+    """
+    base_path = Path(base_path)
+    tables = {}
+    for path in sorted((base_path / "roulette").glob("list.*.js")):
+        for table in _parse_list_js(path):
+            tables.setdefault(table['key'], table)
+    for table in _parse_scraper_config(base_path / "roulette_scraper" / "config"):
+        tables.setdefault(table['key'], table)
+    return list(tables.values())
+
+_analyzer = None
+
+def analyze_table(spins: SpinArray) -> Dict:
+    """Default per-table analysis run inside the workers"""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = MathematicalAnalyzer()
+
+    counts = spins.counts()
+    chi2, p_value = stats.chisquare(counts) if len(spins) else (0.0, 1.0)
+    hot, cold = _analyzer.find_hot_cold_numbers(spins)
+    return {
+        'total_spins': len(spins),
+        'frequency': counts.tolist(),
+        'chi_square_stat': float(chi2),
+        'p_value': float(p_value),
+        'sectors': _analyzer.analyze_sector_distribution(spins) if len(spins) else {},
+        'hot_numbers': hot[:5],
+        'cold_numbers': cold[:5],
+        'sequences': _analyzer.analyze_sequence(spins, 3)['sequences'] if len(spins) >= 3 else {}
+    }
+
+def _analyze_partition(numbers_name: str, epoch_name: str, rows: int,
+                       tables: List[Tuple[str, int, int]],
+                       analysis: Callable[[SpinArray], Dict]) -> Dict[str, Dict]:
+    """Worker entry point: view the shared columns and analyze a group of tables"""
+    numbers_block = shared_memory.SharedMemory(name=numbers_name)
+    epoch_block = shared_memory.SharedMemory(name=epoch_name)
+    try:
+        numbers = np.ndarray((rows,), dtype=np.int8, buffer=numbers_block.buf)
+        epoch_ms = np.ndarray((rows,), dtype=np.int64, buffer=epoch_block.buf)
+        results = {}
+        spins = None
+        for table, start, length in tables:
+            spins = SpinArray(numbers[start:start + length], epoch_ms[start:start + length])
+            try:
+                results[table] = analysis(spins)
+            except Exception as e:
+                logging.error(f"Error analyzing table {table}: {str(e)}")
+                results[table] = {'error': str(e)}
+        # Views must go before the blocks can close
+        del numbers, epoch_ms, spins
+        return results
+    finally:
+        numbers_block.close()
+        epoch_block.close()
+
+class AnalysisScheduler:
+    """Fans per-table analysis out across a process pool
+
+    Spins of every table are laid out contiguously in two shared-memory blocks
+    (numbers and timestamps), so workers receive only block names and
+    ``(table, offset, length)`` triples instead of pickled arrays. Tables are
+    balanced across partitions by spin count and results are rolled up per
+    provider: the provider the table's spins were stored under, or the
+    ``catalog`` entry for tables stored without one.
+    """
+
+    def __init__(self, spin_store, system_manager=None,
+                 max_workers: Optional[int] = None,
+                 catalog: Optional[Sequence[Dict]] = None):
+        self.store = spin_store
+        self.system_manager = system_manager
+        self._max_workers = max_workers
+        self.providers = {t['key']: t['provider'] for t in (catalog or [])}
+        self.table_providers: Dict[str, str] = {}
+        self.last_run: Dict = {}
+
+    @property
+    def max_workers(self) -> int:
+        """The explicit worker count, else the size of the SystemManager's pool"""
+        if self._max_workers is not None:
+            return self._max_workers
+        if self.system_manager is not None:
+            return self.system_manager.process_workers
+        return 2
+
+    def _executor(self):
+        """The SystemManager's pool when available, else a private one"""
+        if self.system_manager is not None:
+            return self.system_manager.process_pool, False
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers), True
+
+    def _layout(self, tables: Optional[Sequence[str]]):
+        """Group spins by table and return the sorted columns plus table slices"""
+        self.store.refresh_catalog()  # Tables registered by collectors in other processes
+        columns = self.store.read()
+        table_ids = self.store.tables()
+        wanted = table_ids if tables is None else {t: table_ids[t] for t in tables if t in table_ids}
+
+        order = np.argsort(columns["table_id"], kind="stable")
+        sorted_ids = columns["table_id"][order]
+        provider_ids = columns["provider_id"][order]
+        provider_names = self.store.key_names("providers")
+        slices = []
+        for table, table_id in wanted.items():
+            start = int(np.searchsorted(sorted_ids, table_id, side="left"))
+            end = int(np.searchsorted(sorted_ids, table_id, side="right"))
+            if end > start:
+                slices.append((table, start, end - start))
+                provider = provider_names.get(int(np.bincount(provider_ids[start:end]).argmax()))
+                if provider is not None and provider != self.store.DEFAULT_TABLE:
+                    self.table_providers[table] = provider
+        return columns["number"][order], columns["epoch_ms"][order], slices
+
+    def _partition(self, slices: List[Tuple[str, int, int]]) -> List[List[Tuple[str, int, int]]]:
+        """Greedy largest-first split into a few partitions per worker"""
+        count = min(len(slices), self.max_workers * 4)
+        partitions = [[] for _ in range(count)]
+        loads = np.zeros(count, dtype=np.int64)
+        for table in sorted(slices, key=lambda s: -s[2]):
+            target = int(np.argmin(loads))
+            partitions[target].append(table)
+            loads[target] += table[2]
+        return partitions
+
+    def run(self, tables: Optional[Sequence[str]] = None,
+            analysis: Callable[[SpinArray], Dict] = analyze_table) -> Dict:
+        """Analyze the given tables (all stored tables by default)
+
+        ``analysis`` must be a module-level function so workers can import it.
+        """
+        started = time.perf_counter()
+        numbers, epoch_ms, slices = self._layout(tables)
+        results = {}
+        blocks = []
+        try:
+            if slices:
+                numbers_block = shared_memory.SharedMemory(create=True, size=max(numbers.nbytes, 1))
+                blocks.append(numbers_block)
+                epoch_block = shared_memory.SharedMemory(create=True, size=max(epoch_ms.nbytes, 1))
+                blocks.append(epoch_block)
+                np.ndarray(numbers.shape, dtype=np.int8, buffer=numbers_block.buf)[:] = numbers
+                np.ndarray(epoch_ms.shape, dtype=np.int64, buffer=epoch_block.buf)[:] = epoch_ms
+
+                executor, owned = self._executor()
+                try:
+                    futures = [
+                        executor.submit(_analyze_partition, numbers_block.name, epoch_block.name,
+                                        len(numbers), partition, analysis)
+                        for partition in self._partition(slices)
+                    ]
+                    for future in concurrent.futures.as_completed(futures):
+                        try:
+                            results.update(future.result())
+                        except Exception as e:
+                            logging.error(f"Error in analysis worker: {str(e)}")
+                finally:
+                    if owned:
+                        executor.shutdown(wait=True)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        elapsed = time.perf_counter() - started
+        self.last_run = {
+            'tables': results,
+            'providers': self.aggregate(results),
+            'tables_analyzed': len(results),
+            'elapsed_seconds': elapsed,
+            'tables_per_second': len(results) / elapsed if elapsed > 0 else 0.0
+        }
+        return self.last_run
+
+    def aggregate(self, results: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Roll per-table results up to their providers"""
+        providers = {}
+        for table, result in results.items():
+            if 'error' in result:
+                continue
+            provider = self.table_providers.get(table) or self.providers.get(table, 'unknown')
+            summary = providers.setdefault(provider, {
+                'tables': 0,
+                'total_spins': 0,
+                'frequency': np.zeros(37, dtype=np.int64),
+                'biased_tables': []
+            })
+            summary['tables'] += 1
+            summary['total_spins'] += result.get('total_spins', 0)
+            if 'frequency' in result:
+                summary['frequency'] += np.asarray(result['frequency'], dtype=np.int64)
+            if result.get('p_value', 1.0) < 0.05:
+                summary['biased_tables'].append(table)
+
+        for summary in providers.values():
+            frequency = summary['frequency']
+            summary['frequency'] = frequency.tolist()
+            summary['hottest'] = int(np.argmax(frequency)) if frequency.any() else None
+        return providers
@@ -0,0 +1,117 @@
+import heapq
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+# Every n-gram of up to 12 numbers packs exactly into an int64 (37**12 < 2**63),
+# so n-grams are compared by code without hashing or collisions.
+MAX_LENGTH = 12
+
+def _check_lengths(min_length: int, max_length: int):
+    if not 1 <= min_length <= max_length <= MAX_LENGTH:
+        raise ValueError(f"Sequence lengths must satisfy 1 <= min <= max <= {MAX_LENGTH}")
+
+def _iter_codes(numbers: np.ndarray, min_length: int, max_length: int):
+    """Yield (length, codes) with codes[i] encoding numbers[i:i+length] in base 37"""
+    codes = numbers.astype(np.int64)
+    for length in range(1, max_length + 1):
+        if length > 1:
+            if len(numbers) < length:
+                return
+            codes = codes[:-1] * 37 + numbers[length - 1:]
+        if length >= min_length:
+            yield length, codes
+
+def decode(code: int, length: int) -> tuple:
+    """Turn an n-gram code back into its sequence of numbers"""
+    sequence = []
+    for _ in range(length):
+        code, number = divmod(int(code), 37)
+        sequence.append(number)
+    return tuple(reversed(sequence))
+
+def _rank(codes: np.ndarray, counts: np.ndarray, last_seen: np.ndarray,
+          length: int, top_k: Optional[int], min_count: int) -> List[Dict]:
+    keep = counts >= min_count
+    codes, counts, last_seen = codes[keep], counts[keep], last_seen[keep]
+    # Most frequent first, most recent breaking ties
+    order = np.lexsort((-last_seen, -counts))
+    if top_k is not None:
+        order = order[:top_k]
+    return [
+        {"sequence": decode(codes[i], length), "count": int(counts[i]), "last_seen": int(last_seen[i])}
+        for i in order
+    ]
+
+def mine_sequences(numbers: Sequence[int], min_length: int = 2, max_length: int = 5,
+                   top_k: Optional[int] = 5, min_count: int = 2) -> Dict[int, List[Dict]]:
+    """Find the most repeated sequences of each length in one pass per length
+
+    Returns ``{length: [{"sequence", "count", "last_seen"}, ...]}`` where
+    ``last_seen`` is the start index of the latest occurrence. Pass
+    ``top_k=None`` to get every sequence seen at least ``min_count`` times.
+    """
+    _check_lengths(min_length, max_length)
+    numbers = np.asarray(numbers, dtype=np.int64)
+    results = {length: [] for length in range(min_length, max_length + 1)}
+
+    for length, codes in _iter_codes(numbers, min_length, max_length):
+        # Unique over the reversed codes gives the index of each code's last occurrence
+        unique, reverse_index, counts = np.unique(codes[::-1], return_index=True, return_counts=True)
+        last_seen = len(codes) - 1 - reverse_index
+        results[length] = _rank(unique, counts, last_seen, length, top_k, min_count)
+
+    return results
+
+class SequenceMiner:
+    """Incrementally maintained n-gram counts over a growing spin history
+
+    Each extension only encodes the n-grams that end in the new spins, so the
+    cost is proportional to the number of new spins, not the history size.
+    """
+
+    def __init__(self, min_length: int = 2, max_length: int = 5):
+        _check_lengths(min_length, max_length)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.total = 0
+        self.tail = np.empty(0, dtype=np.int64)  # Last max_length - 1 spins
+        self.counts = {length: Counter() for length in range(min_length, max_length + 1)}
+        self.last_seen = {length: {} for length in range(min_length, max_length + 1)}
+
+    def extend(self, numbers: Sequence[int]):
+        """Add new spins"""
+        numbers = np.asarray(numbers, dtype=np.int64)
+        if numbers.size == 0:
+            return
+        buffer = np.concatenate((self.tail, numbers))
+        offset = self.total - len(self.tail)  # History index of buffer[0]
+
+        for length, codes in _iter_codes(buffer, self.min_length, self.max_length):
+            # Skip n-grams that were complete before these spins arrived
+            start = max(len(self.tail) - length + 1, 0)
+            codes = codes[start:]
+            if codes.size == 0:
+                continue
+            unique, reverse_index, counts = np.unique(codes[::-1], return_index=True, return_counts=True)
+            last_seen = offset + start + len(codes) - 1 - reverse_index
+            unique = unique.tolist()
+            self.counts[length].update(dict(zip(unique, counts.tolist())))
+            self.last_seen[length].update(zip(unique, last_seen.tolist()))
+
+        self.total += len(numbers)
+        self.tail = buffer[-(self.max_length - 1):] if self.max_length > 1 else buffer[:0]
+
+    def append(self, number: int):
+        self.extend([number])
+
+    def top_k(self, length: int, k: Optional[int] = 5, min_count: int = 2) -> List[Dict]:
+        """Most repeated sequences of a given length"""
+        counts = self.counts[length]
+        last_seen = self.last_seen[length]
+        candidates = [(count, last_seen[code], code) for code, count in counts.items() if count >= min_count]
+        ranked = heapq.nlargest(k, candidates) if k is not None else sorted(candidates, reverse=True)
+        return [
+            {"sequence": decode(code, length), "count": count, "last_seen": seen}
+            for count, seen, code in ranked
+        ]
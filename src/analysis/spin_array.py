@@ -0,0 +1,102 @@
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+from .wheel import CATEGORIES
+
+class SpinArray:
+    """Compact spin history held as parallel NumPy arrays
+
+    ``numbers`` is int8 and ``epoch_ms`` int64 wall-clock milliseconds (the
+    spin store's layout). Category codes such as color or dozen are derived
+    from the wheel lookup tables once, on first use, and shared by slices.
+    """
+
+    def __init__(self, numbers, epoch_ms=None, table_ids=None):
+        self.numbers = np.asarray(numbers, dtype=np.int8)
+        if epoch_ms is None:
+            epoch_ms = np.zeros(len(self.numbers), dtype=np.int64)
+        self.epoch_ms = np.asarray(epoch_ms, dtype=np.int64)
+        if table_ids is None:
+            table_ids = np.zeros(len(self.numbers), dtype=np.int16)
+        self.table_ids = np.asarray(table_ids, dtype=np.int16)
+        if not len(self.numbers) == len(self.epoch_ms) == len(self.table_ids):
+            raise ValueError("SpinArray columns must have the same length")
+        self._codes: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_store(cls, store, table: Optional[str] = None) -> "SpinArray":
+        """View the spin store's columns; zero-copy when no table filter is given"""
+        columns = store.read(table=table)
+        return cls(columns["number"], columns["epoch_ms"], columns["table_id"])
+
+    @classmethod
+    def from_numbers(cls, numbers: Sequence[int], timestamps=None) -> "SpinArray":
+        """Build from plain numbers and optional datetimes"""
+        epoch_ms = None
+        if timestamps is not None:
+            epoch_ms = np.array(timestamps, dtype="datetime64[ms]").astype(np.int64)
+        return cls(numbers, epoch_ms)
+
+    @classmethod
+    def from_roulette_numbers(cls, spins: Sequence) -> "SpinArray":
+        """Convert a list of RouletteNumber objects"""
+        return cls.from_numbers([s.number for s in spins], [s.timestamp for s in spins])
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return int(self.numbers[index])
+        sliced = SpinArray(self.numbers[index], self.epoch_ms[index], self.table_ids[index])
+        sliced._codes = {name: codes[index] for name, codes in self._codes.items()}
+        return sliced
+
+    def codes(self, category: str) -> np.ndarray:
+        """Category codes (see wheel.CATEGORIES) for every spin, computed once"""
+        if category not in self._codes:
+            table, _ = CATEGORIES[category]
+            self._codes[category] = table[self.numbers]
+        return self._codes[category]
+
+    def labels(self, category: str) -> list:
+        """Category labels (e.g. 'red') for every spin"""
+        _, labels = CATEGORIES[category]
+        return [labels[code] for code in self.codes(category)]
+
+    @property
+    def color(self) -> np.ndarray:
+        return self.codes('color')
+
+    @property
+    def dozen(self) -> np.ndarray:
+        return self.codes('dozen')
+
+    @property
+    def column(self) -> np.ndarray:
+        return self.codes('column')
+
+    @property
+    def parity(self) -> np.ndarray:
+        return self.codes('odd_even')
+
+    @property
+    def high_low(self) -> np.ndarray:
+        return self.codes('high_low')
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Timestamps as datetime64[ms], viewing the epoch column without copying"""
+        return self.epoch_ms.view("datetime64[ms]")
+
+    def counts(self) -> np.ndarray:
+        """Per-number hit counts"""
+        return np.bincount(self.numbers, minlength=37)
+
+def as_spin_array(spins) -> SpinArray:
+    """Accept a SpinArray, a list of RouletteNumber objects or plain numbers"""
+    if isinstance(spins, SpinArray):
+        return spins
+    if len(spins) and hasattr(spins[0], 'number'):
+        return SpinArray.from_roulette_numbers(spins)
+    return SpinArray.from_numbers(spins)
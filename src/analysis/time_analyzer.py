@@ -5,6 +5,7 @@ from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import json
 import logging
+from .sequence_miner import mine_sequences
 
 class TimeAnalyzer:
     """Analyzes time-based patterns and trends in roulette data"""
@@ -31,9 +32,13 @@ class TimeAnalyzer:
             window = self.time_windows[time_window]
             now = datetime.now()
             
-            # Filter data for time window
-            mask = (data['timestamp'] >= (now - window))
-            window_data = data[mask].copy()
+            # Filter data for time window; sorted data can seek instead of masking
+            cutoff = now - window
+            timestamps = data['timestamp']
+            if timestamps.is_monotonic_increasing:
+                window_data = data.iloc[timestamps.searchsorted(cutoff):].copy()
+            else:
+                window_data = data[timestamps >= cutoff].copy()
             
             if window_data.empty:
                 return {}
@@ -78,24 +83,15 @@ class TimeAnalyzer:
     
     def _find_sequences(self, numbers: List[int], min_length: int = 3) -> List[Dict]:
         """Find recurring number sequences"""
-        sequences = []
-        n = len(numbers)
-        
-        for i in range(n - min_length + 1):
-            seq = numbers[i:i + min_length]
-            # Look for this sequence in the rest of the numbers
-            count = 0
-            for j in range(i + 1, n - min_length + 1):
-                if numbers[j:j + min_length] == seq:
-                    count += 1
-            if count > 0:
-                sequences.append({
-                    "sequence": seq,
-                    "occurrences": count + 1,
-                    "last_seen": i
-                })
-        
-        return sorted(sequences, key=lambda x: x['occurrences'], reverse=True)[:5]
+        top = mine_sequences(numbers, min_length, min_length, top_k=5)[min_length]
+        return [
+            {
+                "sequence": list(seq["sequence"]),
+                "occurrences": seq["count"],
+                "last_seen": seq["last_seen"]
+            }
+            for seq in top
+        ]
     
     def _analyze_time_of_day(self, data: pd.DataFrame) -> Dict:
         """Analyze patterns based on time of day"""
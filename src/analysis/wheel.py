@@ -0,0 +1,37 @@
+"""37-entry lookup tables for European roulette number properties
+
+Index any table with a number (or an int array of numbers) to get its
+category code; the matching ``*_NAMES`` tuple turns codes back into the
+labels used by the scrapers and analyzers.
+"""
+import numpy as np
+
+RED_NUMBERS = (1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36)
+
+COLOR_NAMES = ('green', 'red', 'black')
+PARITY_NAMES = ('zero', 'odd', 'even')
+DOZEN_NAMES = ('zero', 'first', 'second', 'third')
+COLUMN_NAMES = ('zero', 'first', 'second', 'third')
+HIGH_LOW_NAMES = ('zero', 'low', 'high')
+
+def _table(values) -> np.ndarray:
+    table = np.array(values, dtype=np.int8)
+    table.setflags(write=False)
+    return table
+
+NUMBERS = np.arange(37)
+
+COLOR = _table([0 if n == 0 else 1 if n in RED_NUMBERS else 2 for n in NUMBERS])
+PARITY = _table([0 if n == 0 else 1 if n % 2 else 2 for n in NUMBERS])
+DOZEN = _table([0 if n == 0 else (n - 1) // 12 + 1 for n in NUMBERS])
+COLUMN = _table([0 if n == 0 else (n - 1) % 3 + 1 for n in NUMBERS])
+HIGH_LOW = _table([0 if n == 0 else 1 if n <= 18 else 2 for n in NUMBERS])
+
+# Category name -> (lookup table, code labels), keyed like RouletteScraper.categorize_number
+CATEGORIES = {
+    'color': (COLOR, COLOR_NAMES),
+    'odd_even': (PARITY, PARITY_NAMES),
+    'dozen': (DOZEN, DOZEN_NAMES),
+    'column': (COLUMN, COLUMN_NAMES),
+    'high_low': (HIGH_LOW, HIGH_LOW_NAMES)
+}
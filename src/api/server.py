@@ -1,14 +1,21 @@
-from fastapi import FastAPI, HTTPException, WebSocket
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import uvicorn
 import json
+import os
+import logging
 import asyncio
+import numpy as np
 from datetime import datetime
+from pathlib import Path
 
+from ..connectivity.spin_stream import SpinStream, sse_event
 from ..database.database import DatabaseManager
-from ..scrapers.advanced_scraper import AdvancedScraper
+from ..ml.batching import MicroBatcher
+from ..utils.lazy_import import LazyInstance, mark, log_startup_report
 
 app = FastAPI(title="AI OS API", version="1.0.0")
 
@@ -21,9 +28,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _build_scraper():
+    # Selenium and the headless browser only start with the first scrape
+    from ..scrapers.advanced_scraper import AdvancedScraper
+    return AdvancedScraper()
+
 # Initialize components
 db = DatabaseManager()
-scraper = AdvancedScraper()
+scraper = LazyInstance(_build_scraper, "scraper")
+spin_stream = SpinStream(db.spins)
+batchers: Dict[str, MicroBatcher] = {}
+batcher_lock = asyncio.Lock()
+ml_components: Dict[str, Any] = {}
 
 # Models
 class ScrapeRequest(BaseModel):
@@ -37,6 +53,15 @@ class MLPredictionRequest(BaseModel):
 class AnalysisRequest(BaseModel):
     urls: List[str]
 
+@app.on_event("startup")
+async def report_ready():
+    mark("api ready")
+    log_startup_report()
+
+@app.on_event("shutdown")
+async def close_streams():
+    await spin_stream.close()
+
 # Routes
 @app.get("/")
 async def root():
@@ -83,21 +108,91 @@ async def list_models():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _load_predictor(model_name: str):
+    """Load a model and return its batch predict function, or None if unknown
+    
+    ``ensemble`` serves the PredictionAgent's LSTM/XGBoost/LightGBM ensemble;
+    any other name is a model saved by the MLManager. Both frameworks are
+    only imported once a model is actually requested, and neural nets are
+    served from their NumPy exports so TensorFlow is not loaded at all.
+    Blocking; runs in a worker thread.
+    """
+    if model_name == "ensemble":
+        from ..prediction.agent import PredictionAgent
+        agent = PredictionAgent()
+        if not agent.load_models(inference_only=True):
+            return None
+        ml_components["agent"] = agent
+        return agent.predict_batch
+        
+    if "manager" not in ml_components:
+        from ..ml.ml_manager import MLManager
+        ml_components["manager"] = MLManager(Path(os.path.expanduser('~/AppData/Local/AI_OS')),
+                                             inference_only=True)
+    manager = ml_components["manager"]
+    if model_name not in manager.models and not manager.load_model(model_name):
+        return None
+        
+    def predict_batch(X):
+        probabilities = manager.predict(model_name, X, return_proba=True)["probabilities"]
+        return [
+            {"number": int(np.argmax(row)), "probability": float(np.max(row))}
+            for row in probabilities
+        ]
+    return predict_batch
+
+async def _get_batcher(model_name: str) -> Optional[MicroBatcher]:
+    """Build the micro-batcher of a model on its first request
+    
+    Loading happens off the event loop, and concurrent first requests wait
+    for the one batcher instead of each loading the model.
+    """
+    batcher = batchers.get(model_name)
+    if batcher is not None:
+        return batcher
+    async with batcher_lock:
+        if model_name not in batchers:
+            loop = asyncio.get_running_loop()
+            predict_batch = await loop.run_in_executor(None, _load_predictor, model_name)
+            if predict_batch is None:
+                return None
+            batchers[model_name] = MicroBatcher(predict_batch)
+        return batchers[model_name]
+
+def _feature_row(data: Dict[str, Any]) -> np.ndarray:
+    """Accept a ready feature vector or the raw columns used by PredictionAgent"""
+    if "features" in data:
+        return np.asarray(data["features"], dtype=np.float32)
+    agent = ml_components.get("agent")
+    if agent is None:
+        raise ValueError("Raw columns are only supported by the ensemble model")
+    import pandas as pd
+    return agent.prepare_features(pd.DataFrame([data]))[0]
+
 @app.post("/ml/predict")
 async def predict(request: MLPredictionRequest):
     try:
-        model = db.get_ml_model(request.model_name)
-        if not model:
+        batcher = await _get_batcher(request.model_name)
+        if batcher is None:
             raise HTTPException(status_code=404, detail="Model not found")
             
-        # Here you would load and use the model
-        # This is a placeholder
-        prediction = {"result": "Prediction placeholder"}
-        
+        prediction = await batcher.predict(_feature_row(request.data))
         return {"status": "success", "data": prediction}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/ml/stats")
+async def ml_stats():
+    """Latency percentiles and batch-size histograms of every served model"""
+    stats = {name: batcher.stats() for name, batcher in batchers.items()}
+    if "manager" in ml_components:
+        stats["registry"] = ml_components["manager"].get_registry_metrics()
+    return {"status": "success", "data": stats}
+
 # WebSocket for real-time updates
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -121,6 +216,44 @@ async def websocket_endpoint(websocket: WebSocket):
     finally:
         await websocket.close()
 
+# Spin event stream: replay from an offset, then push new spins as they are written
+@app.get("/spins")
+async def get_spins(offset: int = 0, table: Optional[str] = None, limit: int = 1000):
+    """Replay spins from ``offset``; ``next_offset`` continues where this page ended"""
+    try:
+        events, next_offset = spin_stream.read(spin_stream.resolve_offset(offset), table, min(limit, 10000))
+        return {"status": "success", "data": events, "next_offset": next_offset}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.websocket("/ws/spins")
+async def spin_websocket(websocket: WebSocket, table: Optional[str] = None,
+                         offset: Optional[int] = None, client_id: Optional[str] = None):
+    """Push spins as JSON messages; resume with ``offset`` = the last event's ``cursor``"""
+    await websocket.accept()
+    try:
+        async for event in spin_stream.subscribe(table, offset, client_id, idle_timeout=15):
+            await websocket.send_text(json.dumps(event or {"type": "keep-alive"}))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logging.error(f"Error streaming spins: {str(e)}")
+
+@app.get("/spins/stream")
+async def spin_events(request: Request, table: Optional[str] = None,
+                      offset: Optional[int] = None, client_id: Optional[str] = None):
+    """Server-Sent Events feed of spins; browsers resume through ``Last-Event-ID``"""
+    last_event_id = request.headers.get("last-event-id")
+    if offset is None and last_event_id:
+        offset = int(last_event_id)
+        
+    async def events():
+        async for event in spin_stream.subscribe(table, offset, client_id, idle_timeout=15):
+            yield sse_event(event)
+            
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 def start_server():
     """Start the FastAPI server"""
     uvicorn.run(app, host="127.0.0.1", port=8000)
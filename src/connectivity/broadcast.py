@@ -0,0 +1,212 @@
+import json
+import asyncio
+import logging
+from collections import OrderedDict
+from itertools import count
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+ALL_TOPICS = "*"
+
+def serialize(message: Dict) -> str:
+    """Compact JSON, as ``WebSocket.send_json`` would produce"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+class Subscriber:
+    """One connection's bounded send queue, drained by its own writer task
+
+    Queued messages are keyed: a message published with a ``coalesce_key``
+    replaces a still-queued message with the same key (only the newest
+    state of e.g. a table matters), everything else gets a unique key.
+    When the queue is full the oldest message is dropped, so a slow client
+    falls behind on its own instead of holding up the broadcaster.
+    """
+
+    def __init__(self, connection_id: str, send: Callable[[str], Awaitable],
+                 device_type: Optional[str] = None, max_queue: int = 256,
+                 send_timeout: Optional[float] = 10.0):
+        self.connection_id = connection_id
+        self.send = send
+        self.device_type = device_type
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.topics: Set[str] = set()
+        self.explicit = False  # Until it subscribes, a connection receives every topic
+        self.queue: "OrderedDict[object, str]" = OrderedDict()
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._sequence = count()
+        self.task: Optional[asyncio.Task] = None
+
+    def enqueue(self, payload: str, coalesce_key: Optional[str] = None) -> bool:
+        """Queue a serialized message without waiting; False if the client is gone"""
+        if self.closed:
+            return False
+        if coalesce_key is not None and coalesce_key in self.queue:
+            self.queue[coalesce_key] = payload
+            self.coalesced += 1
+            return True
+        if len(self.queue) >= self.max_queue:
+            self.queue.popitem(last=False)
+            self.dropped += 1
+        self.queue[coalesce_key if coalesce_key is not None else next(self._sequence)] = payload
+        self.ready.set()
+        return True
+
+    async def run(self, on_error: Callable[["Subscriber", Exception], None]):
+        """Writer loop: send queued messages in order until closed"""
+        try:
+            while True:
+                await self.ready.wait()
+                while self.queue:
+                    _, payload = self.queue.popitem(last=False)
+                    if self.send_timeout is None:
+                        await self.send(payload)
+                    else:
+                        await asyncio.wait_for(self.send(payload), self.send_timeout)
+                    self.sent += 1
+                self.ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.closed = True
+            on_error(self, e)
+
+    def stats(self) -> Dict:
+        return {
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "topics": sorted(self.topics)
+        }
+
+class BroadcastEngine:
+    """Topic-routed, non-blocking fan-out to many connections
+
+    ``publish`` serializes a message once and only appends it to the queues
+    of subscribed connections; per-connection writer tasks do the sending,
+    so one slow or stalled client never delays the others. Connections
+    that fail or exceed ``send_timeout`` on a send are removed.
+    """
+
+    def __init__(self, max_queue: int = 256, send_timeout: Optional[float] = 10.0):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.subscribers: Dict[str, Subscriber] = {}
+        self.topics: Dict[str, Set[str]] = {}
+        self.published = 0
+        self.logger = logging.getLogger("BroadcastEngine")
+
+    def __len__(self) -> int:
+        return len(self.subscribers)
+
+    def add(self, connection_id: str, send: Callable[[str], Awaitable],
+            device_type: Optional[str] = None) -> Subscriber:
+        """Register a connection and start its writer task
+
+        ``send`` takes one serialized (text) message, e.g.
+        ``websocket.send_text``.
+        """
+        self.remove(connection_id)
+        subscriber = Subscriber(connection_id, send, device_type, self.max_queue, self.send_timeout)
+        self.subscribers[connection_id] = subscriber
+        self._route(subscriber, [ALL_TOPICS])
+        subscriber.task = asyncio.get_running_loop().create_task(subscriber.run(self._failed))
+        return subscriber
+
+    def remove(self, connection_id: str):
+        """Stop a connection's writer task and forget its subscriptions"""
+        subscriber = self.subscribers.pop(connection_id, None)
+        if subscriber is None:
+            return
+        subscriber.closed = True
+        for topic in subscriber.topics:
+            members = self.topics.get(topic)
+            if members is not None:
+                members.discard(connection_id)
+                if not members:
+                    del self.topics[topic]
+        if subscriber.task is not None and subscriber.task is not asyncio.current_task():
+            subscriber.task.cancel()
+
+    def _failed(self, subscriber: Subscriber, error: Exception):
+        self.logger.error(f"Error sending to {subscriber.connection_id}: {str(error) or type(error).__name__}")
+        self.remove(subscriber.connection_id)
+
+    def _route(self, subscriber: Subscriber, topics: Iterable[str]):
+        for topic in topics:
+            subscriber.topics.add(topic)
+            self.topics.setdefault(topic, set()).add(subscriber.connection_id)
+
+    def subscribe(self, connection_id: str, topics: Iterable[str]):
+        """Limit a connection to ``topics`` (plus any it subscribed to before)
+
+        ``"*"`` subscribes to every topic.
+        """
+        subscriber = self.subscribers.get(connection_id)
+        if subscriber is None:
+            return
+        topics = list(topics)
+        if not subscriber.explicit:
+            subscriber.explicit = True
+            if ALL_TOPICS not in topics:
+                self.unsubscribe(connection_id, [ALL_TOPICS])
+        self._route(subscriber, topics)
+
+    def unsubscribe(self, connection_id: str, topics: Iterable[str]):
+        subscriber = self.subscribers.get(connection_id)
+        if subscriber is None:
+            return
+        for topic in topics:
+            subscriber.topics.discard(topic)
+            members = self.topics.get(topic)
+            if members is not None:
+                members.discard(connection_id)
+                if not members:
+                    del self.topics[topic]
+
+    def publish(self, topic: str, message: Dict, coalesce_key: Optional[str] = None,
+                device_types: Optional[List[str]] = None) -> int:
+        """Queue a message for every subscriber of ``topic``; returns the recipient count
+
+        Never waits on a client. With ``coalesce_key``, a queued message
+        with the same key is replaced rather than followed.
+        """
+        payload = serialize(message)
+        recipients = self.topics.get(topic, set()) | self.topics.get(ALL_TOPICS, set())
+        delivered = 0
+        for connection_id in recipients:
+            subscriber = self.subscribers.get(connection_id)
+            if subscriber is None:
+                continue
+            if device_types and subscriber.device_type not in device_types:
+                continue
+            if subscriber.enqueue(payload, coalesce_key):
+                delivered += 1
+        self.published += 1
+        return delivered
+
+    def stats(self) -> Dict:
+        """Totals across connections plus the most backed-up ones"""
+        subscribers = list(self.subscribers.values())
+        backlog = sorted(subscribers, key=lambda s: len(s.queue), reverse=True)[:10]
+        return {
+            "connections": len(subscribers),
+            "topics": {topic: len(members) for topic, members in self.topics.items()},
+            "published": self.published,
+            "sent": sum(s.sent for s in subscribers),
+            "queued": sum(len(s.queue) for s in subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+            "coalesced": sum(s.coalesced for s in subscribers),
+            "slowest": {s.connection_id: s.stats() for s in backlog if s.queue}
+        }
+
+    async def close(self):
+        """Stop every writer task"""
+        tasks = [s.task for s in self.subscribers.values() if s.task is not None]
+        for connection_id in list(self.subscribers):
+            self.remove(connection_id)
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -10,6 +10,9 @@ from typing import Dict, List, Optional, Callable
 from dataclasses import dataclass
 from pathlib import Path
 
+from .offline_queue import OfflineQueue, QueueEntry
+from .sync_protocol import ACCEPT_HEADER, accept_header, read_frames
+
 @dataclass
 class DeviceConfig:
     device_type: str
@@ -22,21 +25,33 @@ class DeviceConfig:
             self.capabilities = ["basic", "sync", "realtime"]
 
 class DeviceConnector:
-    """Handles device connectivity with the real-time server"""
+    """Handles device connectivity with the real-time server
+    
+    Outgoing work (updates from ``queue_update`` and sync requests) goes
+    through a durable ``OfflineQueue`` in ``storage_path``, so nothing is
+    lost while the device is offline or if it crashes. On reconnect the
+    backlog is drained in ``drain_batch``-sized POSTs with up to
+    ``drain_window`` in flight; failures back off exponentially.
+    """
     
     def __init__(self, 
                  server_url: str,
                  device_config: DeviceConfig,
-                 storage_path: Path):
+                 storage_path: Path,
+                 drain_batch: int = 500,
+                 drain_window: int = 4):
         self.server_url = server_url
         self.device_config = device_config
         self.storage_path = storage_path
+        self.drain_batch = drain_batch
+        self.drain_window = drain_window
         self.device_id = None
         self.access_token = None
         self.websocket = None
+        self.session: Optional[aiohttp.ClientSession] = None
         self.connected = False
         self.message_handlers = {}
-        self.sync_queue = asyncio.Queue()
+        self._queue_ready = asyncio.Event()
         
         # Setup logging
         self.logger = logging.getLogger("DeviceConnector")
@@ -45,6 +60,7 @@ class DeviceConnector:
         # Setup storage
         self.storage_path.mkdir(parents=True, exist_ok=True)
         self.sync_file = self.storage_path / "sync_status.json"
+        self.queue = OfflineQueue(self.storage_path / "offline_queue.db")
         self._load_sync_status()
         
     def _load_sync_status(self):
@@ -54,15 +70,27 @@ class DeviceConnector:
                 self.sync_status = json.load(f)
         else:
             self.sync_status = {
-                "last_sync": {},
-                "pending_updates": []
+                "last_sync": {}
             }
+        self.sync_status.setdefault("cursors", {})
+        
+        # Move the backlog of older versions into the offline queue
+        pending = self.sync_status.pop("pending_updates", None)
+        if pending:
+            self.queue.put_many(pending, kind="sync", keys=[f"sync:{item['type']}" for item in pending])
+            self._save_sync_status()
             
     def _save_sync_status(self):
         """Save sync status to storage"""
         with open(self.sync_file, 'w') as f:
             json.dump(self.sync_status, f)
             
+    def _get_session(self) -> aiohttp.ClientSession:
+        """HTTP session shared by all requests, so syncs reuse one connection"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        return self.session
+        
     async def connect(self):
         """Connect to the real-time server"""
         try:
@@ -95,23 +123,22 @@ class DeviceConnector:
             
     async def _register_device(self):
         """Register device with server"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.server_url}/api/register_device",
-                json={
-                    "device_type": self.device_config.device_type,
-                    "platform": self.device_config.platform,
-                    "version": self.device_config.version,
-                    "capabilities": self.device_config.capabilities
-                }
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    self.device_id = data["device_id"]
-                    self.access_token = data["access_token"]
-                    self.logger.info(f"Registered device: {self.device_id}")
-                else:
-                    raise Exception("Device registration failed")
+        async with self._get_session().post(
+            f"{self.server_url}/api/register_device",
+            json={
+                "device_type": self.device_config.device_type,
+                "platform": self.device_config.platform,
+                "version": self.device_config.version,
+                "capabilities": self.device_config.capabilities
+            }
+        ) as response:
+            if response.status == 200:
+                data = await response.json()
+                self.device_id = data["device_id"]
+                self.access_token = data["access_token"]
+                self.logger.info(f"Registered device: {self.device_id}")
+            else:
+                raise Exception("Device registration failed")
                     
     async def _heartbeat_loop(self):
         """Send periodic heartbeats"""
@@ -143,59 +170,114 @@ class DeviceConnector:
                 self.logger.error(f"Message handling error: {str(e)}")
                 
     async def _sync_loop(self):
-        """Handle data synchronization"""
+        """Handle data synchronization
+        
+        Drains the offline queue as soon as work is queued, and again
+        whenever backed-off entries fall due. Each sync streams everything
+        outstanding for its data type, and sync requests are keyed by
+        type, so several requests for the same type are merged into one.
+        """
         while self.connected:
             try:
-                # Process sync queue
-                while not self.sync_queue.empty():
-                    sync_item = await self.sync_queue.get()
-                    await self._sync_data(sync_item)
-                    
-                # Check for pending updates
-                if self.sync_status["pending_updates"]:
-                    update = self.sync_status["pending_updates"].pop(0)
-                    await self._sync_data(update)
-                    self._save_sync_status()
-                    
-                await asyncio.sleep(5)
+                await self._drain_queue()
+                try:
+                    await asyncio.wait_for(self._queue_ready.wait(), self.queue.next_due())
+                except asyncio.TimeoutError:
+                    pass
+                self._queue_ready.clear()
                 
             except Exception as e:
                 self.logger.error(f"Sync error: {str(e)}")
                 await asyncio.sleep(5)
                 
-    async def _sync_data(self, sync_item: Dict):
-        """Sync data with server"""
+    async def _drain_queue(self):
+        """Deliver every due queue entry, stopping at the first failure"""
+        while self.connected:
+            entries = self.queue.due(self.drain_batch * self.drain_window)
+            if not entries:
+                return
+                
+            delivered = True
+            for entry in [e for e in entries if e.kind == "sync"]:
+                if await self._sync_data(entry.item):
+                    self.queue.ack([entry])
+                else:
+                    self.queue.retry([entry])
+                    delivered = False
+                    
+            updates = [e for e in entries if e.kind == "update"]
+            batches = [updates[i:i + self.drain_batch] for i in range(0, len(updates), self.drain_batch)]
+            results = await asyncio.gather(*(self._send_updates(batch) for batch in batches))
+            for batch, sent in zip(batches, results):
+                if sent:
+                    self.queue.ack(batch)
+                else:
+                    self.queue.retry(batch)
+                    delivered = False
+            if not delivered:
+                return
+                
+    async def _send_updates(self, entries: List[QueueEntry]) -> bool:
+        """POST one batch of queued updates; the server skips keys it has already applied"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.server_url}/api/sync",
-                    headers={"Authorization": f"Bearer {self.access_token}"},
-                    json={
-                        "device_id": self.device_id,
-                        "data_type": sync_item["type"],
-                        "last_sync": self.sync_status["last_sync"].get(
-                            sync_item["type"],
-                            datetime.min.isoformat()
-                        ),
-                        "batch_size": sync_item.get("batch_size", 100)
-                    }
+            async with self._get_session().post(
+                f"{self.server_url}/api/updates",
+                headers={"Authorization": f"Bearer {self.access_token}"},
+                json={"updates": [{"key": e.key, **e.item} for e in entries]}
+            ) as response:
+                if response.status == 200:
+                    return True
+                self.logger.error(f"Update delivery failed: {await response.text()}")
+                
+        except Exception as e:
+            self.logger.error(f"Update delivery error: {str(e)}")
+        return False
+        
+    async def _sync_data(self, sync_item: Dict) -> bool:
+        """Sync data with server
+        
+        Reads the server's binary frame stream from the stored cursor and
+        hands each batch to the handler as it arrives; repeats while the
+        server reports more than one stream's worth outstanding.
+        """
+        data_type = sync_item["type"]
+        try:
+            has_more = True
+            while has_more:
+                has_more = False
+                request = {"data_type": data_type, "batch_size": sync_item.get("batch_size", 500)}
+                cursor = self.sync_status["cursors"].get(data_type)
+                if cursor:
+                    request["cursor"] = cursor
+                elif data_type in self.sync_status["last_sync"]:
+                    request["last_sync"] = self.sync_status["last_sync"][data_type]
+                    
+                async with self._get_session().post(
+                    f"{self.server_url}/api/sync/stream",
+                    headers={
+                        "Authorization": f"Bearer {self.access_token}",
+                        ACCEPT_HEADER: accept_header()
+                    },
+                    json=request
                 ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        await self._handle_sync_response(sync_item["type"], data)
-                    else:
+                    if response.status != 200:
                         self.logger.error(f"Sync failed: {await response.text()}")
+                        return False
+                    async for frame in read_frames(response.content):
+                        await self._handle_sync_response(data_type, frame)
+                        has_more = frame["has_more"]
+            return True
                         
         except Exception as e:
             self.logger.error(f"Sync error: {str(e)}")
-            # Add back to pending updates
-            self.sync_status["pending_updates"].append(sync_item)
-            self._save_sync_status()
+            return False
             
     async def _handle_sync_response(self, data_type: str, response: Dict):
         """Handle sync response data"""
         # Update sync status
         self.sync_status["last_sync"][data_type] = response["sync_time"]
+        if response.get("cursor"):
+            self.sync_status["cursors"][data_type] = response["cursor"]
         self._save_sync_status()
         
         # Process received data
@@ -206,12 +288,27 @@ class DeviceConnector:
         """Register message handler"""
         self.message_handlers[message_type] = handler
         
-    async def request_sync(self, data_type: str, batch_size: int = 100):
+    async def request_sync(self, data_type: str, batch_size: int = 500):
         """Request data synchronization"""
-        await self.sync_queue.put({
+        self.queue.put({
             "type": data_type,
             "batch_size": batch_size
-        })
+        }, kind="sync", key=f"sync:{data_type}", replace=True)
+        self._queue_ready.set()
+        
+    def queue_update(self, data_type: str, data: Dict, key: Optional[str] = None) -> str:
+        """Queue an update for the server, durably, whether or not the device is online
+        
+        ``key`` makes the update idempotent (the same key is queued and
+        applied once); returns the key used.
+        """
+        key = self.queue.put({
+            "type": data_type,
+            "data": data,
+            "queued_at": datetime.now().isoformat()
+        }, key=key)
+        self._queue_ready.set()
+        return key
         
     async def subscribe_topics(self, topics: List[str]):
         """Subscribe to topics"""
@@ -233,5 +330,9 @@ class DeviceConnector:
         """Disconnect from server"""
         if self.websocket:
             await self.websocket.close()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
         self.connected = False
+        self._queue_ready.set()  # Let the sync loop see the disconnect
         self.logger.info("Disconnected from server")
@@ -0,0 +1,129 @@
+import json
+import time
+import uuid
+import random
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+class QueueEntry(NamedTuple):
+    id: int
+    key: str
+    kind: str
+    item: Any
+    attempts: int
+    version: int
+
+class OfflineQueue:
+    """Durable FIFO of outgoing work for a device, kept in SQLite
+
+    Each ``put`` is one small WAL append instead of a rewrite of the whole
+    backlog, and a crash mid-write loses at most that entry, never the
+    queue. Every entry has an idempotency key (a random one unless given),
+    so the same work is never queued twice and the server can drop
+    entries it already applied when a batch is resent. Failed entries
+    are retried with exponential backoff and jitter, capped at
+    ``max_delay`` seconds.
+
+    Replacing an entry bumps its ``version``; ``ack`` and ``retry`` only
+    touch entries whose version is still the one that was read, so a
+    replacement queued while the old item was in flight is not lost.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt REAL NOT NULL DEFAULT 0,
+            created REAL NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS queue_due ON queue (next_attempt, id);
+    """
+
+    def __init__(self, path: Union[str, Path], base_delay: float = 1.0, max_delay: float = 300.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def put(self, item: Any, kind: str = "update", key: Optional[str] = None,
+            replace: bool = False) -> str:
+        """Queue ``item`` and return its idempotency key
+
+        An entry with the same key is left alone, unless ``replace`` is set,
+        in which case it takes the new item and kind and is due again
+        immediately.
+        """
+        return self.put_many([item], kind, [key] if key is not None else None, replace)[0]
+
+    def put_many(self, items: Sequence[Any], kind: str = "update",
+                 keys: Optional[Sequence[str]] = None, replace: bool = False) -> List[str]:
+        """Queue several items in one transaction"""
+        keys = list(keys) if keys is not None else [uuid.uuid4().hex for _ in items]
+        now = time.time()
+        rows = [(key, kind, json.dumps(item, default=str), now) for key, item in zip(keys, items)]
+        conflict = ("ON CONFLICT(key) DO UPDATE SET kind = excluded.kind, payload = excluded.payload, "
+                    "next_attempt = 0, version = version + 1" if replace else "ON CONFLICT(key) DO NOTHING")
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO queue (key, kind, payload, created) VALUES (?, ?, ?, ?) {conflict}", rows)
+        return keys
+
+    def due(self, limit: int = 500, kind: Optional[str] = None) -> List[QueueEntry]:
+        """Oldest entries whose backoff has expired"""
+        query = "SELECT id, key, kind, payload, attempts, version FROM queue WHERE next_attempt <= ?"
+        params: List[Any] = [time.time()]
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [QueueEntry(id_, key, kind_, json.loads(payload), attempts, version)
+                for id_, key, kind_, payload, attempts, version in rows]
+
+    def ack(self, entries: Iterable[QueueEntry]):
+        """Remove delivered entries, unless they were replaced since being read"""
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM queue WHERE id = ? AND version = ?",
+                                  [(e.id, e.version) for e in entries])
+
+    def retry(self, entries: Iterable[QueueEntry]):
+        """Back off failed entries: ``base_delay * 2**attempts`` seconds, jittered, up to ``max_delay``"""
+        now = time.time()
+        rows = [
+            (now + min(self.max_delay, self.base_delay * 2 ** min(e.attempts, 30)) * random.uniform(0.5, 1.0),
+             e.id, e.version)
+            for e in entries
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE queue SET attempts = attempts + 1, next_attempt = ? WHERE id = ? AND version = ?",
+                rows)
+
+    def next_due(self) -> Optional[float]:
+        """Seconds until the next entry is due (0 if one is due now), None when empty"""
+        with self._lock:
+            row = self.conn.execute("SELECT MIN(next_attempt) FROM queue").fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -7,13 +7,18 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, asdict
-from fastapi import FastAPI, WebSocket, HTTPException, Depends, Security
+from fastapi import FastAPI, WebSocket, HTTPException, Depends, Security, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from redis import Redis
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from pathlib import Path
 
+from .broadcast import BroadcastEngine
+from .redis_layer import RedisLayer
+from .sync_protocol import (ACCEPT_HEADER, CONTENT_TYPE, encode_frame, length_prefixed,
+                            make_cursor, negotiate, read_batches_async)
+
 class DeviceInfo(BaseModel):
     device_id: str
     device_type: str  # mobile, pda, desktop, etc.
@@ -34,6 +39,22 @@ class SyncRequest(BaseModel):
     last_sync: datetime
     batch_size: int = 100
 
+class SyncStreamRequest(BaseModel):
+    data_type: str
+    cursor: Optional[str] = None  # From the last frame of a previous stream
+    last_sync: Optional[datetime] = None  # Starting point when there is no cursor yet
+    batch_size: int = Field(500, gt=0, le=10000)
+    max_entries: int = Field(100000, gt=0)
+
+class QueuedUpdate(BaseModel):
+    key: str  # Idempotency key assigned when the device queued the update
+    type: str
+    data: Dict
+    queued_at: Optional[datetime] = None
+
+class UpdateBatch(BaseModel):
+    updates: List[QueuedUpdate]
+
 @dataclass
 class ConnectedDevice:
     device_id: str
@@ -43,14 +64,31 @@ class ConnectedDevice:
     sync_status: Dict[str, datetime]
 
 class RealTimeManager:
-    """Manages real-time connectivity with various devices"""
+    """Manages real-time connectivity with various devices
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    Broadcasts go through a ``BroadcastEngine``: each update is serialized
+    once and queued per subscribed device, with a writer task per
+    connection, so slow devices lose or coalesce updates instead of
+    delaying everyone else.
+    
+    Redis is reached through an async ``RedisLayer`` (connection pool,
+    pipelined multi-key commands, cached device metadata), so no handler
+    blocks the event loop. Heartbeats only note the time; ``last_seen``
+    is written for all devices at once by the cleanup task.
+    """
+    
+    def __init__(self, redis_url: str = "redis://localhost:6379",
+                 max_queue: int = 256, send_timeout: float = 10.0,
+                 redis_pool_size: int = 64, device_cache_ttl: float = 30.0,
+                 update_key_ttl: int = 7 * 24 * 3600):
         self.app = FastAPI(title="Roulette Analysis Real-time API")
         self.setup_api()
-        self.redis = Redis.from_url(redis_url)
+        self.store = RedisLayer(redis_url, max_connections=redis_pool_size, cache_ttl=device_cache_ttl)
+        self.last_seen: Dict[str, str] = {}  # Heartbeats not yet written to Redis
+        self.update_key_ttl = update_key_ttl
         self.connected_devices: Dict[str, ConnectedDevice] = {}
         self.active_subscriptions: Dict[str, Set[str]] = {}
+        self.broadcaster = BroadcastEngine(max_queue=max_queue, send_timeout=send_timeout)
         self.security = HTTPBearer()
         self.secret_key = "your-secret-key"  # In production, use secure key management
         
@@ -72,7 +110,11 @@ class RealTimeManager:
         self.app.post("/api/register_device")(self.register_device)
         self.app.get("/api/device_status")(self.get_device_status)
         self.app.post("/api/sync")(self.handle_sync_request)
+        self.app.post("/api/sync/stream")(self.handle_sync_stream)
+        self.app.post("/api/updates")(self.handle_updates)
         self.app.websocket("/ws/connect")(self.handle_websocket)
+        self.app.get("/api/broadcast_stats")(self.get_broadcast_stats)
+        self.app.on_event("shutdown")(self.close)
         
     async def register_device(self, device_info: DeviceInfo) -> Dict:
         """Register a new device and return access token"""
@@ -87,7 +129,7 @@ class RealTimeManager:
                 "registered_at": datetime.now().isoformat(),
                 "last_seen": datetime.now().isoformat()
             }
-            self.redis.hset(f"device:{device_id}", mapping=device_data)
+            await self.store.put_device(device_id, device_data)
             
             return {
                 "device_id": device_id,
@@ -108,14 +150,14 @@ class RealTimeManager:
             
             if not device:
                 # Check Redis for offline device
-                device_data = self.redis.hgetall(f"device:{device_id}")
+                device_data = await self.store.get_device(device_id)
                 if not device_data:
                     raise HTTPException(status_code=404, detail="Device not found")
                     
                 return ConnectionStatus(
                     device_id=device_id,
                     status="offline",
-                    last_seen=datetime.fromisoformat(device_data[b'last_seen'].decode()),
+                    last_seen=datetime.fromisoformat(device_data['last_seen']),
                     connection_type="none",
                     sync_status={}
                 )
@@ -139,14 +181,12 @@ class RealTimeManager:
             device_id = self._verify_token(credentials.credentials)
             
             # Get sync data from Redis
-            sync_key = f"sync:{device_id}:{sync_req.data_type}"
-            pending_data = self.redis.zrangebyscore(
-                sync_key,
-                min=sync_req.last_sync.timestamp(),
-                max="+inf",
-                start=0,
-                num=sync_req.batch_size
-            )
+            pending_data = [entry for entry, _ in await self.store.sync_range(
+                device_id,
+                sync_req.data_type,
+                sync_req.last_sync.timestamp(),
+                count=sync_req.batch_size
+            )]
             
             # Update sync status
             if device_id in self.connected_devices:
@@ -161,6 +201,76 @@ class RealTimeManager:
         except jwt.InvalidTokenError:
             raise HTTPException(status_code=401, detail="Invalid token")
             
+    async def handle_sync_stream(self,
+                               sync_req: SyncStreamRequest,
+                               request: Request,
+                               credentials: HTTPAuthorizationCredentials = Security(HTTPBearer())) -> StreamingResponse:
+        """Stream everything pending since a cursor as compact binary frames
+        
+        Entries are read in ``batch_size`` batches and each batch is sent as
+        soon as it is encoded (delta-encoded columns, msgpack/zstd when both
+        sides have them), so a device that was offline for a day catches up
+        in one request. Every frame carries the cursor to resume from; the
+        last one has ``has_more`` set if ``max_entries`` cut the stream short.
+        """
+        try:
+            device_id = self._verify_token(credentials.credentials)
+            cursor = sync_req.cursor or make_cursor(
+                sync_req.last_sync.timestamp() if sync_req.last_sync else 0)
+            fmt, compression = negotiate(request.headers.get(ACCEPT_HEADER))
+            sync_time = datetime.now().isoformat()
+            
+            async def fetch(score: float, offset: int, count: int):
+                return await self.store.sync_range(device_id, sync_req.data_type, score, offset, count)
+                
+            async def frames():
+                async for entries, next_cursor, has_more in read_batches_async(
+                        fetch, cursor, sync_req.batch_size, sync_req.max_entries):
+                    rows = [json.loads(entry) for entry in entries]
+                    yield length_prefixed(encode_frame(rows, next_cursor, has_more, sync_time,
+                                                       fmt, compression))
+                    
+            if device_id in self.connected_devices:
+                self.connected_devices[device_id].sync_status[sync_req.data_type] = datetime.now()
+                
+            return StreamingResponse(frames(), media_type=CONTENT_TYPE)
+            
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+            
+    async def handle_updates(self,
+                             batch: UpdateBatch,
+                             credentials: HTTPAuthorizationCredentials = Security(HTTPBearer())) -> Dict:
+        """Apply a batch of updates a device queued, each at most once
+        
+        Idempotency keys are claimed in Redis for ``update_key_ttl``
+        seconds, so updates from a batch resent after a lost response are
+        skipped. Accepted updates are broadcast on their type's topic; if
+        that fails, the keys of the updates not yet applied are released so
+        the device's retry is not mistaken for a duplicate.
+        """
+        try:
+            device_id = self._verify_token(credentials.credentials)
+            fresh = await self.store.claim_keys(device_id, [u.key for u in batch.updates],
+                                                self.update_key_ttl)
+            claimed = [update for update, new in zip(batch.updates, fresh) if new]
+            accepted = 0
+            try:
+                for update in claimed:
+                    await self.broadcast_update(update.type, update.data)
+                    accepted += 1
+            except Exception:
+                await self.store.release_keys(device_id, [u.key for u in claimed[accepted:]])
+                raise
+                    
+            return {
+                "accepted": accepted,
+                "duplicates": len(batch.updates) - accepted
+            }
+            
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+            
     async def handle_websocket(self, websocket: WebSocket):
         """Handle WebSocket connections"""
         await websocket.accept()
@@ -176,7 +286,7 @@ class RealTimeManager:
                 return
                 
             # Register connection
-            device_info = self.redis.hgetall(f"device:{device_id}")
+            device_info = await self.store.get_device(device_id)
             if not device_info:
                 await websocket.close(code=4004, reason="Device not found")
                 return
@@ -184,11 +294,12 @@ class RealTimeManager:
             device = ConnectedDevice(
                 device_id=device_id,
                 websocket=websocket,
-                device_type=device_info[b'info'][b'device_type'].decode(),
+                device_type=device_info['info']['device_type'],
                 last_heartbeat=datetime.now(),
                 sync_status={}
             )
             self.connected_devices[device_id] = device
+            self.broadcaster.add(device_id, websocket.send_text, device.device_type)
             
             # Handle messages
             while True:
@@ -201,37 +312,46 @@ class RealTimeManager:
             if device_id:
                 self._cleanup_device(device_id)
                 
-    async def broadcast_update(self, update_type: str, data: Dict, target_types: Optional[List[str]] = None):
-        """Broadcast updates to connected devices"""
+    async def broadcast_update(self, update_type: str, data: Dict, target_types: Optional[List[str]] = None,
+                               topic: Optional[str] = None, coalesce_key: Optional[str] = None) -> int:
+        """Broadcast updates to connected devices
+        
+        Goes to the devices subscribed to ``topic`` (default: the update
+        type) or to every topic; devices that never subscribed receive
+        everything. Returns without waiting for any device and gives the
+        number of devices the update was queued for.
+        """
         message = {
             "type": update_type,
             "timestamp": datetime.now().isoformat(),
             "data": data
         }
-        
-        for device in self.connected_devices.values():
-            if not target_types or device.device_type in target_types:
-                try:
-                    await device.websocket.send_json(message)
-                except Exception as e:
-                    self.logger.error(f"Error broadcasting to device {device.device_id}: {str(e)}")
+        return self.broadcaster.publish(topic or update_type, message,
+                                        coalesce_key=coalesce_key, device_types=target_types)
                     
+    async def get_broadcast_stats(self) -> Dict:
+        """Fan-out totals and the devices with the largest send backlog"""
+        return self.broadcaster.stats()
+        
     async def _handle_device_message(self, device: ConnectedDevice, message: Dict):
         """Handle incoming device messages"""
         msg_type = message.get("type")
         
         if msg_type == "heartbeat":
             device.last_heartbeat = datetime.now()
+            self.last_seen[device.device_id] = device.last_heartbeat.isoformat()
             await device.websocket.send_json({"type": "heartbeat_ack"})
             
         elif msg_type == "subscribe":
             topics = message.get("topics", [])
             self.active_subscriptions.setdefault(device.device_id, set()).update(topics)
+            self.broadcaster.subscribe(device.device_id, topics)
             
         elif msg_type == "unsubscribe":
             topics = message.get("topics", [])
             if device.device_id in self.active_subscriptions:
                 self.active_subscriptions[device.device_id].difference_update(topics)
+            self.broadcaster.unsubscribe(device.device_id, topics)
                 
         elif msg_type == "sync_request":
             # Handle real-time sync request
@@ -250,6 +370,7 @@ class RealTimeManager:
             del self.connected_devices[device_id]
         if device_id in self.active_subscriptions:
             del self.active_subscriptions[device_id]
+        self.broadcaster.remove(device_id)
             
     def _generate_token(self, device_id: str, device_type: str) -> str:
         """Generate JWT token for device authentication"""
@@ -281,12 +402,26 @@ class RealTimeManager:
                 for device_id in stale_devices:
                     self._cleanup_device(device_id)
                     
+                # One pipelined write for every heartbeat since the last pass
+                seen, self.last_seen = self.last_seen, {}
+                await self.store.touch_devices(seen)
+                    
                 await asyncio.sleep(30)  # Run every 30 seconds
                 
             except Exception as e:
                 self.logger.error(f"Error in cleanup task: {str(e)}")
                 await asyncio.sleep(30)
                 
+    async def close(self):
+        """Stop writer tasks, record pending heartbeats and release Redis connections"""
+        await self.broadcaster.close()
+        try:
+            await self.store.touch_devices(self.last_seen)
+            self.last_seen = {}
+        except Exception as e:
+            self.logger.error(f"Error writing heartbeats: {str(e)}")
+        await self.store.close()
+        
     def start(self, host: str = "0.0.0.0", port: int = 8000):
         """Start the real-time server"""
         import uvicorn
@@ -0,0 +1,173 @@
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import redis.asyncio as aioredis
+
+class TTLCache:
+    """Small LRU mapping whose entries expire ``ttl`` seconds after being set"""
+
+    def __init__(self, ttl: float = 30.0, max_size: int = 4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisLayer:
+    """Async, pooled Redis access for ``RealTimeManager``
+
+    Commands run on a ``redis.asyncio`` client backed by a bounded
+    connection pool, so handlers await Redis instead of blocking the event
+    loop. Operations spanning several keys go out as one pipeline (one
+    round trip), and device metadata, which is read on every websocket
+    connect and status request but rarely changes, is served from a local
+    read-through cache for ``cache_ttl`` seconds.
+
+    Device hashes store nested values (``info``) as JSON; ``get_device``
+    returns them decoded.
+    """
+
+    def __init__(self, redis_url: str = "redis://localhost:6379", max_connections: int = 64,
+                 cache_ttl: float = 30.0, cache_size: int = 4096,
+                 client: Optional[aioredis.Redis] = None):
+        self.redis = client if client is not None else aioredis.Redis.from_url(
+            redis_url, max_connections=max_connections)
+        self.cache = TTLCache(cache_ttl, cache_size)
+        self.logger = logging.getLogger("RedisLayer")
+
+    @staticmethod
+    def device_key(device_id: str) -> str:
+        return f"device:{device_id}"
+
+    @staticmethod
+    def sync_key(device_id: str, data_type: str) -> str:
+        return f"sync:{device_id}:{data_type}"
+
+    @staticmethod
+    def _encode_fields(data: Dict) -> Dict[str, str]:
+        return {
+            field: value if isinstance(value, str) else json.dumps(value, default=str)
+            for field, value in data.items()
+        }
+
+    @staticmethod
+    def _decode_fields(raw: Dict) -> Dict:
+        data = {}
+        for field, value in raw.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            value = value.decode() if isinstance(value, bytes) else value
+            if value[:1] in ('{', '['):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+            data[field] = value
+        return data
+
+    async def put_device(self, device_id: str, data: Dict):
+        """Create or update a device's metadata hash"""
+        await self.redis.hset(self.device_key(device_id), mapping=self._encode_fields(data))
+        self.cache.pop(device_id)
+
+    async def get_device(self, device_id: str) -> Optional[Dict]:
+        """Device metadata, from the local cache when fresh; None if unknown"""
+        device = self.cache.get(device_id)
+        if device is None:
+            raw = await self.redis.hgetall(self.device_key(device_id))
+            if not raw:
+                return None
+            device = self._decode_fields(raw)
+            self.cache.set(device_id, device)
+        return device
+
+    async def get_devices(self, device_ids: Sequence[str]) -> Dict[str, Optional[Dict]]:
+        """Metadata of many devices; cache misses are fetched in one pipeline"""
+        devices = {device_id: self.cache.get(device_id) for device_id in device_ids}
+        missing = [device_id for device_id, device in devices.items() if device is None]
+        if missing:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for device_id in missing:
+                    pipe.hgetall(self.device_key(device_id))
+                results = await pipe.execute()
+            for device_id, raw in zip(missing, results):
+                if raw:
+                    devices[device_id] = self._decode_fields(raw)
+                    self.cache.set(device_id, devices[device_id])
+        return devices
+
+    async def touch_devices(self, last_seen: Dict[str, str]):
+        """Set ``last_seen`` for many devices in one pipeline"""
+        if not last_seen:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for device_id, seen in last_seen.items():
+                pipe.hset(self.device_key(device_id), "last_seen", seen)
+            await pipe.execute()
+        for device_id, seen in last_seen.items():
+            device = self.cache.get(device_id)
+            if device is not None:
+                device["last_seen"] = seen
+
+    async def sync_range(self, device_id: str, data_type: str, min_score: float,
+                         offset: int = 0, count: int = 100) -> List[Tuple[bytes, float]]:
+        """Up to ``count`` ``(entry, score)`` pairs with score >= ``min_score``"""
+        return await self.redis.zrangebyscore(self.sync_key(device_id, data_type),
+                                              min=min_score, max="+inf", start=offset,
+                                              num=count, withscores=True)
+
+    async def add_sync_entries(self, entries: Iterable[Tuple[str, str, Dict, float]]) -> int:
+        """Queue ``(device_id, data_type, entry, score)`` items for sync in one pipeline"""
+        entries = list(entries)
+        if not entries:
+            return 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for device_id, data_type, entry, score in entries:
+                pipe.zadd(self.sync_key(device_id, data_type),
+                          {json.dumps(entry, separators=(",", ":"), default=str): score})
+            await pipe.execute()
+        return len(entries)
+
+    async def claim_keys(self, device_id: str, keys: Sequence[str], ttl: int) -> List[bool]:
+        """Claim idempotency keys for ``ttl`` seconds in one pipeline; False for keys seen before"""
+        if not keys:
+            return []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(f"update:{device_id}:{key}", 1, nx=True, ex=ttl)
+            results = await pipe.execute()
+        return [bool(result) for result in results]
+
+    async def release_keys(self, device_id: str, keys: Sequence[str]):
+        """Drop claimed idempotency keys, e.g. of updates that were never applied"""
+        if keys:
+            await self.redis.delete(*(f"update:{device_id}:{key}" for key in keys))
+
+    async def close(self):
+        """Return pooled connections"""
+        await self.redis.aclose()
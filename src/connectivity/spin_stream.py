@@ -0,0 +1,202 @@
+import os
+import json
+import asyncio
+import logging
+import numpy as np
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from ..database.spin_store import SpinStore
+
+class SpinStream:
+    """Push feed of new spins, replayable from any offset
+
+    The log is the ``SpinStore`` itself: a spin's offset is its row number,
+    which never changes, so any past position can be replayed. Appends made
+    in this process (the collectors write through the store) wake
+    subscribers immediately through a store listener; appends by another
+    process are noticed by polling the column sizes every
+    ``poll_interval`` seconds.
+
+    New rows are decoded once into a shared tail of the last ``tail_size``
+    events, which serves every subscriber that is caught up; only replays
+    from further back read the store.
+
+    Every event carries a ``cursor``, the offset to resume from after it.
+    With a ``client_id`` the stream also remembers how far each client
+    got, so a client reconnecting without a cursor picks up where it left
+    off.
+    """
+
+    def __init__(self, store: SpinStore, poll_interval: float = 0.05, batch_size: int = 1000,
+                 tail_size: int = 10000, cursor_file: Optional[Union[str, Path]] = None):
+        self.store = store
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.tail_size = tail_size
+        self.cursor_file = Path(cursor_file) if cursor_file else store.root / "stream_cursors.json"
+        self.cursors: Dict[str, int] = self._load_cursors()
+        self.rows = store.committed_rows()
+        self.tail: List[Dict] = []  # Events of rows [tail_start, rows)
+        self.tail_start = self.rows
+        self.subscribers = 0
+        self._changed: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger("SpinStream")
+
+    def _load_cursors(self) -> Dict[str, int]:
+        if self.cursor_file.exists():
+            try:
+                with open(self.cursor_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logging.error(f"Error loading stream cursors: {str(e)}")
+        return {}
+
+    def save_cursors(self):
+        """Persist per-client cursors atomically"""
+        tmp_file = self.cursor_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(self.cursors, f)
+        os.replace(tmp_file, self.cursor_file)
+
+    def start(self):
+        """Start watching the store; must run on the event loop serving subscribers"""
+        if self._watcher is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        self.store.add_listener(self._on_append)
+        self._watcher = self._loop.create_task(self._watch())
+
+    async def close(self):
+        """Stop watching and save client cursors"""
+        self.store.remove_listener(self._on_append)
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        self.save_cursors()
+
+    def _on_append(self, rows: int):
+        # Runs on the collector's thread
+        self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        rows = self.store.committed_rows()
+        if rows <= self.rows:
+            return
+        if rows - self.rows > self.tail_size:
+            self.tail, self.tail_start = [], rows - self.tail_size
+        self.tail.extend(self._read_store(max(self.rows, self.tail_start), rows))
+        if len(self.tail) > self.tail_size:
+            drop = len(self.tail) - self.tail_size
+            del self.tail[:drop]
+            self.tail_start += drop
+        self.rows = rows
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                self._wake()
+            except Exception as e:
+                self.logger.error(f"Error polling spin store: {str(e)}")
+
+    def read(self, offset: int, table: Optional[str] = None,
+             limit: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """Events in the next ``limit`` rows from ``offset`` and the offset to continue from"""
+        limit = limit or self.batch_size
+        offset = max(0, offset)
+        if self.tail_start <= offset <= self.rows and self._watcher is not None:
+            events = self.tail[offset - self.tail_start:offset - self.tail_start + limit]
+            next_offset = offset + len(events)
+            if table is not None:
+                events = [event for event in events if event["table"] == table]
+            return events, next_offset
+        events = self._read_store(offset, offset + limit, table)
+        return events, min(offset + limit, max(offset, self.store.committed_rows()))
+
+    def _read_store(self, start: int, stop: int, table: Optional[str] = None) -> List[Dict]:
+        columns = self.store.read_rows(start, stop)
+        rows = np.arange(start, start + len(columns["number"]))
+        if table is not None:
+            table_id = self.store.catalog["tables"].get(table)
+            if table_id is None:
+                self.store.refresh_catalog()
+                table_id = self.store.catalog["tables"].get(table)
+            keep = columns["table_id"] == (-1 if table_id is None else table_id)
+            rows, columns = rows[keep], {name: values[keep] for name, values in columns.items()}
+
+        tables, providers = self.store.key_names("tables"), self.store.key_names("providers")
+        if not (set(np.unique(columns["table_id"]).tolist()) <= tables.keys()
+                and set(np.unique(columns["provider_id"]).tolist()) <= providers.keys()):
+            self.store.refresh_catalog()  # Ids registered by a collector in another process
+            tables, providers = self.store.key_names("tables"), self.store.key_names("providers")
+        return [
+            {
+                "type": "spin",
+                "offset": row,
+                "cursor": row + 1,
+                "table": tables.get(table_id),
+                "provider": providers.get(provider_id),
+                "number": number,
+                "epoch_ms": epoch_ms
+            }
+            for row, number, epoch_ms, table_id, provider_id in zip(
+                rows.tolist(), columns["number"].tolist(), columns["epoch_ms"].tolist(),
+                columns["table_id"].tolist(), columns["provider_id"].tolist())
+        ]
+
+    def resolve_offset(self, offset: Optional[int] = None, client_id: Optional[str] = None) -> int:
+        """Starting offset: the given one (negative counts back from the end), the
+        client's saved cursor, or the current end of the log"""
+        rows = self.store.committed_rows()
+        if offset is None:
+            offset = self.cursors.get(client_id, rows) if client_id else rows
+        elif offset < 0:
+            offset += rows
+        return max(0, offset)
+
+    async def subscribe(self, table: Optional[str] = None, offset: Optional[int] = None,
+                        client_id: Optional[str] = None,
+                        idle_timeout: Optional[float] = None) -> AsyncIterator[Optional[Dict]]:
+        """Replay from ``offset`` then follow new spins, optionally for one table
+
+        Yields ``None`` after ``idle_timeout`` seconds without a spin so the
+        caller can send a keep-alive (and notice a dropped client).
+        """
+        self.start()
+        offset = self.resolve_offset(offset, client_id)
+        self.subscribers += 1
+        try:
+            while True:
+                changed = self._changed
+                events, next_offset = self.read(offset, table)
+                for event in events:
+                    yield event
+                    if client_id:
+                        self.cursors[client_id] = event["cursor"]
+                if client_id:
+                    self.cursors[client_id] = next_offset
+                if next_offset == offset:
+                    try:
+                        await asyncio.wait_for(changed.wait(), idle_timeout)
+                    except asyncio.TimeoutError:
+                        yield None
+                offset = next_offset
+        finally:
+            self.subscribers -= 1
+            if client_id:
+                try:
+                    self.save_cursors()
+                except Exception as e:
+                    self.logger.error(f"Error saving stream cursors: {str(e)}")
+
+def sse_event(event: Optional[Dict]) -> str:
+    """Server-Sent Events encoding; the event id is the resume cursor (``Last-Event-ID``)"""
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"id: {event['cursor']}\nevent: spin\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
@@ -0,0 +1,266 @@
+import json
+import zlib
+import asyncio
+import base64
+import struct
+import numpy as np
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import msgpack
+except ImportError:  # JSON bodies are used instead
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # zlib is used instead
+    zstandard = None
+
+CONTENT_TYPE = "application/x-sync-frames"
+ACCEPT_HEADER = "X-Sync-Accept"
+
+MAGIC = b"SYF1"
+FORMATS = {"json": 0, "msgpack": 1}
+COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2}
+MIN_COMPRESS_BYTES = 256  # Smaller bodies are sent as is
+_HEADER = struct.Struct("!4sBB")
+_LENGTH = struct.Struct("!I")
+_INT_WIDTHS = (1, 2, 4, 8)
+
+def available_formats() -> List[str]:
+    """Body formats this process can read and write, preferred first"""
+    return (["msgpack"] if msgpack is not None else []) + ["json"]
+
+def available_compressions() -> List[str]:
+    """Compressions this process can read and write, preferred first"""
+    return (["zstd"] if zstandard is not None else []) + ["zlib", "none"]
+
+def accept_header() -> str:
+    """Value for ``X-Sync-Accept`` advertising what this client can decode"""
+    return f"{','.join(available_formats())};{','.join(available_compressions())}"
+
+def negotiate(accept: Optional[str]) -> Tuple[str, str]:
+    """Pick the best (format, compression) both sides support
+
+    ``accept`` is the peer's ``X-Sync-Accept`` value; without one only
+    JSON and zlib, which every client has, are assumed.
+    """
+    formats, compressions = ["json"], ["zlib", "none"]
+    if accept:
+        offered, _, packed = accept.partition(";")
+        formats = [f.strip() for f in offered.split(",") if f.strip()] or formats
+        compressions = [c.strip() for c in packed.split(",") if c.strip()] or compressions
+    fmt = next((f for f in available_formats() if f in formats), "json")
+    compression = next((c for c in available_compressions() if c in compressions), "none")
+    return fmt, compression
+
+# -- Cursors -----------------------------------------------------------------
+# A cursor is "<score>:<skip>": continue at ``score`` after skipping the
+# ``skip`` entries with exactly that score that were already delivered, so
+# entries sharing a timestamp are never lost or repeated between batches.
+
+def make_cursor(score: float, skip: int = 0) -> str:
+    return f"{float(score)!r}:{int(skip)}"
+
+def parse_cursor(cursor: str) -> Tuple[float, int]:
+    score, _, skip = cursor.rpartition(":")
+    return float(score), int(skip)
+
+def advance_cursor(cursor: str, scores: Sequence[float]) -> str:
+    """Cursor after delivering entries with ``scores`` (ascending) from ``cursor``"""
+    if not len(scores):
+        return cursor
+    score, skip = parse_cursor(cursor)
+    last = scores[-1]
+    trailing = 0
+    for value in reversed(scores):
+        if value != last:
+            break
+        trailing += 1
+    if last == score and trailing == len(scores):
+        trailing += skip
+    return make_cursor(last, trailing)
+
+def read_batches(fetch: Callable[[float, int, int], Sequence[Tuple[Any, float]]],
+                 cursor: str, batch_size: int = 500,
+                 max_entries: Optional[int] = None) -> Iterator[Tuple[List[Any], str, bool]]:
+    """Yield ``(entries, cursor, has_more)`` batches until caught up
+
+    ``fetch(min_score, offset, count)`` returns up to ``count`` ascending
+    ``(entry, score)`` pairs with score >= ``min_score``, skipping the
+    first ``offset`` (e.g. ``ZRANGEBYSCORE ... WITHSCORES LIMIT``). Stops
+    after a short batch, or once ``max_entries`` were read, in which case
+    the last batch reports ``has_more`` so the caller resumes from its cursor.
+    """
+    delivered = 0
+    while True:
+        limit = batch_size if max_entries is None else min(batch_size, max_entries - delivered)
+        score, skip = parse_cursor(cursor)
+        batch = fetch(score, skip, limit)
+        cursor = advance_cursor(cursor, [s for _, s in batch])
+        delivered += len(batch)
+        has_more = len(batch) == limit
+        yield [entry for entry, _ in batch], cursor, has_more
+        if not has_more or (max_entries is not None and delivered >= max_entries):
+            return
+
+async def read_batches_async(fetch: Callable[[float, int, int], Awaitable[Sequence[Tuple[Any, float]]]],
+                             cursor: str, batch_size: int = 500,
+                             max_entries: Optional[int] = None
+                             ) -> AsyncIterator[Tuple[List[Any], str, bool]]:
+    """``read_batches`` for an async ``fetch`` (e.g. a ``redis.asyncio`` client)"""
+    delivered = 0
+    while True:
+        limit = batch_size if max_entries is None else min(batch_size, max_entries - delivered)
+        score, skip = parse_cursor(cursor)
+        batch = await fetch(score, skip, limit)
+        cursor = advance_cursor(cursor, [s for _, s in batch])
+        delivered += len(batch)
+        has_more = len(batch) == limit
+        yield [entry for entry, _ in batch], cursor, has_more
+        if not has_more or (max_entries is not None and delivered >= max_entries):
+            return
+
+# -- Columnar rows -----------------------------------------------------------
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _pack_ints(values: Sequence[int]) -> Optional[Dict]:
+    """Delta-encode integers into the narrowest little-endian width that fits"""
+    if not len(values):
+        return {"w": 1, "b": b""}
+    if min(values) < -2**62 or max(values) >= 2**62:
+        return None
+    deltas = np.diff(np.asarray(values, dtype=np.int64), prepend=0)
+    low, high = int(deltas.min()), int(deltas.max())
+    width = next(w for w in _INT_WIDTHS if -2**(8 * w - 1) <= low and high < 2**(8 * w - 1))
+    return {"w": width, "b": deltas.astype(f"<i{width}").tobytes()}
+
+def _unpack_ints(column: Dict) -> np.ndarray:
+    data = column["b"]
+    if isinstance(data, str):
+        data = base64.b64decode(data)
+    return np.cumsum(np.frombuffer(data, dtype=f"<i{column['w']}").astype(np.int64))
+
+def _encode_column(values: List[Any]) -> Dict:
+    if all(_is_int(v) for v in values):
+        packed = _pack_ints(values)
+        if packed is not None:
+            return {"t": "i", **packed}
+    if all(isinstance(v, list) and all(_is_int(x) for x in v) for v in values):
+        flat = _pack_ints([x for v in values for x in v])
+        if flat is not None:
+            return {"t": "a", "n": _pack_ints([len(v) for v in values]), **flat}
+    return {"t": "v", "v": values}
+
+def _decode_column(column: Dict) -> List[Any]:
+    if column["t"] == "i":
+        return _unpack_ints(column).tolist()
+    if column["t"] == "a":
+        flat = _unpack_ints(column).tolist()
+        ends = np.cumsum(_unpack_ints(column["n"])).tolist()
+        return [flat[start:end] for start, end in zip([0] + ends[:-1], ends)]
+    return column["v"]
+
+def encode_rows(rows: Sequence[Dict]) -> Dict[str, Dict]:
+    """Turn a list of dicts into one encoded column per key
+
+    Integer fields (spin numbers, epoch milliseconds, table ids) and
+    integer arrays are delta-encoded, which makes consecutive spins a few
+    bytes each before compression. Rows lacking a key are listed under
+    ``"m"`` for that column.
+    """
+    keys: Dict[str, None] = {}
+    for row in rows:
+        keys.update(dict.fromkeys(row))
+    columns = {}
+    for key in keys:
+        missing = [i for i, row in enumerate(rows) if key not in row]
+        values = [row[key] for row in rows if key in row]
+        column = _encode_column(values)
+        if missing:
+            column["m"] = missing
+        columns[key] = column
+    return columns
+
+def decode_rows(columns: Dict[str, Dict], count: int) -> List[Dict]:
+    """Inverse of ``encode_rows``"""
+    rows = [{} for _ in range(count)]
+    for key, column in columns.items():
+        missing = set(column.get("m", ()))
+        values = iter(_decode_column(column))
+        for i, row in enumerate(rows):
+            if i not in missing:
+                row[key] = next(values)
+    return rows
+
+# -- Frames ------------------------------------------------------------------
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return str(value)
+
+def encode_frame(rows: Sequence[Dict], cursor: Optional[str] = None, has_more: bool = False,
+                 sync_time: Optional[str] = None, fmt: str = "json",
+                 compression: str = "zlib") -> bytes:
+    """Serialize one batch of sync entries into a self-describing frame"""
+    body = {
+        "count": len(rows),
+        "cursor": cursor,
+        "has_more": has_more,
+        "sync_time": sync_time
+    }
+    if all(isinstance(row, dict) for row in rows):
+        body["columns"] = encode_rows(rows)
+    else:
+        body["rows"] = list(rows)
+    if fmt == "msgpack":
+        payload = msgpack.packb(body, use_bin_type=True, default=str)
+    else:
+        payload = json.dumps(body, separators=(",", ":"), default=_json_default).encode("utf-8")
+    if len(payload) < MIN_COMPRESS_BYTES:
+        compression = "none"
+    if compression == "zstd":
+        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+    elif compression == "zlib":
+        payload = zlib.compress(payload, 6)
+    return _HEADER.pack(MAGIC, FORMATS[fmt], COMPRESSIONS[compression]) + payload
+
+def decode_frame(frame: bytes) -> Dict:
+    """Decode a frame into ``{"data", "cursor", "has_more", "sync_time"}``"""
+    magic, fmt, compression = _HEADER.unpack_from(frame)
+    if magic != MAGIC:
+        raise ValueError("Not a sync frame")
+    payload = frame[_HEADER.size:]
+    if compression == COMPRESSIONS["zstd"]:
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif compression == COMPRESSIONS["zlib"]:
+        payload = zlib.decompress(payload)
+    if fmt == FORMATS["msgpack"]:
+        body = msgpack.unpackb(payload, raw=False)
+    else:
+        body = json.loads(payload)
+    return {
+        "data": decode_rows(body["columns"], body["count"]) if "columns" in body else body["rows"],
+        "cursor": body["cursor"],
+        "has_more": body["has_more"],
+        "sync_time": body["sync_time"]
+    }
+
+def length_prefixed(frame: bytes) -> bytes:
+    """Frame as sent on a stream: 4-byte big-endian length, then the frame"""
+    return _LENGTH.pack(len(frame)) + frame
+
+async def read_frames(reader) -> AsyncIterator[Dict]:
+    """Decode length-prefixed frames from a stream (e.g. aiohttp ``response.content``)"""
+    while True:
+        try:
+            header = await reader.readexactly(_LENGTH.size)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:  # Clean end of stream
+                return
+            raise
+        (length,) = _LENGTH.unpack(header)
+        yield decode_frame(await reader.readexactly(length))
@@ -1,14 +1,24 @@
-from sqlalchemy import create_engine, Column, Integer, String, JSON, DateTime, ForeignKey
+from sqlalchemy import create_engine, event, and_, or_, Column, Integer, String, JSON, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import threading
+import logging
 import json
 import os
+from .spin_store import SpinStore
 
 Base = declarative_base()
 
 class WebsiteData(Base):
     __tablename__ = 'website_data'
+    __table_args__ = (
+        Index('ix_website_data_url_last_scraped', 'url', 'last_scraped'),
+        Index('ix_website_data_last_scraped', 'last_scraped'),
+    )
     
     id = Column(Integer, primary_key=True)
     url = Column(String, index=True)
@@ -37,7 +47,145 @@ class MLModel(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
+def _configure_sqlite(dbapi_connection, connection_record):
+    """Use WAL journaling so bulk writes don't block readers or fsync per row"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+def _chain(source, target):
+    """Complete ``target`` with the outcome of ``source``"""
+    def copy(done):
+        if done.exception() is not None:
+            target.set_exception(done.exception())
+        else:
+            target.set_result(done.result())
+    source.add_done_callback(copy)
+
+class WriteBatch:
+    """Buffers rows per table and writes them with bulk inserts
+    
+    Rows of a failed flush are put back and retried with the next one; after
+    ``max_attempts`` failures in a row they are dropped and logged.
+    """
+    
+    def __init__(self, db, max_rows=1000, max_attempts=3):
+        self.db = db
+        self.max_rows = max_rows
+        self.max_attempts = max_attempts
+        self.pending = defaultdict(list)
+        self.written = Future()  # Shared by every row of the pending flush
+        self.size = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        
+    def add(self, table, **fields):
+        """Queue a row; fields are the arguments of the matching save_* method
+        
+        Returns a Future of the flush that will write the row: it resolves to
+        the number of rows that flush wrote, or raises its error.
+        """
+        row = self.db._build_row(table, **fields)
+        with self._lock:
+            self.pending[table].append(row)
+            future = self.written
+            self.size += 1
+            full = self.size >= self.max_rows
+        if full:
+            self._on_full()
+        return future
+            
+    def _on_full(self):
+        self.flush()
+        
+    def flush(self):
+        """Write all buffered rows and return how many were written"""
+        with self._lock:
+            pending, self.pending = self.pending, defaultdict(list)
+            future, self.written = self.written, Future()
+            self.size = 0
+        if not pending:
+            future.set_result(0)
+            return 0
+        try:
+            written = self.db._bulk_insert(pending)
+        except Exception as e:
+            rows = sum(len(table_rows) for table_rows in pending.values())
+            with self._lock:
+                self.failures += 1
+                if self.failures < self.max_attempts:
+                    # Keep the rows, ahead of any added since, for the next flush
+                    for table, table_rows in pending.items():
+                        self.pending[table][:0] = table_rows
+                    self.size += rows
+                    _chain(self.written, future)
+                    retry = True
+                else:
+                    self.failures = 0
+                    retry = False
+            if retry:
+                logging.error(f"Error flushing {rows} database rows, will retry: {str(e)}")
+            else:
+                logging.error(f"Error flushing database rows, dropped {rows}: {str(e)}")
+                future.set_exception(e)
+            raise
+        self.failures = 0
+        future.set_result(written)
+        return written
+        
+    def __len__(self):
+        return self.size
+
+class BackgroundFlusher(WriteBatch):
+    """Write batch drained by a daemon thread on size or time thresholds"""
+    
+    def __init__(self, db, max_rows=1000, max_interval=1.0):
+        super().__init__(db, max_rows)
+        self.max_interval = max_interval
+        self.running = False
+        self._wake = threading.Event()
+        self._thread = None
+        
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+        
+    def stop(self):
+        """Stop the flusher thread and write any remaining rows"""
+        self.running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        # Failed rows are kept for another try until flush gives up on them
+        for attempt in range(self.max_attempts):
+            try:
+                self.flush()
+                return
+            except Exception:
+                if attempt == self.max_attempts - 1:
+                    raise
+        
+    def _on_full(self):
+        self._wake.set()
+        
+    def _flush_loop(self):
+        while self.running:
+            self._wake.wait(self.max_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # Logged by flush; the rows stay queued for the next attempt
+
 class DatabaseManager:
+    TABLES = {
+        'website_data': WebsiteData,
+        'browser_history': BrowserHistory,
+        'ml_models': MLModel
+    }
+    
     def __init__(self, db_path=None):
         if db_path is None:
             app_dir = os.path.expanduser('~/AppData/Local/AI_OS')
@@ -45,10 +193,98 @@ class DatabaseManager:
             db_path = os.path.join(app_dir, 'database', 'ai_os.db')
             
         self.engine = create_engine(f'sqlite:///{db_path}')
+        event.listen(self.engine, 'connect', _configure_sqlite)
         Base.metadata.create_all(self.engine)
+        self._ensure_indexes()
         self.Session = sessionmaker(bind=self.engine)
+        self.spins = SpinStore(os.path.join(os.path.dirname(str(db_path)), 'spins'))
+        self.flusher = None
+        
+    def _ensure_indexes(self):
+        """Add indexes that create_all skips on tables created by older versions"""
+        for model in self.TABLES.values():
+            for index in model.__table__.indexes:
+                index.create(self.engine, checkfirst=True)
+                
+    def _build_row(self, table, **fields):
+        """Build an insert row with the same encoding as the save_* methods"""
+        if table == 'website_data':
+            return {
+                'url': fields['url'],
+                'title': fields['title'],
+                'content': json.dumps(fields['content']),
+                'last_scraped': datetime.utcnow()
+            }
+        if table == 'browser_history':
+            metadata = fields.get('metadata')
+            return {
+                'url': fields['url'],
+                'title': fields['title'],
+                'metadata': json.dumps(metadata) if metadata else None,
+                'visit_time': datetime.utcnow()
+            }
+        if table == 'ml_models':
+            now = datetime.utcnow()
+            return {
+                'name': fields['name'],
+                'model_type': fields['model_type'],
+                'parameters': json.dumps(fields['parameters']),
+                'performance_metrics': json.dumps(fields['metrics']),
+                'created_at': now,
+                'updated_at': now
+            }
+        raise ValueError(f"Unknown table: {table}")
+        
+    def _bulk_insert(self, rows_by_table):
+        """Insert prepared rows for several tables in one transaction"""
+        total = 0
+        rows_by_table = {table: rows for table, rows in rows_by_table.items() if rows}
+        if not rows_by_table:
+            return 0
+            
+        with self.engine.begin() as conn:
+            for table, rows in rows_by_table.items():
+                conn.execute(self.TABLES[table].__table__.insert(), rows)
+                total += len(rows)
+        return total
+        
+    def append_many(self, table, rows):
+        """Bulk insert rows (dicts of save_* arguments) in a single transaction"""
+        prepared = [self._build_row(table, **row) for row in rows]
+        return self._bulk_insert({table: prepared})
+        
+    @contextmanager
+    def batch(self, max_rows=1000):
+        """Collect writes and flush them in bulk when the block exits"""
+        write_batch = WriteBatch(self, max_rows)
+        try:
+            yield write_batch
+        finally:
+            write_batch.flush()
+        
+    def start_flusher(self, max_rows=1000, max_interval=1.0):
+        """Buffer save_* calls and flush them from a background thread
+        
+        While the flusher runs, the save_* methods return a Future instead of
+        the new row's id: rows are only written by the next flush, so there
+        is no id yet. ``result()`` waits for that flush and raises if it
+        failed.
+        """
+        if self.flusher is None:
+            self.flusher = BackgroundFlusher(self, max_rows, max_interval)
+            self.flusher.start()
+        return self.flusher
+        
+    def stop_flusher(self):
+        if self.flusher is not None:
+            self.flusher.stop()
+            self.flusher = None
         
     def save_website_data(self, url, title, content):
+        """Store a scraped page; returns its id, or a Future while the flusher runs"""
+        if self.flusher is not None:
+            return self.flusher.add('website_data', url=url, title=title, content=content)
+            
         session = self.Session()
         try:
             website = WebsiteData(
@@ -63,6 +299,10 @@ class DatabaseManager:
             session.close()
             
     def save_browser_history(self, url, title, metadata=None):
+        """Store a history entry; returns its id, or a Future while the flusher runs"""
+        if self.flusher is not None:
+            return self.flusher.add('browser_history', url=url, title=title, metadata=metadata)
+            
         session = self.Session()
         try:
             history = BrowserHistory(
@@ -77,6 +317,11 @@ class DatabaseManager:
             session.close()
             
     def save_ml_model(self, name, model_type, parameters, metrics):
+        """Store model metadata; returns its id, or a Future while the flusher runs"""
+        if self.flusher is not None:
+            return self.flusher.add('ml_models', name=name, model_type=model_type,
+                                    parameters=parameters, metrics=metrics)
+            
         session = self.Session()
         try:
             model = MLModel(
@@ -91,16 +336,58 @@ class DatabaseManager:
         finally:
             session.close()
             
-    def get_website_data(self, url=None, days=7):
+    def _website_query(self, session, url=None, since=None, until=None, after=None):
+        """Build an indexed website_data query ordered by (last_scraped, id)"""
+        query = session.query(WebsiteData)
+        if url:
+            query = query.filter(WebsiteData.url == url)
+        if since:
+            query = query.filter(WebsiteData.last_scraped >= since)
+        if until:
+            query = query.filter(WebsiteData.last_scraped < until)
+        if after:
+            last_scraped, last_id = after
+            query = query.filter(or_(
+                WebsiteData.last_scraped > last_scraped,
+                and_(WebsiteData.last_scraped == last_scraped, WebsiteData.id > last_id)
+            ))
+        return query.order_by(WebsiteData.last_scraped, WebsiteData.id)
+        
+    def query_website_data(self, url=None, since=None, until=None,
+                           limit=None, offset=0, after=None):
+        """Get website rows in a time range with limit/offset or keyset pagination
+        
+        ``after`` is the ``(last_scraped, id)`` of the last row of the previous
+        page; it seeks through the index instead of skipping ``offset`` rows.
+        """
         session = self.Session()
         try:
-            query = session.query(WebsiteData)
-            if url:
-                return query.filter(WebsiteData.url == url).first()
+            query = self._website_query(session, url, since, until, after)
+            if offset:
+                query = query.offset(offset)
+            if limit is not None:
+                query = query.limit(limit)
             return query.all()
         finally:
             session.close()
             
+    def iter_website_data(self, url=None, since=None, until=None, chunk_size=1000):
+        """Yield website rows in chunks so memory stays flat for any history size"""
+        after = None
+        while True:
+            chunk = self.query_website_data(url, since, until, limit=chunk_size, after=after)
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            after = (chunk[-1].last_scraped, chunk[-1].id)
+            
+    def get_website_data(self, url=None, days=7):
+        """Get website rows scraped within the last ``days`` days (all rows if None)"""
+        since = datetime.utcnow() - timedelta(days=days) if days is not None else None
+        return self.query_website_data(url=url, since=since)
+            
     def get_browser_history(self, limit=100):
         session = self.Session()
         try:
@@ -119,3 +406,40 @@ class DatabaseManager:
                 .first()
         finally:
             session.close()
+            
+    def migrate_spins(self, url='roulette_spins', table=None):
+        """Copy legacy JSON spin rows from website_data into the spin store
+        
+        The id of the last copied row is kept in ``migrations.json`` next to
+        the spin columns, so running it again only copies rows added since.
+        """
+        marker_file = self.spins.root / "migrations.json"
+        migrations = {}
+        if marker_file.exists():
+            with open(marker_file, 'r') as f:
+                migrations = json.load(f)
+        last_id = migrations.get(url, 0)
+        
+        session = self.Session()
+        try:
+            numbers = []
+            timestamps = []
+            rows = session.query(WebsiteData)\
+                .filter(WebsiteData.url == url, WebsiteData.id > last_id)\
+                .order_by(WebsiteData.id)
+            for row in rows:
+                content = json.loads(row.content) if isinstance(row.content, str) else row.content
+                numbers.append(content['number'])
+                timestamps.append(datetime.fromisoformat(content['timestamp']))
+                last_id = row.id
+        finally:
+            session.close()
+            
+        migrated = self.spins.append_many(numbers, timestamps, table=table)
+        if migrated:
+            migrations[url] = last_id
+            tmp_file = marker_file.with_suffix(".tmp")
+            with open(tmp_file, 'w') as f:
+                json.dump(migrations, f)
+            os.replace(tmp_file, marker_file)
+        return migrated
@@ -0,0 +1,242 @@
+import os
+import json
+import threading
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+class SpinStore:
+    """Append-only columnar store for roulette spins
+
+    Every column lives in its own flat binary file under ``root`` so a full
+    history can be memory-mapped straight into NumPy without parsing. Table
+    and provider keys (e.g. the ``redisKey`` values from ``roulette/list.*.js``)
+    are mapped to small integer ids in ``tables.json``. Timestamps are stored
+    as wall-clock milliseconds since 1970-01-01, matching the naive
+    ``datetime.now()`` values used throughout the collectors, so they round-trip
+    through ``pd.to_datetime(..., unit='ms')`` unchanged.
+
+    The row number of a spin never changes, so the store doubles as an
+    append-only event log: ``read_rows`` replays from any offset and
+    listeners registered with ``add_listener`` hear about every append to
+    the same directory made in this process.
+    """
+
+    COLUMNS = {
+        "number": np.int8,
+        "epoch_ms": np.int64,
+        "table_id": np.int16,
+        "provider_id": np.int16
+    }
+    DEFAULT_TABLE = "default"
+    EPOCH = datetime(1970, 1, 1)
+    # Append callbacks per resolved store directory, shared by all instances
+    _listeners: Dict[str, List[Callable[[int], None]]] = {}
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.catalog_file = self.root / "tables.json"
+        self._lock = threading.Lock()
+        self._load_catalog()
+        self._repair()
+
+    def _column_path(self, name: str) -> Path:
+        return self.root / f"{name}.bin"
+
+    def _load_catalog(self):
+        """Load table/provider id mappings"""
+        if self.catalog_file.exists():
+            with open(self.catalog_file, 'r') as f:
+                self.catalog = json.load(f)
+        else:
+            self.catalog = {"tables": {}, "providers": {}}
+
+    def _save_catalog(self):
+        """Persist table/provider id mappings atomically"""
+        tmp_file = self.catalog_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(self.catalog, f, indent=4)
+        os.replace(tmp_file, self.catalog_file)
+
+    def _repair(self):
+        """Truncate columns to a common length after an interrupted append"""
+        rows = min(self._column_rows(name) for name in self.COLUMNS)
+        for name, dtype in self.COLUMNS.items():
+            path = self._column_path(name)
+            size = rows * np.dtype(dtype).itemsize
+            if path.exists() and path.stat().st_size != size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def _column_rows(self, name: str) -> int:
+        path = self._column_path(name)
+        if not path.exists():
+            return 0
+        return path.stat().st_size // np.dtype(self.COLUMNS[name]).itemsize
+
+    def __len__(self) -> int:
+        return self._column_rows("number")
+
+    def committed_rows(self) -> int:
+        """Rows present in every column, i.e. safe to read while another process appends"""
+        return min(self._column_rows(name) for name in self.COLUMNS)
+
+    def add_listener(self, callback: Callable[[int], None]):
+        """Call ``callback(total_rows)`` after every append to this directory in this process
+
+        Callbacks run on the appending thread and must return quickly.
+        """
+        self._listeners.setdefault(str(self.root.resolve()), []).append(callback)
+
+    def remove_listener(self, callback: Callable[[int], None]):
+        listeners = self._listeners.get(str(self.root.resolve()), [])
+        if callback in listeners:
+            listeners.remove(callback)
+
+    def _get_id(self, kind: str, key: Optional[str]) -> int:
+        """Return the small-int id for a table or provider key, registering it if new"""
+        key = key or self.DEFAULT_TABLE
+        ids = self.catalog[kind]
+        if key not in ids:
+            ids[key] = len(ids)
+            self._save_catalog()
+        return ids[key]
+
+    def table_id(self, table: Optional[str]) -> int:
+        """Get the id of a table key"""
+        with self._lock:
+            return self._get_id("tables", table)
+
+    def provider_id(self, provider: Optional[str]) -> int:
+        """Get the id of a provider key"""
+        with self._lock:
+            return self._get_id("providers", provider)
+
+    def tables(self) -> Dict[str, int]:
+        """Get all registered table keys and their ids"""
+        return dict(self.catalog["tables"])
+
+    @classmethod
+    def _datetime_to_ms(cls, ts: datetime) -> int:
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        return (ts - cls.EPOCH) // timedelta(milliseconds=1)
+
+    @classmethod
+    def _to_epoch_ms(cls, timestamps, count: int) -> np.ndarray:
+        """Convert datetimes, datetime64 values or epoch milliseconds to int64"""
+        if timestamps is None:
+            return np.full(count, cls._datetime_to_ms(datetime.now()), dtype=np.int64)
+
+        if isinstance(timestamps, np.ndarray):
+            if np.issubdtype(timestamps.dtype, np.datetime64):
+                return timestamps.astype("datetime64[ms]").astype(np.int64)
+            if np.issubdtype(timestamps.dtype, np.integer):
+                return timestamps.astype(np.int64, copy=False)
+
+        values = [
+            cls._datetime_to_ms(ts) if isinstance(ts, datetime) else int(ts)
+            for ts in timestamps
+        ]
+        return np.asarray(values, dtype=np.int64)
+
+    def append(self, number: int, timestamp: Optional[datetime] = None,
+              table: Optional[str] = None, provider: Optional[str] = None) -> int:
+        """Append a single spin"""
+        return self.append_many(
+            [number],
+            None if timestamp is None else [timestamp],
+            table=table,
+            provider=provider
+        )
+
+    def append_many(self, numbers: Iterable[int], timestamps=None,
+                   table: Optional[str] = None, provider: Optional[str] = None) -> int:
+        """Append a batch of spins for one table and return the number of rows written"""
+        numbers = np.asarray(numbers, dtype=np.int16)
+        if numbers.size == 0:
+            return 0
+        if numbers.min() < 0 or numbers.max() > 36:
+            raise ValueError("Roulette numbers must be between 0 and 36")
+
+        epochs = self._to_epoch_ms(timestamps, len(numbers))
+        if len(epochs) != len(numbers):
+            raise ValueError("numbers and timestamps must have the same length")
+
+        with self._lock:
+            columns = {
+                "number": numbers.astype(np.int8),
+                "epoch_ms": epochs,
+                "table_id": np.full(len(numbers), self._get_id("tables", table), dtype=np.int16),
+                "provider_id": np.full(len(numbers), self._get_id("providers", provider), dtype=np.int16)
+            }
+            for name, dtype in self.COLUMNS.items():
+                with open(self._column_path(name), 'ab') as f:
+                    f.write(columns[name].astype(dtype, copy=False).tobytes())
+            rows = self.committed_rows()
+
+        for callback in list(self._listeners.get(str(self.root.resolve()), ())):
+            try:
+                callback(rows)
+            except Exception:
+                pass  # A broken subscriber must not fail the collector's write
+        return len(numbers)
+
+    def _map_column(self, name: str, rows: int) -> np.ndarray:
+        """Memory-map a column read-only; no data is copied"""
+        if rows == 0:
+            return np.empty(0, dtype=self.COLUMNS[name])
+        return np.memmap(self._column_path(name), dtype=self.COLUMNS[name],
+                         mode='r', shape=(rows,))
+
+    def read(self, table: Optional[str] = None,
+             start: Optional[datetime] = None,
+             end: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Read spins as a dict of column arrays
+
+        Without filters the arrays are zero-copy memory maps over the column
+        files. Filtering by table or time range returns compact copies. Only
+        rows present in every column are returned, so a concurrent append
+        never leaves the columns misaligned.
+        """
+        rows = self.committed_rows()
+        columns = {name: self._map_column(name, rows) for name in self.COLUMNS}
+
+        mask = None
+        if table is not None:
+            table_id = self.catalog["tables"].get(table)
+            if table_id is None:
+                return {name: np.empty(0, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+            mask = columns["table_id"] == table_id
+        if start is not None:
+            start_mask = columns["epoch_ms"] >= self._to_epoch_ms([start], 1)[0]
+            mask = start_mask if mask is None else mask & start_mask
+        if end is not None:
+            end_mask = columns["epoch_ms"] < self._to_epoch_ms([end], 1)[0]
+            mask = end_mask if mask is None else mask & end_mask
+
+        if mask is None:
+            return columns
+        return {name: np.asarray(values[mask]) for name, values in columns.items()}
+
+    def read_rows(self, start: int, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Copy of the columns for rows ``[start, stop)`` (default: up to the last committed row)"""
+        rows = self.committed_rows()
+        stop = rows if stop is None else min(stop, rows)
+        start = max(0, min(start, stop))
+        return {name: np.array(self._map_column(name, rows)[start:stop]) for name in self.COLUMNS}
+
+    def key_names(self, kind: str) -> Dict[int, str]:
+        """Id -> key mapping for ``"tables"`` or ``"providers"``"""
+        return {id_: key for key, id_ in self.catalog[kind].items()}
+
+    def refresh_catalog(self):
+        """Pick up tables and providers registered by other processes"""
+        with self._lock:
+            self._load_catalog()
+
+    def numbers(self, table: Optional[str] = None) -> np.ndarray:
+        """Get the spin numbers (int8) for all tables or a single table"""
+        return self.read(table=table)["number"]
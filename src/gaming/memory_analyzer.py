@@ -1,21 +1,15 @@
-""
-  cmd = "top -bn1 | grep 'Cpu\|Mem'"
-Traceback (most recent call last):
-  File "c:\Users\shaonsai\CascadeProjects\windsurf-project\r_training_control.rpy2", line 1, in <module>
-    import rpy2.robjects as robjects
-ModuleNotFoundError: No module named 'rpy2'
-import rpy2.robjectsimport numpy as np
+import numpy as np
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-import torch
-import torch.nn as nn
 from collections import deque
 import joblib
 from sklearn.cluster import DBSCAN
 from scipy.stats import entropy
 import json
 
+from ..ml.runtime import load_runtime
+
 @dataclass
 class MemoryPattern:
     pattern_type: str  # flash, short, mid, long, mirror
@@ -25,27 +19,13 @@ class MemoryPattern:
     duration: timedelta
     repeats: int
     
-class AdvancedMemoryNetwork(nn.Module):
-    """Neural network for pattern recognition in different memory types"""
-    
-    def __init__(self, input_size: int, hidden_size: int = 128):
-        super().__init__()
-        self.lstm = nn.LSTM(input_size, hidden_size, num_layers=2, batch_first=True)
-        self.attention = nn.MultiheadAttention(hidden_size, num_heads=4)
-        self.fc1 = nn.Linear(hidden_size, 64)
-        self.fc2 = nn.Linear(64, input_size)
-        self.dropout = nn.Dropout(0.2)
-        
-    def forward(self, x, hidden=None):
-        lstm_out, hidden = self.lstm(x, hidden)
-        attn_out, _ = self.attention(lstm_out, lstm_out, lstm_out)
-        x = self.dropout(attn_out)
-        x = torch.relu(self.fc1(x))
-        x = self.fc2(x)
-        return x, hidden
-
 class GameMemoryAnalyzer:
-    """Advanced game and memory pattern analyzer"""
+    """Advanced game and memory pattern analyzer
+    
+    ``model_path`` may be a torch state dict or a ``.npz`` written by
+    ``export_runtime``; the latter runs on the NumPy runtime and never
+    imports torch.
+    """
     
     def __init__(self, model_path: Optional[str] = None):
         self.flash_memory = deque(maxlen=100)  # Last 100 flash patterns
@@ -55,10 +35,11 @@ class GameMemoryAnalyzer:
         self.mirror_patterns = {}  # Mirror pattern storage
         
         # Initialize neural network
-        self.network = AdvancedMemoryNetwork(input_size=37)  # For roulette numbers
-        if model_path:
-            self.network.load_state_dict(torch.load(model_path))
-        self.network.eval()
+        self.network = None
+        if model_path and str(model_path).endswith('.npz'):
+            self.network = load_runtime(model_path)
+        else:
+            self._build_network(model_path)
         
         # Pattern tracking
         self.active_patterns = {}
@@ -74,6 +55,24 @@ class GameMemoryAnalyzer:
             'mirror': {'patterns': {}}
         }
         
+    def _build_network(self, model_path: Optional[str] = None):
+        """Torch network for training, optionally restored from a state dict"""
+        import torch
+        from .memory_network import AdvancedMemoryNetwork
+        self.network = AdvancedMemoryNetwork(input_size=37)  # For roulette numbers
+        if model_path:
+            self.network.load_state_dict(torch.load(model_path))
+        self.network.eval()
+        
+    def _forward(self, sequence: np.ndarray) -> np.ndarray:
+        """Network output for a (1, steps, 37) sequence on whichever backend is loaded"""
+        if not hasattr(self.network, 'state_dict'):
+            return self.network(sequence)
+        import torch
+        with torch.no_grad():
+            predictions, _ = self.network(torch.from_numpy(sequence))
+        return predictions.numpy()
+        
     def analyze_sequence(self, numbers: List[int], 
                         timestamp: datetime = None) -> Dict[str, List[MemoryPattern]]:
         """Analyze a sequence for different types of memory patterns"""
@@ -88,12 +87,12 @@ class GameMemoryAnalyzer:
             'mirror': []
         }
         
-        # Convert to tensor
-        sequence = torch.tensor(numbers, dtype=torch.float32).view(1, -1, 1)
+        # One-hot encode the numbers, matching the network's 37 inputs
+        sequence = np.zeros((1, len(numbers), 37), dtype=np.float32)
+        sequence[0, np.arange(len(numbers)), numbers] = 1.0
         
         # Get network predictions
-        with torch.no_grad():
-            predictions, _ = self.network(sequence)
+        predictions = self._forward(sequence)
             
         # Analyze each memory type
         for memory_type in self.memory_banks:
@@ -114,7 +113,7 @@ class GameMemoryAnalyzer:
                            numbers: List[int], 
                            memory_type: str,
                            timestamp: datetime,
-                           predictions: torch.Tensor) -> List[MemoryPattern]:
+                           predictions: np.ndarray) -> List[MemoryPattern]:
         """Analyze sequence for specific memory type patterns"""
         patterns = []
         
@@ -328,9 +327,18 @@ class GameMemoryAnalyzer:
     
     def save_model(self, path: str):
         """Save the neural network model"""
+        import torch
         torch.save(self.network.state_dict(), path)
         
     def load_model(self, path: str):
         """Load the neural network model"""
-        self.network.load_state_dict(torch.load(path))
-        self.network.eval()
+        if str(path).endswith('.npz'):
+            self.network = load_runtime(path)
+        else:
+            self._build_network(path)
+        
+    def export_runtime(self, path: str):
+        """Export the torch network for torch-free inference (``.npz``)"""
+        from ..ml.export import export_model
+        return export_model(self.network, path,
+                            activations=self.network.EXPORT_ACTIVATIONS)
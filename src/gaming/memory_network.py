@@ -0,0 +1,24 @@
+import torch
+import torch.nn as nn
+
+class AdvancedMemoryNetwork(nn.Module):
+    """Neural network for pattern recognition in different memory types"""
+    
+    # Functional activations applied in forward(), for src.ml.export
+    EXPORT_ACTIVATIONS = {'fc1': 'relu'}
+    
+    def __init__(self, input_size: int, hidden_size: int = 128):
+        super().__init__()
+        self.lstm = nn.LSTM(input_size, hidden_size, num_layers=2, batch_first=True)
+        self.attention = nn.MultiheadAttention(hidden_size, num_heads=4)
+        self.fc1 = nn.Linear(hidden_size, 64)
+        self.fc2 = nn.Linear(64, input_size)
+        self.dropout = nn.Dropout(0.2)
+        
+    def forward(self, x, hidden=None):
+        lstm_out, hidden = self.lstm(x, hidden)
+        attn_out, _ = self.attention(lstm_out, lstm_out, lstm_out)
+        x = self.dropout(attn_out)
+        x = torch.relu(self.fc1(x))
+        x = self.fc2(x)
+        return x, hidden
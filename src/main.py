@@ -1,21 +1,61 @@
-chmod +x Main.py2rpy
-
-./install.sh
-
+import os
 import sys
 import logging
+import argparse
 import threading
 from pathlib import Path
-from agents.agent_interface import AgentInterface
-from api.server import start_server
-from database.database import DatabaseManager
-from scrapers.advanced_scraper import AdvancedScraper
-from scrapers.roulette_collector import RouletteDataCollector
-from analysis.roulette_analyzer import RouletteAnalyzer
-from utils.installation_manager import InstallationManager
+
+# Make the ``src`` package importable when run as a script
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.lazy_import import LazyInstance, is_loaded, mark, startup_report, timed
+
+# Subsystems are imported and constructed on first use, so startup and
+# --help never wait on TensorFlow, transformers or a headless browser
+def _agent_interface():
+    from src.agents.agent_interface import AgentInterface
+    interface = AgentInterface()
+    interface.start()
+    return interface
+
+def _scraper():
+    from src.scrapers.advanced_scraper import AdvancedScraper
+    return AdvancedScraper()
+
+def _roulette_collector():
+    from src.scrapers.roulette_collector import RouletteDataCollector
+    return RouletteDataCollector()
+
+def _roulette_analyzer():
+    from src.analysis.roulette_analyzer import RouletteAnalyzer
+    return RouletteAnalyzer()
+
+def _database(base_path):
+    def build():
+        from src.database.database import DatabaseManager
+        return DatabaseManager(base_path / "data/database")
+    return LazyInstance(build, "database")
+
+def start_api():
+    """Import and run the API server"""
+    with timed("api"):
+        from src.api.server import start_server
+    start_server()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI Operating System")
+    parser.add_argument("--no-api", action="store_true", help="do not start the API server")
+    parser.add_argument("--api-only", action="store_true",
+                        help="run only the API server, without the command loop")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print import/initialization time per subsystem")
+    return parser.parse_args(argv)
 
 class System:
     def __init__(self):
+        from src.utils.installation_manager import InstallationManager
         self.installation_manager = InstallationManager()
         self.installation_manager._load_config()
         self.current_drive = self._get_primary_drive()
@@ -53,11 +93,21 @@ def setup_environment():
     for subdir in ['logs', 'data', 'cache', 'config', 'models']:
         (app_dir / subdir).mkdir(parents=True, exist_ok=True)
         
-def main():
+def main(argv=None):
     """Main entry point for the system"""
+    args = parse_args(argv)
+    if args.api_only:
+        start_api()
+        return 0
+        
+    interface = LazyInstance(_agent_interface, "agent_interface")
+    scraper = LazyInstance(_scraper, "scraper")
+    roulette_collector = LazyInstance(_roulette_collector, "roulette_collector")
+    roulette_analyzer = LazyInstance(_roulette_analyzer, "roulette_analyzer")
     try:
         # Initialize system
-        system = System()
+        with timed("installation"):
+            system = System()
         if not system.current_drive:
             print("No primary installation found. Please run install.py first.")
             return 1
@@ -67,18 +117,19 @@ def main():
         
         # Initialize components with correct paths
         base_path = system.get_base_path()
-        db = DatabaseManager(base_path / "data/database")
-        scraper = AdvancedScraper()
-        interface = AgentInterface()
-        roulette_collector = RouletteDataCollector()
-        roulette_analyzer = RouletteAnalyzer()
+        db = _database(base_path)
         
         # Start API server in a separate thread
-        api_thread = threading.Thread(target=start_server, daemon=True)
-        api_thread.start()
+        if not args.no_api:
+            api_thread = threading.Thread(target=start_api, daemon=True)
+            api_thread.start()
+            
+        # Start agent interface (loads the language models) in the background
+        threading.Thread(target=interface.get, daemon=True).start()
         
-        # Start agent interface
-        interface.start()
+        mark("command loop ready")
+        if args.startup_report:
+            print(startup_report())
         
         print("\nWelcome to the AI Operating System!")
         print("\nAvailable interfaces:")
@@ -103,6 +154,7 @@ def main():
         print("- switch [drive]: Switch to different installation")
         print("- sync [source] [target]: Sync between installations")
         print("- status: Show installation status")
+        print("- startup report: Show import/initialization time per subsystem")
         print("\nPress Ctrl+C to exit")
         
         # Main command loop
@@ -149,9 +201,8 @@ def main():
                         print(f"Neural Network Accuracy: {results['neural_network_accuracy']:.2%}")
                         
                 elif command == 'predict next':
-                    data = db.get_website_data(url='roulette_spins')
-                    if data:
-                        numbers = [d.content['number'] for d in data][-10:]
+                    numbers = db.spins.numbers()[-10:].tolist()
+                    if numbers:
                         print("\nMaking prediction based on:", numbers)
                         prediction = roulette_analyzer.predict_next(numbers)
                         if prediction:
@@ -175,7 +226,7 @@ def main():
                         print(f"Switched to installation on drive {drive}")
                         # Reinitialize components with new paths
                         base_path = system.get_base_path()
-                        db = DatabaseManager(base_path / "data/database")
+                        db = _database(base_path)
                     else:
                         print(f"No installation found on drive {drive}")
                         
@@ -201,6 +252,9 @@ def main():
                         validation = system.installation_manager.validate_installation(install['drive'])
                         print(f"Space Available: {validation['space_available'] // (1024*1024*1024)}GB")
                         
+                elif command == 'startup report':
+                    print(startup_report())
+                    
                 else:
                     interface.send_command(command)
                     
@@ -216,9 +270,13 @@ def main():
         
     finally:
         print("\nShutting down...")
-        interface.stop()
-        scraper.close()
-        roulette_collector.close()
+        # Only components that were actually started need stopping
+        if is_loaded(interface):
+            interface.stop()
+        if is_loaded(scraper):
+            scraper.close()
+        if is_loaded(roulette_collector):
+            roulette_collector.close()
         
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import time
+import asyncio
+import logging
+import numpy as np
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into micro-batches
+
+    Requests queue up until ``max_batch_size`` rows are waiting or
+    ``max_latency_ms`` has passed since the first one arrived. The batch is
+    then stacked into one matrix, ``predict_fn`` runs once on it in a worker
+    thread (keeping the event loop free) and row ``i`` of the output resolves
+    request ``i``.
+
+    Every row must have ``n_features`` values; when it is not given, the
+    length of the first row is used.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], Sequence[Any]],
+                 max_batch_size: int = 64, max_latency_ms: float = 5.0,
+                 history: int = 10000, n_features: Optional[int] = None):
+        self.predict_fn = predict_fn
+        self.n_features = n_features
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.latencies = deque(maxlen=history)
+        self.batch_sizes = Counter()
+        self.queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the batching loop on the running event loop"""
+        if self._worker is None or self._worker.done():
+            if self.queue is None:
+                self.queue = asyncio.Queue()  # Kept across restarts so queued requests are not orphaned
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def predict(self, row: Sequence[float]) -> Any:
+        """Queue one feature row and wait for its prediction
+
+        Raises ``ValueError`` for a row that is not a flat vector of
+        ``n_features`` values, before it can join a batch.
+        """
+        row = np.asarray(row, dtype=np.float32)
+        if row.ndim != 1:
+            raise ValueError(f"Expected a flat feature row, got shape {row.shape}")
+        if self.n_features is None:
+            self.n_features = len(row)
+        elif len(row) != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {len(row)}")
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> List:
+        """Wait for a first request, then gather more until the batch or budget is full"""
+        batch = [await self.queue.get()]
+        deadline = batch[0][2] + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Drain whatever else is already waiting at no extra latency
+        while len(batch) < self.max_batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            try:
+                rows = np.stack([item[0] for item in batch])
+                outputs = list(await loop.run_in_executor(None, self.predict_fn, rows))
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f"Model returned {len(outputs)} rows for a batch of {len(batch)}")
+            except Exception as e:
+                logging.error(f"Error running prediction batch: {str(e)}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            self.batch_sizes[len(batch)] += 1
+            for (_, future, queued), output in zip(batch, outputs):
+                self.latencies.append(finished - queued)
+                if not future.done():
+                    future.set_result(output)
+
+    def stats(self) -> Dict:
+        """Latency percentiles (ms) and the batch-size histogram"""
+        latencies = np.array(self.latencies) * 1000
+        batches = sum(self.batch_sizes.values())
+        return {
+            "requests": len(latencies),
+            "batches": batches,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "mean_batch_size": sum(k * v for k, v in self.batch_sizes.items()) / batches if batches else 0,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items()))
+        }
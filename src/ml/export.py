@@ -0,0 +1,124 @@
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from .runtime import ACTIVATIONS, NumpyModel
+
+# Layers that only matter during training
+KERAS_SKIPPED = ('InputLayer', 'Dropout', 'GaussianNoise', 'ActivityRegularization')
+TORCH_SKIPPED = ('Dropout', 'Identity')
+
+def _activation(name: str) -> str:
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return name
+
+def keras_to_numpy(model) -> NumpyModel:
+    """Convert a Sequential Keras model of Dense/LSTM layers"""
+    layers, weights = [], []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind in KERAS_SKIPPED:
+            continue
+        config = layer.get_config()
+        params = [np.asarray(w) for w in layer.get_weights()]
+        if kind == 'Dense':
+            layers.append({'type': 'dense', 'activation': _activation(config['activation'])})
+            weights.append(dict(zip(('kernel', 'bias'), params)))
+        elif kind == 'LSTM':
+            if config.get('go_backwards') or config.get('stateful'):
+                raise ValueError(f"Unsupported LSTM configuration in {layer.name}")
+            if len(params) == 2:  # use_bias=False
+                params.append(np.zeros(params[0].shape[1], dtype=np.float32))
+            layers.append({
+                'type': 'lstm',
+                'activation': _activation(config['activation']),
+                'recurrent_activation': _activation(config['recurrent_activation']),
+                'return_sequences': bool(config['return_sequences'])
+            })
+            weights.append(dict(zip(('kernel', 'recurrent_kernel', 'bias'), params)))
+        elif kind == 'Activation':
+            layers[-1]['activation'] = _activation(config['activation'])
+        else:
+            raise ValueError(f"Unsupported Keras layer: {kind}")
+    return NumpyModel(layers, weights, source='keras')
+
+def _torch_lstm(module):
+    """One runtime layer per stacked torch LSTM layer
+
+    Torch orders the gates i, f, g, o, the same as Keras' i, f, c, o, so the
+    weights only need transposing and the two bias vectors summing.
+    """
+    if module.bidirectional or getattr(module, 'proj_size', 0):
+        raise ValueError("Bidirectional and projected LSTMs are not supported")
+    if not module.batch_first:
+        raise ValueError("Only batch_first torch LSTMs are supported")
+    layers, weights = [], []
+    for k in range(module.num_layers):
+        w_ih = getattr(module, f'weight_ih_l{k}').detach().cpu().numpy()
+        w_hh = getattr(module, f'weight_hh_l{k}').detach().cpu().numpy()
+        bias = np.zeros(w_ih.shape[0], dtype=np.float32)
+        if module.bias:
+            bias = (getattr(module, f'bias_ih_l{k}') + getattr(module, f'bias_hh_l{k}')).detach().cpu().numpy()
+        layers.append({'type': 'lstm', 'return_sequences': True})
+        weights.append({'kernel': w_ih.T, 'recurrent_kernel': w_hh.T, 'bias': bias})
+    return layers, weights
+
+def torch_to_numpy(module, activations: Optional[Dict[str, str]] = None) -> NumpyModel:
+    """Convert a torch module whose children run in registration order
+
+    ``activations`` maps child names to the activation the module's
+    ``forward`` applies after them (e.g. ``{'fc1': 'relu'}``), since
+    functional calls are not visible as children.
+    """
+    activations = activations or {}
+    layers, weights = [], []
+    for name, child in module.named_children():
+        kind = type(child).__name__
+        if kind in TORCH_SKIPPED:
+            continue
+        if kind == 'Linear':
+            layers.append({'type': 'dense', 'activation': 'linear'})
+            w = {'kernel': child.weight.detach().cpu().numpy().T}
+            if child.bias is not None:
+                w['bias'] = child.bias.detach().cpu().numpy()
+            weights.append(w)
+        elif kind == 'LSTM':
+            lstm_layers, lstm_weights = _torch_lstm(child)
+            layers.extend(lstm_layers)
+            weights.extend(lstm_weights)
+        elif kind == 'MultiheadAttention':
+            if child.in_proj_weight is None:
+                raise ValueError("MultiheadAttention with separate q/k/v sizes is not supported")
+            layers.append({
+                'type': 'attention',
+                'num_heads': child.num_heads,
+                'batch_first': bool(child.batch_first)
+            })
+            weights.append({
+                'in_kernel': child.in_proj_weight.detach().cpu().numpy().T,
+                'in_bias': child.in_proj_bias.detach().cpu().numpy(),
+                'out_kernel': child.out_proj.weight.detach().cpu().numpy().T,
+                'out_bias': child.out_proj.bias.detach().cpu().numpy()
+            })
+        elif kind in ('ReLU', 'Tanh', 'Sigmoid', 'Softmax'):
+            layers[-1]['activation'] = kind.lower()
+            continue
+        else:
+            raise ValueError(f"Unsupported torch layer: {kind}")
+        if name in activations:
+            layers[-1]['activation'] = _activation(activations[name])
+    return NumpyModel(layers, weights, source='torch')
+
+def export_model(model, path: Union[str, Path], **kwargs) -> Path:
+    """Export a trained Keras or torch net to a ``.npz`` for ``load_runtime``"""
+    module = type(model).__module__
+    if module.startswith(('keras', 'tensorflow', 'tf_keras')):
+        runtime = keras_to_numpy(model)
+    elif hasattr(model, 'named_children') and hasattr(model, 'state_dict'):
+        runtime = torch_to_numpy(model, **kwargs)
+    else:
+        raise ValueError(f"Cannot export {type(model).__name__}")
+    path = Path(path)
+    runtime.save(path)
+    return path
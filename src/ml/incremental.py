@@ -0,0 +1,76 @@
+import numpy as np
+from typing import Any, Optional, Tuple
+
+ALL_CLASSES = np.arange(37)
+
+def _with_all_classes(X: np.ndarray, y: np.ndarray,
+                      classes: np.ndarray = ALL_CLASSES) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Append a zero-weight row for every class missing from a small batch
+
+    The scikit-learn wrappers derive the label set from ``y`` on every fit,
+    so a batch of new spins that happens to miss a number would otherwise
+    change the model's output shape. Zero-weight rows register the label
+    without influencing any split.
+    """
+    missing = np.setdiff1d(classes, y)
+    weights = np.ones(len(y) + len(missing))
+    if len(missing):
+        X = np.concatenate([X, np.repeat(X[:1], len(missing), axis=0)])
+        y = np.concatenate([y, missing])
+        weights[-len(missing):] = 0
+    return X, y, weights
+
+def continue_training(model: Any, X: np.ndarray, y: np.ndarray,
+                      rounds: int = 50, epochs: int = 5, extra_trees: int = 10) -> Any:
+    """Update a fitted model with new rows only
+
+    - XGBoost / LightGBM: ``rounds`` more boosting rounds starting from the
+      current booster
+    - Random forest: ``extra_trees`` more trees grown on the new rows
+      (``warm_start``)
+    - Keras: ``epochs`` more epochs over the new rows
+    - MLP: ``epochs`` ``partial_fit`` passes
+    """
+    X = np.asarray(X)
+    y = np.asarray(y, dtype=np.int64)
+    if len(y) == 0:
+        return model
+
+    if hasattr(model, 'get_booster'):  # XGBoost
+        X, y, weights = _with_all_classes(X, y)
+        n_estimators = model.get_params()['n_estimators']
+        model.set_params(n_estimators=rounds)
+        try:
+            model.fit(X, y, sample_weight=weights, xgb_model=model.get_booster())
+        finally:
+            model.set_params(n_estimators=n_estimators)
+    elif hasattr(model, 'booster_'):  # LightGBM
+        X, y, weights = _with_all_classes(X, y)
+        n_estimators = model.get_params()['n_estimators']
+        model.set_params(n_estimators=rounds)
+        try:
+            model.fit(X, y, sample_weight=weights, init_model=model.booster_)
+        finally:
+            model.set_params(n_estimators=n_estimators)
+    elif hasattr(model, 'estimators_') and 'warm_start' in model.get_params():  # Random forest
+        X, y, weights = _with_all_classes(X, y, model.classes_)
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + extra_trees)
+        model.fit(X, y, sample_weight=weights)
+    elif hasattr(model, 'partial_fit'):  # MLP
+        for _ in range(epochs):
+            model.partial_fit(X, y, classes=ALL_CLASSES)
+    elif hasattr(model, 'compile'):  # Keras
+        model.fit(X, y, epochs=epochs, batch_size=32, verbose=0)
+    else:
+        raise ValueError(f"Incremental training not supported for {type(model).__name__}")
+    return model
+
+def new_rows(total: int, watermark: int, context: int = 0) -> Optional[slice]:
+    """Rows added since ``watermark``, or None when a full retrain is needed
+
+    ``context`` extra rows before the watermark are included for models whose
+    inputs look back over previous spins.
+    """
+    if watermark <= 0 or watermark > total:
+        return None
+    return slice(max(watermark - context, 0), total)
@@ -5,19 +5,34 @@ import numpy as np
 from pathlib import Path
 import joblib
 from typing import Dict, List, Optional, Union
-import tensorflow as tf
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.neural_network import MLPClassifier
 from sklearn.model_selection import train_test_split
 import logging
 
+from .model_registry import ModelRegistry, joblib_loader
+from .incremental import continue_training, new_rows
+from .runtime import load_runtime
+
 class MLManager:
-    """Manages scalable ML/AI models with time-based analysis"""
+    """Manages scalable ML/AI models with time-based analysis
+    
+    ``self.models`` only holds metadata; the model objects live in a
+    ``ModelRegistry`` that loads saved artifacts on first use and evicts the
+    least recently used ones beyond ``max_loaded_models``/``max_memory_mb``.
+    
+    Deep learning models are also exported to ``model.npz`` when saved. With
+    ``inference_only=True`` (serving processes) they are loaded from that
+    export and run on the NumPy runtime, so TensorFlow is never imported.
+    """
     
-    def __init__(self, base_path: Path):
+    def __init__(self, base_path: Path, max_loaded_models: Optional[int] = 4,
+                 max_memory_mb: Optional[float] = None, inference_only: bool = False):
         self.base_path = base_path / "models"
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.inference_only = inference_only
         self.models = {}
+        self.registry = ModelRegistry(max_loaded_models, max_memory_mb)
         self.model_metrics = {}
         self.training_history = {}
         
@@ -34,20 +49,22 @@ class MLManager:
                 raise ValueError(f"Unsupported model type: {model_type}")
                 
             self.models[model_name] = {
-                "model": model,
                 "type": model_type,
                 "created_at": datetime.now().isoformat(),
                 "last_trained": None,
-                "version": "1.0"
+                "version": "1.0",
+                "watermark": 0
             }
+            self.registry.put(model_name, model, metadata=self.models[model_name])
             return True
             
         except Exception as e:
             logging.error(f"Error creating model {model_name}: {str(e)}")
             return False
     
-    def _create_deep_learning_model(self, params: Dict) -> tf.keras.Model:
+    def _create_deep_learning_model(self, params: Dict) -> "tf.keras.Model":
         """Create a deep learning model with specified architecture"""
+        import tensorflow as tf
         input_shape = params.get("input_shape", (10,))
         layers = params.get("layers", [64, 32])
         
@@ -70,7 +87,7 @@ class MLManager:
             if not model_info:
                 raise ValueError(f"Model {model_name} not found")
                 
-            model = model_info["model"]
+            model = self.registry.get(model_name)
             X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=validation_split)
             
             # Train based on model type
@@ -99,6 +116,7 @@ class MLManager:
             
             # Update model information
             model_info["last_trained"] = datetime.now().isoformat()
+            model_info["watermark"] = len(X)
             self.model_metrics[model_name] = metrics
             
             # Save training history
@@ -124,7 +142,7 @@ class MLManager:
             if not model_info:
                 raise ValueError(f"Model {model_name} not found")
                 
-            model = model_info["model"]
+            model = self.registry.get(model_name)
             
             if return_proba:
                 if hasattr(model, 'predict_proba'):
@@ -178,30 +196,126 @@ class MLManager:
             model_dir = self.base_path / model_name
             model_dir.mkdir(exist_ok=True)
             
-            # Save model
+            # Save model (joblib uncompressed so it can be memory-mapped on load)
+            model = self.registry.get(model_name)
             if model_info["type"] == "deep_learning":
-                model_info["model"].save(str(model_dir / "model"))
+                from .export import export_model
+                model.save(str(model_dir / "model"))
+                export_model(model, model_dir / "model.npz")
             else:
-                joblib.dump(model_info["model"], model_dir / "model.joblib")
+                # Write then rename: a memory-mapped copy of the old file may
+                # still be in use and must not be truncated underneath it
+                tmp_path = model_dir / "model.joblib.tmp"
+                joblib.dump(model, tmp_path)
+                os.replace(tmp_path, model_dir / "model.joblib")
+            self.registry.register(model_name, self._loader(model_name, model_info["type"]))
+            self._save_metadata(model_name)
+                
+        except Exception as e:
+            logging.error(f"Error saving model {model_name}: {str(e)}")
+    
+    def _save_metadata(self, model_name: str):
+        """Write a model's metadata.json"""
+        model_info = self.models[model_name]
+        model_dir = self.base_path / model_name
+        model_dir.mkdir(exist_ok=True)
+        metadata = {
+            "type": model_info["type"],
+            "created_at": model_info["created_at"],
+            "last_trained": model_info["last_trained"],
+            "version": model_info["version"],
+            "watermark": model_info.get("watermark", 0),
+            "metrics": self.model_metrics.get(model_name, {}),
+            "history": self.training_history.get(model_name, [])
+        }
+        
+        with open(model_dir / "metadata.json", 'w') as f:
+            json.dump(metadata, f, indent=4)
+    
+    def get_watermark(self, model_name: str) -> int:
+        """Number of data rows the model has been trained on so far"""
+        model_info = self.models.get(model_name)
+        if model_info is None and not self.load_model(model_name):
+            return 0
+        return self.models[model_name].get("watermark", 0)
+    
+    def set_watermark(self, model_name: str, rows: int, model_type: str = "external"):
+        """Record the training watermark of a model, including ones trained elsewhere
+        
+        Models owned by other components (e.g. the PredictionAgent ensemble)
+        only get a metadata entry so their watermark survives restarts.
+        """
+        if model_name not in self.models and not self.load_model(model_name):
+            self.models[model_name] = {
+                "type": model_type,
+                "created_at": datetime.now().isoformat(),
+                "last_trained": None,
+                "version": "1.0"
+            }
+        model_info = self.models[model_name]
+        model_info["watermark"] = int(rows)
+        model_info["last_trained"] = datetime.now().isoformat()
+        self._save_metadata(model_name)
+    
+    def train_incremental(self, model_name: str, X: np.ndarray, y: np.ndarray,
+                          **kwargs) -> Dict:
+        """Train only on rows added since the model's watermark
+        
+        ``X``/``y`` are the full, append-only training data. Models without a
+        watermark (or whose data shrank) are trained from scratch instead.
+        Extra keyword arguments go to ``continue_training``.
+        """
+        try:
+            model_info = self.models.get(model_name)
+            if not model_info:
+                raise ValueError(f"Model {model_name} not found")
+                
+            rows = new_rows(len(X), model_info.get("watermark", 0))
+            if rows is None:
+                return self.train_model(model_name, X, y)
+            if rows.start == len(X):
+                return {"new_rows": 0}
+                
+            model = self.registry.get(model_name)
+            continue_training(model, X[rows], y[rows], **kwargs)
+            model_info["last_trained"] = datetime.now().isoformat()
+            model_info["watermark"] = len(X)
             
-            # Save metadata
-            metadata = {
-                "type": model_info["type"],
-                "created_at": model_info["created_at"],
-                "last_trained": model_info["last_trained"],
-                "version": model_info["version"],
+            self.training_history.setdefault(model_name, []).append({
+                "timestamp": model_info["last_trained"],
                 "metrics": self.model_metrics.get(model_name, {}),
-                "history": self.training_history.get(model_name, [])
-            }
+                "samples": len(X) - rows.start,
+                "incremental": True
+            })
+            self._save_model(model_name)
+            return {"new_rows": len(X) - rows.start, "watermark": len(X)}
             
-            with open(model_dir / "metadata.json", 'w') as f:
-                json.dump(metadata, f, indent=4)
-                
         except Exception as e:
-            logging.error(f"Error saving model {model_name}: {str(e)}")
+            logging.error(f"Error training model {model_name} incrementally: {str(e)}")
+            return {}
+    
+    def _loader(self, model_name: str, model_type: str):
+        """Build the lazy loader for a saved model"""
+        model_dir = self.base_path / model_name
+        if model_type == "deep_learning":
+            if self.inference_only and (model_dir / "model.npz").exists():
+                return lambda: load_runtime(model_dir / "model.npz")
+            
+            def load_keras():
+                import tensorflow as tf
+                return tf.keras.models.load_model(str(model_dir / "model"))
+            return load_keras
+        # Memory-mapped arrays are read-only, which only suits models that are
+        # never updated in place (forests grow new trees on warm start)
+        mmap_mode = 'r' if model_type == "random_forest" else None
+        return joblib_loader(model_dir / "model.joblib", mmap_mode=mmap_mode)
     
-    def load_model(self, model_name: str) -> bool:
-        """Load a saved model and its metadata"""
+    def load_model(self, model_name: str, eager: bool = False) -> bool:
+        """Register a saved model from its metadata
+        
+        The artifact is loaded on the first ``predict`` (or right away with
+        ``eager=True``).
+        """
         try:
             model_dir = self.base_path / model_name
             if not model_dir.exists():
@@ -211,24 +325,36 @@ class MLManager:
             with open(model_dir / "metadata.json", 'r') as f:
                 metadata = json.load(f)
                 
-            # Load model based on type
-            if metadata["type"] == "deep_learning":
-                model = tf.keras.models.load_model(str(model_dir / "model"))
-            else:
-                model = joblib.load(model_dir / "model.joblib")
-                
             self.models[model_name] = {
-                "model": model,
                 "type": metadata["type"],
                 "created_at": metadata["created_at"],
                 "last_trained": metadata["last_trained"],
-                "version": metadata["version"]
+                "version": metadata["version"],
+                "watermark": metadata.get("watermark", 0)
             }
+            self.registry.register(
+                model_name,
+                self._loader(model_name, metadata["type"]),
+                metadata=self.models[model_name]
+            )
             
             self.model_metrics[model_name] = metadata["metrics"]
             self.training_history[model_name] = metadata["history"]
+            if eager:
+                self.registry.get(model_name)
             return True
             
         except Exception as e:
             logging.error(f"Error loading model {model_name}: {str(e)}")
             return False
+    
+    def load_all_models(self) -> List[str]:
+        """Register every saved model's metadata without loading artifacts"""
+        names = [
+            path.parent.name for path in sorted(self.base_path.glob("*/metadata.json"))
+        ]
+        return [name for name in names if self.load_model(name)]
+    
+    def get_registry_metrics(self) -> Dict:
+        """Cold-start time and resident memory of each loaded model"""
+        return self.registry.metrics()
@@ -0,0 +1,167 @@
+import time
+import psutil
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+def joblib_loader(path, mmap_mode: Optional[str] = 'r') -> Callable[[], Any]:
+    """Loader for a joblib artifact
+
+    With ``mmap_mode='r'`` the NumPy arrays inside the pickle (e.g. the node
+    arrays of tree ensembles) are memory-mapped from the file instead of
+    copied into RAM, so large forests load quickly and share pages between
+    processes. This needs the artifact to be dumped without compression.
+    """
+    def load():
+        import joblib
+        return joblib.load(path, mmap_mode=mmap_mode)
+    return load
+
+class ModelRegistry:
+    """Lazily loaded models behind a size- and memory-bounded LRU
+
+    Every registered model keeps its metadata and a loader in memory; the
+    artifact itself is only loaded on first use and may be evicted again
+    when more than ``max_models`` are loaded or their combined resident
+    memory exceeds ``max_memory_mb``. Models added with ``put`` and no loader
+    cannot be reloaded, so they are pinned until a loader is set.
+
+    Supports ``registry[name]`` access so it can stand in for a plain dict of
+    models.
+    """
+
+    def __init__(self, max_models: Optional[int] = 4, max_memory_mb: Optional[float] = None):
+        self.max_models = max_models
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024 if max_memory_mb else None
+        self.entries: Dict[str, Dict] = {}
+        self.loaded: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._process = psutil.Process()
+
+    def register(self, name: str, loader: Callable[[], Any], metadata: Optional[Dict] = None):
+        """Make a model available without loading it"""
+        with self._lock:
+            entry = self.entries.setdefault(name, self._new_entry())
+            entry["loader"] = loader
+            if metadata is not None:
+                entry["metadata"] = metadata
+
+    def put(self, name: str, model: Any, loader: Optional[Callable[[], Any]] = None,
+            metadata: Optional[Dict] = None):
+        """Add an already constructed model, e.g. one that was just trained"""
+        with self._lock:
+            entry = self.entries.setdefault(name, self._new_entry())
+            if loader is not None:
+                entry["loader"] = loader
+            if metadata is not None:
+                entry["metadata"] = metadata
+            self.loaded[name] = model
+            self.loaded.move_to_end(name)
+            self._evict()
+
+    def _new_entry(self) -> Dict:
+        return {
+            "loader": None,
+            "metadata": {},
+            "loads": 0,
+            "hits": 0,
+            "cold_start_seconds": None,
+            "rss_bytes": 0,
+            "last_used": None
+        }
+
+    def get(self, name: str) -> Any:
+        """Return a model, loading it on a miss"""
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                raise KeyError(f"Model {name} not registered")
+            entry["last_used"] = datetime.now().isoformat()
+            if name in self.loaded:
+                entry["hits"] += 1
+                self.loaded.move_to_end(name)
+                return self.loaded[name]
+            if entry["loader"] is None:
+                raise KeyError(f"Model {name} has no loader")
+
+            rss_before = self._process.memory_info().rss
+            started = time.perf_counter()
+            model = entry["loader"]()
+            entry["cold_start_seconds"] = time.perf_counter() - started
+            entry["rss_bytes"] = max(self._process.memory_info().rss - rss_before, 0)
+            entry["loads"] += 1
+            logging.info(f"Loaded model {name} in {entry['cold_start_seconds']:.3f}s")
+
+            self.loaded[name] = model
+            self._evict()
+            return model
+
+    def _evict(self):
+        """Drop least recently used, reloadable models until within bounds"""
+        def over_limit():
+            if self.max_models is not None and len(self.loaded) > self.max_models:
+                return True
+            if self.max_memory_bytes is not None:
+                return self.resident_bytes() > self.max_memory_bytes
+            return False
+
+        for name in list(self.loaded):
+            if not over_limit():
+                break
+            # Keep the most recently used model and anything that cannot be reloaded
+            if name == next(reversed(self.loaded)) or self.entries[name]["loader"] is None:
+                continue
+            self.evict(name)
+
+    def evict(self, name: str):
+        """Unload a model, keeping its metadata and loader"""
+        with self._lock:
+            if self.loaded.pop(name, None) is not None:
+                logging.info(f"Evicted model {name}")
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self.loaded
+
+    def resident_bytes(self) -> int:
+        """Resident memory attributed to the currently loaded models"""
+        return sum(self.entries[name]["rss_bytes"] for name in self.loaded)
+
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def metadata(self, name: str) -> Dict:
+        return self.entries[name]["metadata"]
+
+    def metrics(self) -> Dict:
+        """Cold-start time, resident memory and hit counts per model"""
+        with self._lock:
+            return {
+                "loaded": list(self.loaded),
+                "resident_bytes": self.resident_bytes(),
+                "process_rss_bytes": self._process.memory_info().rss,
+                "models": {
+                    name: {
+                        "loaded": name in self.loaded,
+                        "loads": entry["loads"],
+                        "hits": entry["hits"],
+                        "cold_start_seconds": entry["cold_start_seconds"],
+                        "rss_bytes": entry["rss_bytes"],
+                        "last_used": entry["last_used"]
+                    }
+                    for name, entry in self.entries.items()
+                }
+            }
+
+    def __getitem__(self, name: str) -> Any:
+        return self.get(name)
+
+    def __setitem__(self, name: str, model: Any):
+        self.put(name, model)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
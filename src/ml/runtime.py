@@ -0,0 +1,135 @@
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Union
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)  # Overflow-free logistic
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'softmax': _softmax
+}
+
+def _dense(layer: Dict, weights: Dict, x: np.ndarray) -> np.ndarray:
+    y = x @ weights['kernel']
+    if 'bias' in weights:
+        y += weights['bias']
+    return ACTIVATIONS[layer.get('activation', 'linear')](y)
+
+def _lstm(layer: Dict, weights: Dict, x: np.ndarray) -> np.ndarray:
+    """Keras-convention LSTM over (batch, time, features); gates ordered i, f, c, o"""
+    kernel, recurrent, bias = weights['kernel'], weights['recurrent_kernel'], weights['bias']
+    units = recurrent.shape[0]
+    activation = ACTIVATIONS[layer.get('activation', 'tanh')]
+    recurrent_activation = ACTIVATIONS[layer.get('recurrent_activation', 'sigmoid')]
+
+    # Input projections of every step in one matmul; only h @ U stays in the loop
+    projected = x @ kernel + bias
+    h = np.zeros((x.shape[0], units), dtype=x.dtype)
+    c = np.zeros_like(h)
+    outputs = []
+    for t in range(x.shape[1]):
+        z = projected[:, t] + h @ recurrent
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units:2 * units])
+        c = f * c + i * activation(z[:, 2 * units:3 * units])
+        h = recurrent_activation(z[:, 3 * units:]) * activation(c)
+        outputs.append(h)
+    return np.stack(outputs, axis=1) if layer.get('return_sequences') else h
+
+def _attention(layer: Dict, weights: Dict, x: np.ndarray) -> np.ndarray:
+    """Self-attention as ``torch.nn.MultiheadAttention(x, x, x)``
+
+    Without ``batch_first`` the input is read as (time, batch, features),
+    exactly as torch does.
+    """
+    if not layer.get('batch_first'):
+        x = x.swapaxes(0, 1)
+    batch, steps, embed = x.shape
+    heads = layer['num_heads']
+    size = embed // heads
+
+    qkv = x @ weights['in_kernel'] + weights['in_bias']
+    qkv = qkv.reshape(batch, steps, 3, heads, size).transpose(2, 0, 3, 1, 4)
+    q, k, v = qkv[0], qkv[1], qkv[2]
+    scores = _softmax(q @ k.swapaxes(-1, -2) / np.sqrt(size).astype(x.dtype))
+    out = (scores @ v).transpose(0, 2, 1, 3).reshape(batch, steps, embed)
+    out = out @ weights['out_kernel'] + weights['out_bias']
+    return out if layer.get('batch_first') else out.swapaxes(0, 1)
+
+LAYERS = {
+    'dense': _dense,
+    'lstm': _lstm,
+    'attention': _attention
+}
+
+class NumpyModel:
+    """Framework-free forward pass over exported weights
+
+    Runs dense, LSTM and multi-head self-attention layers in float32 NumPy,
+    so serving processes can score Keras and Torch nets without importing
+    either framework. Call it like a Keras model (``model(X)`` or
+    ``model.predict(X)``); ``predict_proba`` is available for softmax outputs.
+    """
+
+    def __init__(self, layers: List[Dict], weights: List[Dict[str, np.ndarray]],
+                 source: str = 'numpy'):
+        for layer in layers:
+            if layer['type'] not in LAYERS:
+                raise ValueError(f"Unsupported layer type: {layer['type']}")
+        self.layers = layers
+        self.weights = [
+            {name: np.ascontiguousarray(value, dtype=np.float32) for name, value in w.items()}
+            for w in weights
+        ]
+        self.source = source
+
+    def __call__(self, X, training: bool = False) -> np.ndarray:
+        x = np.asarray(X, dtype=np.float32)
+        for layer, weights in zip(self.layers, self.weights):
+            x = LAYERS[layer['type']](layer, weights, x)
+        return x
+
+    def predict(self, X, **kwargs) -> np.ndarray:
+        return self(X)
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self.layers[-1].get('activation') != 'softmax':
+            raise ValueError("Model output is not a probability distribution")
+        return self(X)
+
+    def save(self, path: Union[str, Path]):
+        """Write the layer spec and weights to a single ``.npz`` file"""
+        path = Path(path)
+        arrays = {
+            f"{i}/{name}": value
+            for i, weights in enumerate(self.weights) for name, value in weights.items()
+        }
+        spec = json.dumps({"source": self.source, "layers": self.layers})
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, spec=np.array(spec), **arrays)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "NumpyModel":
+        with np.load(path, allow_pickle=False) as data:
+            spec = json.loads(str(data['spec']))
+            weights = [{} for _ in spec['layers']]
+            for key in data.files:
+                if key != 'spec':
+                    index, name = key.split('/', 1)
+                    weights[int(index)][name] = data[key]
+        return cls(spec['layers'], weights, source=spec.get('source', 'numpy'))
+
+def load_runtime(path: Union[str, Path]) -> NumpyModel:
+    """Load a model exported by ``src.ml.export``"""
+    return NumpyModel.load(path)
@@ -1,23 +1,88 @@
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-import torch
 import xgboost as xgb
 import lightgbm as lgb
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
-import optuna
 from datetime import datetime, timedelta
 import json
 import os
+from pathlib import Path
+
+from ..ml.model_registry import ModelRegistry
+from ..ml.ml_manager import MLManager
+from ..ml.incremental import continue_training, new_rows
+from ..ml.runtime import load_runtime
+from .tuning import HyperparameterTuner
+from .feature_store import FEATURE_COLUMNS, frame_to_features
+
+class LoadedLGBMClassifier:
+    """Classifier interface over a LightGBM Booster loaded from disk
+    
+    ``LGBMClassifier.booster_`` is read-only, so a saved booster cannot be put
+    back into a fresh classifier. This exposes the parts the agent uses:
+    ``predict_proba``/``predict``/``score``, feature importances, and a
+    ``booster_`` that ``fit(..., init_model=...)`` continues from, which is
+    what ``continue_training`` relies on.
+    """
+    
+    def __init__(self, booster, **params):
+        self.booster_ = booster
+        self.params = params
+        
+    def get_params(self, deep=True):
+        return dict(self.params)
+        
+    def set_params(self, **params):
+        self.params.update(params)
+        return self
+        
+    @property
+    def feature_importances_(self):
+        return self.booster_.feature_importance()
+        
+    def predict_proba(self, X):
+        return self.booster_.predict(np.asarray(X))
+        
+    def predict(self, X):
+        return np.argmax(self.predict_proba(X), axis=1)
+        
+    def score(self, X, y):
+        return float(np.mean(self.predict(X) == np.asarray(y)))
+        
+    def fit(self, X, y, sample_weight=None, init_model=None):
+        """Boost ``n_estimators`` more rounds, starting from ``init_model``"""
+        model = lgb.LGBMClassifier(**self.params)
+        model.fit(X, y, sample_weight=sample_weight, init_model=init_model)
+        self.booster_ = model.booster_
+        return self
+
+def _check_artifact(path, header=None):
+    """Cheap sanity check of a saved model: present, non-empty and, for
+    files, starting with the format's ``header`` bytes; nothing is deserialized"""
+    if os.path.isdir(path):
+        # Keras SavedModel directory
+        path = os.path.join(path, 'saved_model.pb')
+        header = None
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Missing {path}")
+    with open(path, 'rb') as f:
+        start = f.read(len(header or b'_'))
+    if not start or (header is not None and start != header):
+        raise ValueError(f"Unreadable model artifact {path}")
 
 class PredictionAgent:
     def __init__(self):
-        self.models = {}
         self.scalers = {}
         self.feature_importance = {}
         self.accuracy_history = []
+        self.trained_rows = None  # Watermark to record once the models are saved
         self.load_config()
+        # Optional "models" section of the storage config bounds the loaded models
+        registry = self.config.get('models', {})
+        self.models = ModelRegistry(max_models=registry.get('max_loaded', 3),
+                                    max_memory_mb=registry.get('max_memory_mb'))
+        self.ml_manager = MLManager(Path(self.config['data_root']))
         
     def load_config(self):
         """Load configuration settings"""
@@ -26,39 +91,16 @@ class PredictionAgent:
             self.config = json.load(f)
             
     def prepare_features(self, data):
-        """Prepare features for prediction"""
-        features = []
-        
-        # Time-based features
-        features.extend([
-            data['hour'].values,
-            data['minute'].values,
-            data['day_of_week'].values,
-            np.sin(2 * np.pi * data['hour'].values / 24),  # Cyclical time
-            np.cos(2 * np.pi * data['hour'].values / 24)
-        ])
-        
-        # Sequence features
-        for i in range(1, 6):  # Last 5 numbers
-            features.append(data[f'prev_{i}'].values)
-            
-        # Pattern features
-        features.extend([
-            data['consecutive_same'].values,
-            data['time_since_last'].values,
-            data['spin_duration'].values
-        ])
-        
-        # Provider features
-        features.extend([
-            data['provider_id'].values,
-            data['table_id'].values
-        ])
+        """Prepare features for prediction
         
-        return np.column_stack(features)
+        Time (hour, minute, weekday, cyclical hour), the last 5 numbers,
+        pattern features and provider/table ids, in ``FEATURE_COLUMNS`` order.
+        """
+        return frame_to_features(data)
         
     def create_lstm_model(self, input_shape):
         """Create LSTM model for sequence prediction"""
+        import tensorflow as tf
         model = tf.keras.Sequential([
             tf.keras.layers.LSTM(128, input_shape=input_shape, return_sequences=True),
             tf.keras.layers.Dropout(0.2),
@@ -95,26 +137,33 @@ class PredictionAgent:
         )
         
     def optimize_hyperparameters(self, X_train, y_train):
-        """Optimize model hyperparameters using Optuna"""
-        def objective(trial):
-            params = {
-                'n_estimators': trial.suggest_int('n_estimators', 500, 2000),
-                'max_depth': trial.suggest_int('max_depth', 5, 12),
-                'learning_rate': trial.suggest_loguniform('learning_rate', 1e-3, 1e-1),
-                'subsample': trial.suggest_uniform('subsample', 0.6, 1.0),
-                'colsample_bytree': trial.suggest_uniform('colsample_bytree', 0.6, 1.0)
-            }
-            
-            model = xgb.XGBClassifier(**params, objective='multi:softprob', num_class=37)
-            model.fit(X_train, y_train)
-            return model.score(X_train, y_train)
-            
-        study = optuna.create_study(direction='maximize')
-        study.optimize(objective, n_trials=100)
-        return study.best_params
+        """Optimize XGBoost hyperparameters with a parallel, budgeted Optuna search
         
-    def train_models(self, data):
-        """Train all models"""
+        Settings come from the optional ``tuning`` section of the storage
+        config; results are cached per feature schema and training data.
+        """
+        settings = self.config.get('tuning', {})
+        tuner = HyperparameterTuner(
+            os.path.join(self.config['data_root'], 'tuning'),
+            n_workers=settings.get('workers'),
+            n_trials=settings.get('trials', 100),
+            timeout=settings.get('timeout_seconds', 600),
+            cpu_budget=settings.get('cpu_seconds')
+        )
+        return tuner.tune(X_train, y_train, schema=','.join(FEATURE_COLUMNS))
+        
+    def train_models(self, data, incremental=False):
+        """Train all models
+        
+        With ``incremental=True`` and trained models at hand, only the rows
+        added since the last training (the watermark kept in the MLManager
+        metadata) are used; see ``update_models``.
+        """
+        if incremental:
+            result = self.update_models(data)
+            if result is not None:
+                return result
+                
         X = self.prepare_features(data)
         y = data['number'].values
         
@@ -156,32 +205,66 @@ class PredictionAgent:
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             'accuracies': accuracies
         })
+        self.trained_rows = len(data)
         
         return accuracies
         
+    def update_models(self, data, rounds=50, epochs=5):
+        """Continue training every model on rows added since the watermark
+        
+        XGBoost and LightGBM add ``rounds`` boosting rounds, the LSTM runs
+        ``epochs`` epochs and the scaler stays fixed so earlier training
+        remains valid. Returns None when a full retrain is needed instead.
+        """
+        if 'standard' not in self.scalers or not all(
+                name in self.models for name in ('lstm', 'xgboost', 'lightgbm')):
+            return None
+        rows = new_rows(len(data), self.ml_manager.get_watermark('prediction_agent'))
+        if rows is None:
+            return None
+        if rows.start == len(data):
+            return {'new_rows': 0}
+            
+        X_new = self.scalers['standard'].transform(self.prepare_features(data.iloc[rows]))
+        y_new = data['number'].values[rows]
+        
+        continue_training(self.models['lstm'], X_new.reshape((X_new.shape[0], 1, X_new.shape[1])),
+                          y_new, epochs=epochs)
+        continue_training(self.models['xgboost'], X_new, y_new, rounds=rounds)
+        continue_training(self.models['lightgbm'], X_new, y_new, rounds=rounds)
+        self.trained_rows = len(data)
+        
+        return {'new_rows': len(data) - rows.start, 'watermark': len(data)}
+        
     def predict(self, data):
         """Make predictions using ensemble of models"""
         X = self.prepare_features(data)
+        return self.predict_batch(X[:1])[0]
+        
+    def predict_proba_batch(self, X):
+        """Ensemble probabilities for a feature matrix, one call per model"""
         X_scaled = self.scalers['standard'].transform(X)
         X_lstm = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
         
-        # Get predictions from each model
-        pred_lstm = self.models['lstm'].predict(X_lstm)
+        # Calling the Keras model directly skips predict()'s per-call setup,
+        # which dominates for the small batches served online
+        pred_lstm = np.asarray(self.models['lstm'](X_lstm, training=False))
         pred_xgb = self.models['xgboost'].predict_proba(X_scaled)
         pred_lgb = self.models['lightgbm'].predict_proba(X_scaled)
         
         # Weighted ensemble
-        ensemble_pred = (0.4 * pred_lstm + 0.3 * pred_xgb + 0.3 * pred_lgb)
+        return 0.4 * pred_lstm + 0.3 * pred_xgb + 0.3 * pred_lgb
         
-        # Get top 3 predictions with probabilities
-        top_3_idx = np.argsort(ensemble_pred[0])[-3:][::-1]
-        predictions = [{
-            'number': int(idx),
-            'probability': float(ensemble_pred[0][idx]),
-            'confidence': self.calculate_confidence(ensemble_pred[0][idx])
-        } for idx in top_3_idx]
+    def predict_batch(self, X):
+        """Top 3 predictions with probabilities for every row of a feature matrix"""
+        ensemble_pred = self.predict_proba_batch(X)
+        top_3 = np.argsort(ensemble_pred, axis=1)[:, -3:][:, ::-1]
         
-        return predictions
+        return [[{
+            'number': int(idx),
+            'probability': float(row[idx]),
+            'confidence': self.calculate_confidence(row[idx])
+        } for idx in top_idx] for row, top_idx in zip(ensemble_pred, top_3)]
         
     def calculate_confidence(self, probability):
         """Calculate confidence level based on probability"""
@@ -199,35 +282,66 @@ class PredictionAgent:
         save_dir = os.path.join(self.config['data_root'], 'models')
         os.makedirs(save_dir, exist_ok=True)
         
-        # Save neural network
+        # Save neural network, plus a NumPy export for framework-free serving
+        from ..ml.export import export_model
         self.models['lstm'].save(os.path.join(save_dir, 'lstm_model'))
+        export_model(self.models['lstm'], os.path.join(save_dir, 'lstm_model.npz'))
         
         # Save tree-based models
-        with open(os.path.join(save_dir, 'xgboost_model.json'), 'wb') as f:
-            self.models['xgboost'].save_model(f)
+        self.models['xgboost'].save_model(os.path.join(save_dir, 'xgboost_model.json'))
             
         with open(os.path.join(save_dir, 'lightgbm_model.txt'), 'w') as f:
-            f.write(self.models['lightgbm'].booster_.save_model_to_string())
+            f.write(self.models['lightgbm'].booster_.model_to_string())
             
         # Save scaler
         with open(os.path.join(save_dir, 'scaler.pkl'), 'wb') as f:
             import pickle
             pickle.dump(self.scalers['standard'], f)
             
-    def load_models(self):
-        """Load saved models and scalers"""
+        # Only now do the saved models cover the new rows
+        if self.trained_rows is not None:
+            self.ml_manager.set_watermark('prediction_agent', self.trained_rows, model_type='ensemble')
+            self.trained_rows = None
+            
+    def load_models(self, inference_only=False):
+        """Register saved models with the registry and load the scaler
+        
+        Artifacts are only checked for presence and format here; each model
+        is deserialized on its first predict and may be evicted and reloaded
+        later. With
+        ``inference_only=True`` the LSTM comes from its NumPy export, so
+        serving never imports TensorFlow; such a model cannot be trained
+        further.
+        """
         load_dir = os.path.join(self.config['data_root'], 'models')
         
-        try:
-            # Load neural network
-            self.models['lstm'] = tf.keras.models.load_model(os.path.join(load_dir, 'lstm_model'))
-            
-            # Load tree-based models
-            self.models['xgboost'] = xgb.XGBClassifier()
-            self.models['xgboost'].load_model(os.path.join(load_dir, 'xgboost_model.json'))
+        def load_lstm():
+            import tensorflow as tf
+            return tf.keras.models.load_model(os.path.join(load_dir, 'lstm_model'))
+        
+        def load_xgboost():
+            model = xgb.XGBClassifier()
+            model.load_model(os.path.join(load_dir, 'xgboost_model.json'))
+            return model
             
-            self.models['lightgbm'] = lgb.LGBMClassifier()
-            self.models['lightgbm'].booster_ = lgb.Booster(model_file=os.path.join(load_dir, 'lightgbm_model.txt'))
+        def load_lightgbm():
+            booster = lgb.Booster(model_file=os.path.join(load_dir, 'lightgbm_model.txt'))
+            return LoadedLGBMClassifier(booster, **self.create_lightgbm_model().get_params())
+        
+        try:
+            # Models are only checked and registered here; each loads on its first predict
+            lstm = ('lstm_model', None, load_lstm)
+            if inference_only and os.path.exists(os.path.join(load_dir, 'lstm_model.npz')):
+                lstm = ('lstm_model.npz', b'PK',
+                        lambda: load_runtime(os.path.join(load_dir, 'lstm_model.npz')))
+            artifacts = {
+                'lstm': lstm,
+                'xgboost': ('xgboost_model.json', b'{', load_xgboost),
+                'lightgbm': ('lightgbm_model.txt', b'tree', load_lightgbm)
+            }
+            for name, (artifact, header, loader) in artifacts.items():
+                _check_artifact(os.path.join(load_dir, artifact), header)
+                self.models.register(name, loader)
             
             # Load scaler
             with open(os.path.join(load_dir, 'scaler.pkl'), 'rb') as f:
@@ -0,0 +1,262 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Columns produced by PredictionAgent.prepare_features, in order
+FEATURE_COLUMNS = (
+    'hour', 'minute', 'day_of_week', 'hour_sin', 'hour_cos',
+    'prev_1', 'prev_2', 'prev_3', 'prev_4', 'prev_5',
+    'consecutive_same', 'time_since_last', 'spin_duration',
+    'provider_id', 'table_id'
+)
+
+# Bump whenever the meaning of a column changes; stale matrices are rebuilt
+SCHEMA_VERSION = 1
+
+HISTORY = 5  # Previous spins the features look back over
+
+def frame_to_features(data: pd.DataFrame) -> np.ndarray:
+    """Build the ``FEATURE_COLUMNS`` matrix from a preprocessed DataFrame"""
+    hours = data['hour'].values
+    features = [
+        hours,
+        data['minute'].values,
+        data['day_of_week'].values,
+        np.sin(2 * np.pi * hours / 24),  # Cyclical time
+        np.cos(2 * np.pi * hours / 24)
+    ]
+    features.extend(data[name].values for name in FEATURE_COLUMNS[5:])
+    return np.column_stack(features)
+
+def _empty_state() -> Dict:
+    return {
+        "rows": 0,
+        "tail": [],  # Last HISTORY numbers, oldest first
+        "last_epoch_ms": None,
+        "last_seen": [-1] * 37
+    }
+
+def compute_features(numbers: np.ndarray, epoch_ms: np.ndarray,
+                     provider_ids: np.ndarray, table_ids: np.ndarray,
+                     state: Optional[Dict] = None) -> np.ndarray:
+    """Feature rows for new spins of one table, continuing from ``state``
+
+    Matches the ``DataPreprocessor`` pipeline followed by
+    ``PredictionAgent.prepare_features`` on the table's full history: missing
+    previous spins are 0, ``time_since_last`` counts spins since the number
+    last appeared (its position if never) and ``spin_duration`` is seconds
+    since the previous spin. ``state`` is updated in place.
+    """
+    state = state if state is not None else _empty_state()
+    numbers = np.asarray(numbers, dtype=np.int64)
+    epoch_ms = np.asarray(epoch_ms, dtype=np.int64)
+    count = len(numbers)
+    features = np.zeros((count, len(FEATURE_COLUMNS)), dtype=np.float32)
+    if count == 0:
+        return features
+
+    # Wall-clock fields straight from epoch milliseconds (1970-01-01 was a Thursday)
+    hours = (epoch_ms // 3_600_000) % 24
+    features[:, 0] = hours
+    features[:, 1] = (epoch_ms // 60_000) % 60
+    features[:, 2] = (epoch_ms // 86_400_000 + 3) % 7
+    features[:, 3] = np.sin(2 * np.pi * hours / 24)
+    features[:, 4] = np.cos(2 * np.pi * hours / 24)
+
+    # Previous spins, with the saved tail standing in for earlier batches
+    tail = np.asarray(state["tail"], dtype=np.int64)
+    padded = np.concatenate((np.full(HISTORY - len(tail), -1), tail, numbers))
+    same = np.zeros(count, dtype=np.int64)
+    for i in range(1, HISTORY + 1):
+        previous = padded[HISTORY - i:HISTORY - i + count]
+        features[:, 4 + i] = np.maximum(previous, 0)
+        same += previous == numbers
+    features[:, 10] = same
+
+    # Spins since each number last appeared, continuing the saved positions
+    positions = np.arange(state["rows"], state["rows"] + count)
+    last_seen = np.asarray(state["last_seen"], dtype=np.int64)
+    order = np.lexsort((positions, numbers))
+    sorted_numbers = numbers[order]
+    first = np.ones(count, dtype=bool)
+    first[1:] = sorted_numbers[1:] != sorted_numbers[:-1]
+    previous_position = np.empty(count, dtype=np.int64)
+    previous_position[order[1:]] = positions[order[:-1]]
+    previous_position[order[first]] = last_seen[sorted_numbers[first]]
+    features[:, 11] = np.where(previous_position >= 0, positions - previous_position, positions)
+
+    previous_ms = np.concatenate((
+        [epoch_ms[0] if state["last_epoch_ms"] is None else state["last_epoch_ms"]],
+        epoch_ms[:-1]
+    ))
+    features[:, 12] = (epoch_ms - previous_ms) / 1000.0
+    features[:, 13] = provider_ids
+    features[:, 14] = table_ids
+
+    np.maximum.at(last_seen, numbers, positions)
+    state["rows"] += count
+    state["tail"] = padded[-HISTORY:][padded[-HISTORY:] >= 0].tolist()
+    state["last_epoch_ms"] = int(epoch_ms[-1])
+    state["last_seen"] = last_seen.tolist()
+    return features
+
+class FeatureStore:
+    """Materialized per-table feature matrices on disk
+
+    Each table gets a raw float32 matrix (``features.f32``, one row per spin,
+    ``FEATURE_COLUMNS`` wide), the matching target numbers (``targets.i8``)
+    and a manifest holding the schema version and the state needed to extend
+    the features without rereading history. ``sync`` pulls only spin-store
+    rows past the stored watermark, so refreshing costs O(new spins). Rows
+    are only ever written by ``sync``, so the watermark covers exactly the
+    materialized spins. The newest row of every table is also kept in
+    memory for online inference.
+    """
+
+    def __init__(self, root: Union[str, Path], schema_version: int = SCHEMA_VERSION):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.schema_version = schema_version
+        self.manifest_file = self.root / "manifest.json"
+        self._lock = threading.Lock()
+        self._latest: Dict[str, np.ndarray] = {}
+        self._load_manifest()
+
+    def _load_manifest(self):
+        manifest = None
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r') as f:
+                manifest = json.load(f)
+        if (manifest is None or manifest.get("schema_version") != self.schema_version
+                or manifest.get("columns") != list(FEATURE_COLUMNS)):
+            # Unknown or stale schema: start over from the first spin
+            manifest = {
+                "schema_version": self.schema_version,
+                "columns": list(FEATURE_COLUMNS),
+                "watermark": 0,
+                "tables": {}
+            }
+            for table_dir in self.root.glob("t_*"):
+                for path in table_dir.iterdir():
+                    path.unlink()
+                table_dir.rmdir()
+        self.manifest = manifest
+        for table in self.manifest["tables"]:
+            self._repair(table)
+
+    def _save_manifest(self):
+        tmp_file = self.manifest_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_file, self.manifest_file)
+
+    def _table_dir(self, table: str) -> Path:
+        key = hashlib.sha1(table.encode('utf-8')).hexdigest()[:16]
+        return self.root / f"t_{key}"
+
+    def _repair(self, table: str):
+        """Drop rows written after the last manifest update (e.g. a crash mid-append)"""
+        rows = self.manifest["tables"][table]["rows"]
+        table_dir = self._table_dir(table)
+        for name, itemsize in (("features.f32", 4 * len(FEATURE_COLUMNS)), ("targets.i8", 1)):
+            path = table_dir / name
+            if path.exists() and path.stat().st_size != rows * itemsize:
+                with open(path, 'r+b') as f:
+                    f.truncate(rows * itemsize)
+
+    @property
+    def watermark(self) -> int:
+        """Spin-store rows already materialized"""
+        return self.manifest["watermark"]
+
+    def tables(self) -> Dict[str, int]:
+        """Materialized tables and their row counts"""
+        return {table: state["rows"] for table, state in self.manifest["tables"].items()}
+
+    def _write(self, table: str, numbers, epoch_ms, provider_ids, table_ids, state) -> int:
+        if len(numbers) == 0:
+            return state["rows"]
+        features = compute_features(numbers, epoch_ms, provider_ids, table_ids, state)
+        table_dir = self._table_dir(table)
+        table_dir.mkdir(exist_ok=True)
+        with open(table_dir / "features.f32", 'ab') as f:
+            f.write(np.ascontiguousarray(features).tobytes())
+        with open(table_dir / "targets.i8", 'ab') as f:
+            f.write(numbers.astype(np.int8).tobytes())
+        latest = features[-1].copy()
+        latest.setflags(write=False)
+        self._latest[table] = latest
+        return state["rows"]
+
+    def sync(self, spin_store) -> Dict[str, int]:
+        """Materialize spin-store rows added since the watermark, for every table
+
+        Returns the number of new rows per table.
+        """
+        with self._lock:
+            total = spin_store.committed_rows()
+            start = self.manifest["watermark"]
+            if total <= start:
+                return {}
+            columns = spin_store.read_rows(start, total)
+            spin_store.refresh_catalog()  # Tables registered by collectors in other processes
+            names = spin_store.key_names("tables")
+
+            # Ids are cataloged before their spins are written, so an unknown id
+            # is a race; stop before it and pick those rows up on the next sync
+            unknown = np.flatnonzero(~np.isin(columns["table_id"], list(names)))
+            if len(unknown):
+                total = start + int(unknown[0])
+                columns = {name: values[:unknown[0]] for name, values in columns.items()}
+
+            added = {}
+            for table_id in np.unique(columns["table_id"]):
+                mask = columns["table_id"] == table_id
+                table = names[int(table_id)]
+                state = self.manifest["tables"].setdefault(table, _empty_state())
+                self._write(table, columns["number"][mask], columns["epoch_ms"][mask],
+                            columns["provider_id"][mask], columns["table_id"][mask], state)
+                added[table] = int(mask.sum())
+
+            self.manifest["watermark"] = total
+            self._save_manifest()
+            return added
+
+    def matrix(self, table: str) -> np.ndarray:
+        """Zero-copy (rows, features) memory map of a table's feature matrix"""
+        rows = self.manifest["tables"].get(table, {}).get("rows", 0)
+        if rows == 0:
+            return np.empty((0, len(FEATURE_COLUMNS)), dtype=np.float32)
+        return np.memmap(self._table_dir(table) / "features.f32", dtype=np.float32,
+                         mode='r', shape=(rows, len(FEATURE_COLUMNS)))
+
+    def targets(self, table: str) -> np.ndarray:
+        """Spin numbers matching the rows of ``matrix``"""
+        rows = self.manifest["tables"].get(table, {}).get("rows", 0)
+        if rows == 0:
+            return np.empty(0, dtype=np.int8)
+        return np.memmap(self._table_dir(table) / "targets.i8", dtype=np.int8,
+                         mode='r', shape=(rows,))
+
+    def frame(self, table: str) -> pd.DataFrame:
+        """Feature matrix plus a ``number`` column, as PredictionAgent.train_models expects"""
+        df = pd.DataFrame(np.asarray(self.matrix(table)), columns=list(FEATURE_COLUMNS))
+        df['number'] = np.asarray(self.targets(table), dtype=np.int64)
+        return df
+
+    def latest(self, table: str) -> Optional[np.ndarray]:
+        """Newest feature row of a table, from memory after the first call"""
+        row = self._latest.get(table)
+        if row is None:
+            matrix = self.matrix(table)
+            if len(matrix) == 0:
+                return None
+            row = np.array(matrix[-1])
+            row.setflags(write=False)
+            self._latest[table] = row
+        return row
@@ -0,0 +1,122 @@
+import math
+import numpy as np
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Union
+
+from ..analysis.gap_index import GapIndex, WindowCounter
+from .feature_store import HISTORY
+
+EPOCH = datetime(1970, 1, 1)
+Timestamp = Union[datetime, int]
+
+class TableFeatureState:
+    """Streaming state of one table: recent numbers, gaps, window counts and timing"""
+
+    def __init__(self, window: int = 100):
+        self.previous = deque(maxlen=HISTORY)  # Newest first
+        self.gap_index = GapIndex()
+        self.window_counter = WindowCounter(window)
+        self.last_time: Optional[datetime] = None
+        # Running mean/variance of spin durations (Welford)
+        self.durations = 0
+        self.duration_mean = 0.0
+        self.duration_m2 = 0.0
+        self.latest: Optional[np.ndarray] = None
+
+    def duration_stats(self) -> Dict:
+        variance = self.duration_m2 / (self.durations - 1) if self.durations > 1 else 0.0
+        return {
+            "count": self.durations,
+            "mean": self.duration_mean,
+            "std": math.sqrt(variance)
+        }
+
+class OnlineFeatureExtractor:
+    """Per-spin feature rows for live inference, without pandas
+
+    Each ``update`` costs O(1) and returns the same ``FEATURE_COLUMNS`` row
+    that ``DataPreprocessor`` plus ``PredictionAgent.prepare_features`` would
+    give the spin as the last row of its table's history.
+    """
+
+    def __init__(self, window: int = 100):
+        self.window = window
+        self.tables: Dict[str, TableFeatureState] = {}
+
+    def _state(self, table: str) -> TableFeatureState:
+        state = self.tables.get(table)
+        if state is None:
+            state = self.tables[table] = TableFeatureState(self.window)
+        return state
+
+    def update(self, table: str, number: int, timestamp: Optional[Timestamp] = None,
+               provider_id: int = 0, table_id: int = 0) -> np.ndarray:
+        """Add a spin and return its feature row
+
+        ``timestamp`` is a naive datetime or wall-clock epoch milliseconds
+        (as stored by the spin store); it defaults to now.
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+        elif not isinstance(timestamp, datetime):
+            timestamp = EPOCH + timedelta(milliseconds=int(timestamp))
+        state = self._state(table)
+        number = int(number)
+
+        previous = list(state.previous) + [0] * (HISTORY - len(state.previous))
+        consecutive_same = sum(1 for n in state.previous if n == number)
+        position = state.gap_index.total
+        last_seen = int(state.gap_index.last_seen[number])
+        time_since_last = position - last_seen if last_seen >= 0 else position
+
+        if state.last_time is None:
+            spin_duration = 0.0
+        else:
+            spin_duration = (timestamp - state.last_time).total_seconds()
+            state.durations += 1
+            delta = spin_duration - state.duration_mean
+            state.duration_mean += delta / state.durations
+            state.duration_m2 += delta * (spin_duration - state.duration_mean)
+
+        hour = timestamp.hour
+        angle = 2 * math.pi * hour / 24
+        row = np.array([
+            hour, timestamp.minute, timestamp.weekday(), math.sin(angle), math.cos(angle),
+            *previous,
+            consecutive_same, time_since_last, spin_duration,
+            provider_id, table_id
+        ], dtype=np.float32)
+        row.setflags(write=False)
+
+        state.previous.appendleft(number)
+        state.gap_index.update(number)
+        state.window_counter.update(number)
+        state.last_time = timestamp
+        state.latest = row
+        return row
+
+    def latest(self, table: str) -> Optional[np.ndarray]:
+        """Feature row of the table's newest spin"""
+        state = self.tables.get(table)
+        return None if state is None else state.latest
+
+    def window_counts(self, table: str) -> np.ndarray:
+        """Per-number counts over the last ``window`` spins"""
+        return self._state(table).window_counter.counts.copy()
+
+    def hot_cold(self, table: str) -> Dict:
+        """Numbers above/below their expected count in the rolling window"""
+        counts = self._state(table).window_counter.counts
+        expected = self.window / 37
+        return {
+            "hot": np.flatnonzero(counts > expected).tolist(),
+            "cold": np.flatnonzero(counts < expected).tolist()
+        }
+
+    def duration_stats(self, table: str) -> Dict:
+        """Count, mean and standard deviation of the table's spin durations"""
+        return self._state(table).duration_stats()
+
+    def reset(self, table: str):
+        self.tables.pop(table, None)
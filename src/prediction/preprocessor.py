@@ -1,12 +1,16 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import os
+from ..analysis.gap_index import gaps_since_previous, rolling_number_counts
+from .feature_store import FEATURE_COLUMNS, FeatureStore
+from .online_features import OnlineFeatureExtractor
 
 class DataPreprocessor:
     def __init__(self):
         self.load_config()
+        self.feature_store = FeatureStore(os.path.join(self.config['data_root'], 'features'))
         
     def load_config(self):
         """Load configuration settings"""
@@ -19,13 +23,19 @@ class DataPreprocessor:
         data_dir = os.path.join(self.config['data_root'], 'System', 'Cache')
         all_data = []
         
-        for file in os.listdir(data_dir):
+        for file in sorted(os.listdir(data_dir)):
             if file.endswith('.json'):
                 with open(os.path.join(data_dir, file), 'r') as f:
                     data = json.load(f)
                     all_data.extend(data)
                     
-        return pd.DataFrame(all_data)
+        # Chronological order (ties by file), so the training watermark, a row
+        # count, always refers to the same rows whatever order listdir returns
+        df = pd.DataFrame(all_data)
+        if 'timestamp' in df:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+        return df
         
     def extract_time_features(self, df):
         """Extract time-based features"""
@@ -51,19 +61,8 @@ class DataPreprocessor:
         for i in range(2, 6):
             df['consecutive_same'] += (df['number'] == df['number'].shift(i)).astype(int)
             
-        # Time since last occurrence of each number
-        for num in range(37):
-            mask = df['number'] == num
-            df[f'last_seen_{num}'] = mask.cumsum()
-            df[f'time_since_{num}'] = df.groupby(f'last_seen_{num}').cumcount()
-            
-        df['time_since_last'] = df.apply(
-            lambda row: row[f'time_since_{int(row["number"])}'], axis=1
-        )
-        
-        # Clean up temporary columns
-        for num in range(37):
-            df = df.drop([f'last_seen_{num}', f'time_since_{num}'], axis=1)
+        # Spins since the same number last appeared
+        df['time_since_last'] = gaps_since_previous(df['number'].to_numpy(dtype=np.int64))
             
         return df
         
@@ -90,12 +89,10 @@ class DataPreprocessor:
         
         # Hot/Cold numbers
         window = 100
-        number_counts = pd.get_dummies(df['number']).rolling(window=window).sum()
-        df['number_frequency'] = number_counts.lookup(
-            number_counts.index, df['number'].astype(str)
-        )
-        df['is_hot'] = df['number_frequency'] > number_counts.mean(axis=1)
-        df['is_cold'] = df['number_frequency'] < number_counts.mean(axis=1)
+        expected = window / 37  # Mean count per number over a full window
+        df['number_frequency'] = rolling_number_counts(df['number'].to_numpy(dtype=np.int64), window)
+        df['is_hot'] = df['number_frequency'] > expected
+        df['is_cold'] = df['number_frequency'] < expected
         
         return df
         
@@ -119,31 +116,37 @@ class DataPreprocessor:
         return df
         
     def prepare_recent_data(self, recent_numbers):
-        """Prepare recent numbers for prediction"""
+        """Prepare recent numbers for prediction
+        
+        The numbers are streamed through an ``OnlineFeatureExtractor`` rather
+        than the batch pipeline; only the last spin's features are returned.
+        """
         current_time = datetime.now()
+        extractor = OnlineFeatureExtractor()
         
-        # Create a small dataframe with recent numbers
-        data = []
+        row = None
         for i, num in enumerate(recent_numbers):
-            data.append({
-                'number': num,
-                'timestamp': current_time - pd.Timedelta(seconds=30*(len(recent_numbers)-i)),
-                'provider_id': 1,  # Assuming single provider for now
-                'table_id': 1      # Assuming single table for now
-            })
+            row = extractor.update(
+                'recent', num,
+                current_time - timedelta(seconds=30*(len(recent_numbers)-i)),
+                provider_id=1,  # Assuming single provider for now
+                table_id=1      # Assuming single table for now
+            )
             
-        df = pd.DataFrame(data)
-        
-        # Apply same preprocessing steps
-        df = self.extract_time_features(df)
-        df = self.extract_sequence_features(df)
-        df = self.extract_pattern_features(df)
+        df = pd.DataFrame([row], columns=list(FEATURE_COLUMNS))
+        df['number'] = recent_numbers[-1]
+        return df
         
-        # Handle missing values
-        df = df.fillna(0)
+    def load_features(self, spins, table):
+        """Feature frame of a table from the feature store
         
-        # Convert categorical variables
-        categorical_columns = ['sector', 'column']
-        df = pd.get_dummies(df, columns=categorical_columns)
+        Only spin-store rows added since the last call are featurized; the
+        result has the PredictionAgent feature columns plus ``number``.
+        """
+        self.feature_store.sync(spins)
+        return self.feature_store.frame(table)
         
-        return df.iloc[-1:] # Return only the last row for prediction
+    def latest_features(self, table):
+        """Newest feature row of a table, ready for PredictionAgent.predict_batch"""
+        row = self.feature_store.latest(table)
+        return None if row is None else row[None, :]
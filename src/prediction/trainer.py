@@ -1,5 +1,5 @@
-from preprocessor import DataPreprocessor
-from agent import PredictionAgent
+from .preprocessor import DataPreprocessor
+from .agent import PredictionAgent
 import json
 import os
 import logging
@@ -21,8 +21,12 @@ def setup_logging():
         ]
     )
 
-def train_models():
-    """Train and evaluate prediction models"""
+def train_models(incremental=False):
+    """Train and evaluate prediction models
+    
+    With ``incremental=True`` saved models are updated with the records added
+    since their last training instead of being retrained from scratch.
+    """
     setup_logging()
     logging.info("Starting model training process...")
     
@@ -30,6 +34,8 @@ def train_models():
         # Initialize preprocessor and agent
         preprocessor = DataPreprocessor()
         agent = PredictionAgent()
+        if incremental and not agent.load_models():
+            incremental = False
         
         # Load and preprocess data
         logging.info("Loading and preprocessing data...")
@@ -38,12 +44,12 @@ def train_models():
         
         # Train models
         logging.info("Training models...")
-        accuracies = agent.train_models(data)
+        accuracies = agent.train_models(data, incremental=incremental)
         
         # Log accuracies
         logging.info("Training completed. Model accuracies:")
         for model, acc in accuracies.items():
-            logging.info(f"{model}: {acc:.4f}")
+            logging.info(f"{model}: {acc}")
             
         # Save models
         logging.info("Saving models...")
@@ -68,4 +74,5 @@ def train_models():
         return False
 
 if __name__ == "__main__":
-    train_models()
+    import sys
+    train_models(incremental='--incremental' in sys.argv)
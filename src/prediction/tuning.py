@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import numpy as np
+import optuna
+import xgboost as xgb
+import concurrent.futures
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+def data_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+    """Content hash of a training set"""
+    digest = hashlib.sha1()
+    digest.update(str(X.shape).encode())
+    digest.update(np.ascontiguousarray(X, dtype=np.float32).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+class PruningCallback(xgb.callback.TrainingCallback):
+    """Reports validation loss to Optuna each round and stops hopeless or late trials"""
+
+    def __init__(self, trial: optuna.Trial, deadline: float, metric: str = 'mlogloss'):
+        self.trial = trial
+        self.deadline = deadline
+        self.metric = metric
+
+    def after_iteration(self, model, epoch, evals_log):
+        loss = evals_log['valid'][self.metric][-1]
+        self.trial.report(loss, epoch)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned(f"Pruned at round {epoch}")
+        # Returning True ends boosting; the rounds so far still count
+        return time.time() > self.deadline
+
+def _suggest(trial: optuna.Trial) -> Dict:
+    return {
+        'n_estimators': trial.suggest_int('n_estimators', 100, 2000),
+        'max_depth': trial.suggest_int('max_depth', 3, 12),
+        'learning_rate': trial.suggest_float('learning_rate', 1e-3, 1e-1, log=True),
+        'subsample': trial.suggest_float('subsample', 0.6, 1.0),
+        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0)
+    }
+
+def _run_worker(study_name: str, storage_url: str, data_dir: str, n_trials: int,
+                deadline: float, cpu_budget: Optional[float], first_trial: int, nthread: int,
+                validation_fraction: float, early_stopping_rounds: int) -> int:
+    """Worker process: pull trials from the shared study until a budget runs out
+
+    Every trial records the CPU seconds it used, so ``cpu_budget`` is checked
+    against the total of all workers' trials numbered ``first_trial`` and up.
+    """
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    X = np.load(os.path.join(data_dir, "X.npy"), mmap_mode='r')
+    y = np.load(os.path.join(data_dir, "y.npy"), mmap_mode='r')
+
+    # Held-out fold is the most recent slice, as at prediction time
+    split = int(len(y) * (1 - validation_fraction))
+    dtrain = xgb.DMatrix(X[:split], label=y[:split], nthread=nthread)
+    dvalid = xgb.DMatrix(X[split:], label=y[split:], nthread=nthread)
+
+    def objective(trial):
+        cpu_start = time.process_time()
+        try:
+            return _train(trial)
+        finally:
+            trial.set_user_attr('cpu_seconds', time.process_time() - cpu_start)
+
+    def _train(trial):
+        params = _suggest(trial)
+        booster = xgb.train(
+            {
+                'objective': 'multi:softprob',
+                'num_class': 37,
+                'eval_metric': 'mlogloss',
+                'max_depth': params['max_depth'],
+                'learning_rate': params['learning_rate'],
+                'subsample': params['subsample'],
+                'colsample_bytree': params['colsample_bytree'],
+                'nthread': nthread
+            },
+            dtrain,
+            num_boost_round=params['n_estimators'],
+            evals=[(dvalid, 'valid')],
+            early_stopping_rounds=early_stopping_rounds,
+            callbacks=[PruningCallback(trial, deadline)],
+            verbose_eval=False
+        )
+        trial.set_user_attr('best_iteration', int(booster.best_iteration) + 1)
+        return float(booster.best_score)
+
+    def check_budget(study, trial):
+        if time.time() > deadline:
+            study.stop()
+        if cpu_budget is not None:
+            spent = sum(t.user_attrs.get('cpu_seconds', 0.0)
+                        for t in study.get_trials(deepcopy=False) if t.number >= first_trial)
+            if spent > cpu_budget:
+                study.stop()
+
+    study = optuna.load_study(study_name=study_name, storage=storage_url)
+    study.optimize(objective, n_trials=n_trials, timeout=max(deadline - time.time(), 0),
+                   callbacks=[check_budget], catch=(xgb.core.XGBoostError,))
+    return n_trials
+
+class HyperparameterTuner:
+    """Parallel, budgeted XGBoost search over a SQLite-backed Optuna study
+
+    Worker processes share one study in ``storage_dir/studies.db`` and read
+    the training set from memory-mapped ``.npy`` files. Each trial trains on
+    the older part of the data with early stopping on the most recent
+    ``validation_fraction``; a median pruner stops trials whose validation
+    loss lags the others round by round. The search ends when the trials are
+    used up, the wall-clock ``timeout`` passes or the workers' trials have
+    spent ``cpu_budget`` CPU seconds in total (tracked in the shared study,
+    so a fast worker can use what a slow one leaves).
+
+    Results are cached per (feature schema, data hash), so retraining on
+    unchanged data skips tuning entirely.
+    """
+
+    def __init__(self, storage_dir: Union[str, Path], n_workers: Optional[int] = None,
+                 n_trials: int = 100, timeout: float = 600, cpu_budget: Optional[float] = None,
+                 validation_fraction: float = 0.2, early_stopping_rounds: int = 50):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.n_workers = n_workers or max(1, min(4, (os.cpu_count() or 1) // 2))
+        self.n_trials = n_trials
+        self.timeout = timeout
+        self.cpu_budget = cpu_budget
+        self.validation_fraction = validation_fraction
+        self.early_stopping_rounds = early_stopping_rounds
+        self.storage_url = f"sqlite:///{self.storage_dir / 'studies.db'}"
+        self.cache_file = self.storage_dir / "tuning_cache.json"
+
+    def _load_cache(self) -> Dict:
+        if not self.cache_file.exists():
+            return {}
+        with open(self.cache_file, 'r') as f:
+            return json.load(f)
+
+    def _save_cache(self, cache: Dict):
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(cache, f, indent=2)
+        tmp_file.replace(self.cache_file)
+
+    def cached(self, schema: str, data_hash: str) -> Optional[Dict]:
+        return self._load_cache().get(f"{schema}:{data_hash}")
+
+    def tune(self, X: np.ndarray, y: np.ndarray, schema: str) -> Dict:
+        """Best XGBClassifier parameters for this data, from cache or a new search
+
+        ``n_estimators`` is replaced by the early-stopped round count of the
+        best trial.
+        """
+        data_hash = data_fingerprint(X, y)
+        key = f"{schema}:{data_hash}"
+        cache = self._load_cache()
+        if key in cache:
+            logging.info(f"Using cached hyperparameters for {key[:24]}")
+            return cache[key]['params']
+
+        study_name = f"xgboost_{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+        storage = optuna.storages.RDBStorage(
+            self.storage_url, engine_kwargs={"connect_args": {"timeout": 30}}
+        )
+        study = optuna.create_study(
+            study_name=study_name,
+            storage=storage,
+            direction='minimize',
+            pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=20),
+            load_if_exists=True
+        )
+
+        data_dir = self.storage_dir / study_name
+        data_dir.mkdir(exist_ok=True)
+        np.save(data_dir / "X.npy", np.ascontiguousarray(X, dtype=np.float32))
+        np.save(data_dir / "y.npy", np.ascontiguousarray(y, dtype=np.int64))
+
+        deadline = time.time() + self.timeout
+        nthread = max(1, (os.cpu_count() or 1) // self.n_workers)
+        per_worker = -(-self.n_trials // self.n_workers)
+        first_trial = len(study.trials)  # Earlier, interrupted runs don't count against the budget
+        started = time.perf_counter()
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+                futures = [
+                    pool.submit(_run_worker, study_name, self.storage_url, str(data_dir),
+                                per_worker, deadline, self.cpu_budget, first_trial, nthread,
+                                self.validation_fraction, self.early_stopping_rounds)
+                    for _ in range(self.n_workers)
+                ]
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logging.error(f"Error in tuning worker: {str(e)}")
+        finally:
+            for name in ("X.npy", "y.npy"):
+                (data_dir / name).unlink(missing_ok=True)
+            data_dir.rmdir()
+
+        completed = [t for t in study.trials if t.state == optuna.trial.TrialState.COMPLETE]
+        if not completed:
+            raise RuntimeError("No tuning trial completed within the budget")
+        best = study.best_trial
+        params = dict(best.params)
+        params['n_estimators'] = best.user_attrs.get('best_iteration', params['n_estimators'])
+
+        pruned = sum(t.state == optuna.trial.TrialState.PRUNED for t in study.trials)
+        cache[key] = {
+            'params': params,
+            'validation_logloss': best.value,
+            'trials': len(study.trials),
+            'pruned': pruned,
+            'seconds': time.perf_counter() - started,
+            'created_at': datetime.now().isoformat()
+        }
+        self._save_cache(cache)
+        logging.info(f"Tuned in {cache[key]['seconds']:.1f}s: {len(study.trials)} trials, "
+                     f"{pruned} pruned, logloss {best.value:.4f}")
+        return params
@@ -7,7 +7,10 @@ import pandas as pd
 import numpy as np
 import json
 import time
+import hashlib
 from ..database.database import DatabaseManager
+from ..analysis.incremental_stats import IncrementalStats
+from ..analysis.sequence_miner import mine_sequences
 
 class RouletteDataCollector:
     def __init__(self):
@@ -20,6 +23,7 @@ class RouletteDataCollector:
             'sector_hits': {},
             'color_sequences': []
         }
+        self.stats = IncrementalStats()
         
     def setup_browser(self):
         """Setup Chrome browser with custom options"""
@@ -38,10 +42,16 @@ class RouletteDataCollector:
         
         self.driver = webdriver.Chrome(options=options)
         
-    def collect_live_data(self, url, duration_minutes=60):
-        """Collect live roulette data for specified duration"""
+    def collect_live_data(self, url, duration_minutes=60, snapshot_every=100):
+        """Collect live roulette data for specified duration
+        
+        The running statistics are snapshotted every ``snapshot_every``
+        spins, so a crash loses little work; spins stored after the last
+        snapshot are replayed on the next start.
+        """
         try:
             self.driver.get(url)
+            self.stats = self._load_stats(url)
             start_time = datetime.now()
             numbers = []
             timestamps = []
@@ -60,15 +70,18 @@ class RouletteDataCollector:
                     timestamps.append(timestamp)
                     
                     # Analyze patterns in real-time
-                    self._update_patterns(numbers)
+                    self._update_patterns(number)
                     
                     # Save to database
-                    self._save_spin(number, timestamp)
+                    self._save_spin(number, timestamp, table=url)
+                    if self.stats.total % snapshot_every == 0:
+                        self.stats.save(self._stats_path(url))
                     
                 except Exception as e:
                     print(f"Error collecting number: {str(e)}")
                     continue
                     
+            self.stats.save(self._stats_path(url))
             return pd.DataFrame({
                 'number': numbers,
                 'timestamp': timestamps,
@@ -79,83 +92,76 @@ class RouletteDataCollector:
             print(f"Error in data collection: {str(e)}")
             return None
             
-    def _update_patterns(self, numbers):
-        """Update pattern analysis with new number"""
-        if len(numbers) < 2:
+    def _load_stats(self, table):
+        """Restore a table's running statistics, catching up with the spin store
+        
+        Spins stored after the snapshot was taken are replayed; a snapshot
+        ahead of the store (e.g. after a repaired append) is rebuilt from
+        the full history.
+        """
+        stats = IncrementalStats.load(self._stats_path(table))
+        numbers = self.db.spins.numbers(table)
+        if stats.total > len(numbers):
+            stats = IncrementalStats()
+        if stats.total < len(numbers):
+            for number in numbers[stats.total:]:
+                stats.update(number)
+            stats.save(self._stats_path(table))
+        return stats
+        
+    def _stats_path(self, table):
+        """Snapshot file for a table's running statistics"""
+        key = hashlib.sha1(table.encode()).hexdigest()[:16]
+        return self.db.spins.root / f"stats_{key}.json"
+        
+    def _update_patterns(self, number):
+        """Update pattern analysis with new number in constant time"""
+        self.stats.update(number)
+        total = self.stats.total
+        if total < 2:
             return
             
-        latest = numbers[-1]
-        
         # Update hot and cold numbers
-        for num in range(37):
-            count = numbers.count(num)
-            if count > len(numbers) / 37:  # More frequent than average
-                self.patterns['hot_numbers'][num] = count
-            elif count < len(numbers) / 37:  # Less frequent than average
-                self.patterns['cold_numbers'][num] = count
+        frequency = self.stats.counts()
+        expected = total / 37
+        self.patterns['hot_numbers'] = {
+            int(num): int(count) for num, count in enumerate(frequency) if count > expected
+        }
+        self.patterns['cold_numbers'] = {
+            int(num): int(count) for num, count in enumerate(frequency) if count < expected
+        }
                 
         # Update consecutive patterns
-        if len(numbers) >= 5:
-            self.patterns['consecutive_numbers'] = numbers[-5:]
+        if total >= 5:
+            self.patterns['consecutive_numbers'] = self.stats.recent(5)
             
         # Update sector hits
-        sectors = {
-            'first_12': range(1, 13),
-            'second_12': range(13, 25),
-            'third_12': range(25, 37),
-            'zero': [0]
+        dozens = self.stats.distribution('dozen')
+        sector_names = {'first': 'first_12', 'second': 'second_12', 'third': 'third_12', 'zero': 'zero'}
+        self.patterns['sector_hits'] = {
+            sector_names[dozen]: count for dozen, count in dozens.items()
         }
-        
-        for sector_name, sector_range in sectors.items():
-            if latest in sector_range:
-                self.patterns['sector_hits'][sector_name] = \
-                    self.patterns['sector_hits'].get(sector_name, 0) + 1
                     
-        # Update color sequences
-        colors = []
-        for num in numbers[-10:]:  # Last 10 numbers
-            if num == 0:
-                colors.append('green')
-            elif num in [1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36]:
-                colors.append('red')
-            else:
-                colors.append('black')
-        self.patterns['color_sequences'] = colors
+        # Update color sequences (last 10 numbers)
+        self.patterns['color_sequences'] = self.stats.recent_categories('color', 10)
         
-    def _save_spin(self, number, timestamp):
-        """Save spin data to database"""
-        data = {
-            'number': number,
-            'timestamp': timestamp.isoformat(),
-            'patterns': self.patterns
-        }
-        
-        self.db.save_website_data(
-            url='roulette_spins',
-            title=f'Spin {timestamp}',
-            content=data
-        )
+    def _save_spin(self, number, timestamp, table=None):
+        """Save spin data to the spin store"""
+        self.db.spins.append(number, timestamp, table=table)
         
     def analyze_historical_data(self, start_date=None):
         """Analyze historical roulette data"""
         try:
-            # Get historical data from database
-            data = self.db.get_website_data(url='roulette_spins')
-            if not data:
+            # Get historical data from the spin store
+            spins = self.db.spins.read(start=pd.to_datetime(start_date) if start_date else None)
+            if len(spins['number']) == 0:
                 return None
                 
             # Convert to DataFrame
-            df = pd.DataFrame([
-                {
-                    'number': d.content['number'],
-                    'timestamp': pd.to_datetime(d.content['timestamp']),
-                    'patterns': d.content['patterns']
-                }
-                for d in data
-            ])
-            
-            if start_date:
-                df = df[df['timestamp'] >= pd.to_datetime(start_date)]
+            df = pd.DataFrame({
+                'number': spins['number'],
+                'timestamp': pd.to_datetime(spins['epoch_ms'], unit='ms')
+            })
                 
             # Calculate statistics
             stats = {
@@ -181,18 +187,13 @@ class RouletteDataCollector:
         }
         
         # Find repeating sequences
+        repeated = mine_sequences(numbers, 2, 5, top_k=None, min_count=2)
         for length in range(2, 6):
-            sequences = [
-                tuple(numbers[i:i+length])
-                for i in range(len(numbers)-length+1)
-            ]
-            for seq in set(sequences):
-                count = sequences.count(seq)
-                if count > 1:
-                    patterns['repeating_sequences'].append({
-                        'sequence': seq,
-                        'count': count
-                    })
+            for seq in repeated[length]:
+                patterns['repeating_sequences'].append({
+                    'sequence': seq['sequence'],
+                    'count': seq['count']
+                })
                     
         # Calculate number gaps
         for num in range(37):
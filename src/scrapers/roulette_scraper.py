@@ -1,7 +1,6 @@
 import time
 from datetime import datetime
 import sqlite3
-import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -13,12 +12,15 @@ import os
 import random
 import undetected_chromedriver as uc
 from fake_useragent import UserAgent
+from ..analysis.incremental_stats import IncrementalStats
 
 class RouletteScraper:
     def __init__(self, db_path='data.sqlite'):
         """Initialize the roulette scraper with stealth features"""
         self.db_path = os.path.join(os.path.expanduser('~'), 'Documents', db_path)
+        self.stats_path = os.path.splitext(self.db_path)[0] + '.stats.json'
         self.setup_database()
+        self.stats = self.load_stats()
         
         # Initialize undetected Chrome with stealth settings
         options = uc.ChromeOptions()
@@ -88,6 +90,21 @@ class RouletteScraper:
         conn.commit()
         conn.close()
     
+    def load_stats(self):
+        """Restore running statistics, rescanning the database only if the snapshot is stale"""
+        stats = IncrementalStats.load(self.stats_path)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute("SELECT COUNT(*) FROM data").fetchone()[0]
+            if stats.total != rows:
+                stats = IncrementalStats()
+                for (value,) in conn.execute("SELECT val FROM data ORDER BY id"):
+                    stats.update(value)
+                stats.save(self.stats_path)
+        finally:
+            conn.close()
+        return stats
+    
     def categorize_number(self, number):
         """Categorize a roulette number"""
         number = int(number)
@@ -153,64 +170,45 @@ class RouletteScraper:
         
         conn.commit()
         conn.close()
+        self.stats.update(categories['number'])
         self.random_delay()
     
     def calculate_statistics(self):
         """Calculate various statistics from the rounds"""
-        conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query("SELECT * FROM data", conn)
-        
         stats = {}
         
         # Last 10 numbers
-        stats['last_10'] = df['val'].tail(10).tolist()
+        stats['last_10'] = self.stats.recent(10)
         
         # Most common numbers
-        stats['most_common_numbers'] = df['val'].value_counts().head(5).to_dict()
-        
-        # Color distribution
-        stats['color_distribution'] = df['cat1'].value_counts().to_dict()
+        stats['most_common_numbers'] = self.stats.most_common(5)
         
-        # Odd/Even distribution
-        stats['odd_even_distribution'] = df['cat2'].value_counts().to_dict()
-        
-        # Dozen distribution
-        stats['dozen_distribution'] = df['cat3'].value_counts().to_dict()
-        
-        # Column distribution
-        stats['column_distribution'] = df['cat4'].value_counts().to_dict()
-        
-        # High/Low distribution
-        stats['high_low_distribution'] = df['cat5'].value_counts().to_dict()
+        # Category distributions
+        stats['color_distribution'] = self.stats.distribution('color')
+        stats['odd_even_distribution'] = self.stats.distribution('odd_even')
+        stats['dozen_distribution'] = self.stats.distribution('dozen')
+        stats['column_distribution'] = self.stats.distribution('column')
+        stats['high_low_distribution'] = self.stats.distribution('high_low')
         
         # Pattern analysis
-        if len(df) >= 10:
+        if self.stats.total >= 10:
             # Analyze last 10 rounds for patterns
-            last_10 = df['val'].tail(10).tolist()
+            last_10 = stats['last_10']
             
             # Check for number repetition
             repeats = [num for num in last_10 if last_10.count(num) > 1]
             stats['repeating_numbers'] = list(set(repeats))
             
-            # Check for color patterns
-            last_10_colors = df['cat1'].tail(10).tolist()
-            color_streaks = self.find_streaks(last_10_colors)
-            stats['color_streaks'] = color_streaks
-            
-            # Check for odd/even patterns
-            last_10_odd_even = df['cat2'].tail(10).tolist()
-            odd_even_streaks = self.find_streaks(last_10_odd_even)
-            stats['odd_even_streaks'] = odd_even_streaks
-            
-            # Check for dozen patterns
-            last_10_dozens = df['cat3'].tail(10).tolist()
-            dozen_streaks = self.find_streaks(last_10_dozens)
-            stats['dozen_streaks'] = dozen_streaks
+            # Check for color, odd/even and dozen patterns
+            stats['color_streaks'] = self.find_streaks(self.stats.recent_categories('color', 10))
+            stats['odd_even_streaks'] = self.find_streaks(self.stats.recent_categories('odd_even', 10))
+            stats['dozen_streaks'] = self.find_streaks(self.stats.recent_categories('dozen', 10))
             
             # Predict next numbers
-            stats['predictions'] = self.predict_next(df)
+            stats['predictions'] = self.predict_next()
         
         # Save statistics
+        conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('''
         INSERT INTO analysis (ts, type, data)
@@ -219,6 +217,7 @@ class RouletteScraper:
         
         conn.commit()
         conn.close()
+        self.stats.save(self.stats_path)
         
         return stats
     
@@ -240,7 +239,7 @@ class RouletteScraper:
         
         return streaks
     
-    def predict_next(self, df):
+    def predict_next(self):
         """Predict potential next numbers based on patterns"""
         predictions = {
             'hot_numbers': [],
@@ -249,29 +248,17 @@ class RouletteScraper:
             'pattern_based': []
         }
         
-        # Get hot numbers (appeared frequently in last 50 spins)
-        last_50 = df['val'].tail(50)
-        value_counts = last_50.value_counts()
-        hot_numbers = value_counts[value_counts >= 2].index.tolist()
-        predictions['hot_numbers'] = hot_numbers[:5]  # Top 5 hot numbers
-        
-        # Get cold numbers (haven't appeared in last 50 spins)
-        all_numbers = set(range(37))
-        appeared = set(last_50.unique())
-        cold_numbers = list(all_numbers - appeared)
-        predictions['cold_numbers'] = cold_numbers[:5]  # Top 5 cold numbers
+        # Hot numbers (appeared at least twice in the last 50 spins)
+        predictions['hot_numbers'] = self.stats.hot_numbers(window=50, min_count=2, limit=5)
         
-        # Get due numbers (haven't appeared in a while)
-        last_occurrence = {}
-        for i, num in enumerate(reversed(df['val'].tolist())):
-            if num not in last_occurrence:
-                last_occurrence[num] = i
+        # Cold numbers (haven't appeared in the last 50 spins)
+        predictions['cold_numbers'] = self.stats.cold_numbers(window=50, limit=5)
         
-        due_numbers = sorted(last_occurrence.items(), key=lambda x: x[1], reverse=True)
-        predictions['due_numbers'] = [num for num, _ in due_numbers[:5]]  # Top 5 due numbers
+        # Due numbers (longest since last appearance)
+        predictions['due_numbers'] = self.stats.due_numbers(limit=5)
         
         # Pattern-based predictions
-        last_5 = df['val'].tail(5).tolist()
+        last_5 = self.stats.recent(5)
         
         # Check for repeating differences
         diffs = [last_5[i] - last_5[i-1] for i in range(1, len(last_5))]
@@ -355,6 +342,7 @@ class RouletteScraper:
         finally:
             self.driver.quit()
             self.print_statistics()
+            self.stats.save(self.stats_path)
 
 def main():
     scraper = RouletteScraper()
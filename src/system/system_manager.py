@@ -26,8 +26,9 @@ class SystemManager:
         self.thread_pool = concurrent.futures.ThreadPoolExecutor(
             max_workers=self.system_config.get("max_threads", 4)
         )
+        self.process_workers = self.system_config.get("max_processes", 2)
         self.process_pool = concurrent.futures.ProcessPoolExecutor(
-            max_workers=self.system_config.get("max_processes", 2)
+            max_workers=self.process_workers
         )
         self._setup_logging()
     
@@ -157,6 +158,7 @@ class SystemManager:
     def _resize_process_pool(self, new_size: int):
         """Resize the process pool"""
         self.process_pool.shutdown(wait=True)
+        self.process_workers = new_size
         self.process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=new_size)
     
     def check_for_updates(self) -> Optional[Dict]:
@@ -1,3 +1,10 @@
-from .crypto import DataCrypto
+from .lazy_import import LazyInstance, lazy_import, startup_report, timed
 
-__all__ = ['DataCrypto']
+__all__ = ['DataCrypto', 'LazyInstance', 'lazy_import', 'startup_report', 'timed']
+
+def __getattr__(name):
+    # cryptography is only imported by code that actually encrypts
+    if name == 'DataCrypto':
+        from .crypto import DataCrypto
+        return DataCrypto
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
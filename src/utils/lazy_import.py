@@ -0,0 +1,135 @@
+import sys
+import time
+import types
+import logging
+import importlib
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# Seconds spent per subsystem, in the order subsystems were first timed
+STARTUP_TIMES: Dict[str, float] = {}
+# Seconds since process start at which named milestones were reached
+MILESTONES: Dict[str, float] = {}
+_lock = threading.Lock()
+
+def _process_started() -> float:
+    try:
+        import psutil
+        return psutil.Process().create_time()
+    except Exception:
+        return time.time()
+
+PROCESS_STARTED = _process_started()
+
+def record(subsystem: str, seconds: float):
+    """Add time spent importing or initializing a subsystem"""
+    with _lock:
+        STARTUP_TIMES[subsystem] = STARTUP_TIMES.get(subsystem, 0.0) + seconds
+
+def mark(milestone: str) -> float:
+    """Record when a milestone (e.g. ``api ready``) was reached; returns seconds since start"""
+    elapsed = time.time() - PROCESS_STARTED
+    with _lock:
+        MILESTONES.setdefault(milestone, elapsed)
+    return elapsed
+
+@contextmanager
+def timed(subsystem: str):
+    """Time a block of imports or initialization under ``subsystem``"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(subsystem, time.perf_counter() - started)
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str, subsystem: Optional[str] = None):
+        super().__init__(name)
+        self.__dict__['_lazy_subsystem'] = subsystem or name.split('.')[0]
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with timed(self.__dict__['_lazy_subsystem']):
+                module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__['_lazy_module'] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+def lazy_import(name: str, subsystem: Optional[str] = None) -> types.ModuleType:
+    """Stand-in for ``import name`` that defers the import to first use
+
+    Modules that are already imported are returned as is. The import time is
+    charged to ``subsystem`` (default: the top-level package) in the startup
+    report.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name, subsystem)
+
+def is_loaded(module: Any) -> bool:
+    """Whether a module from ``lazy_import`` (or any object) has been imported"""
+    if isinstance(module, LazyModule):
+        return module.__dict__['_lazy_module'] is not None
+    if isinstance(module, LazyInstance):
+        return module.loaded
+    return True
+
+class LazyInstance:
+    """Object constructed by ``factory`` on first attribute access
+
+    Lets heavy components (browsers, model pipelines) be wired up at startup
+    while only paying for the ones a session actually uses. Construction
+    time is charged to ``subsystem`` in the startup report.
+    """
+
+    def __init__(self, factory: Callable[[], Any], subsystem: str):
+        self._factory = factory
+        self._subsystem = subsystem
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> Any:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    with timed(self._subsystem):
+                        self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+def startup_report() -> str:
+    """Per-subsystem import/initialization times and milestones, slowest first"""
+    with _lock:
+        times = sorted(STARTUP_TIMES.items(), key=lambda item: item[1], reverse=True)
+        milestones = sorted(MILESTONES.items(), key=lambda item: item[1])
+    lines = [f"{'subsystem':<24} {'ms':>10}"]
+    lines.extend(f"{name:<24} {seconds * 1000:>10.1f}" for name, seconds in times)
+    lines.extend(f"{'@ ' + name:<24} {seconds * 1000:>10.1f}" for name, seconds in milestones)
+    return "\n".join(lines)
+
+def log_startup_report():
+    for line in startup_report().splitlines():
+        logging.info(line)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime, timedelta
+
+from src.prediction.preprocessor import DataPreprocessor
+from src.prediction.feature_store import FEATURE_COLUMNS, frame_to_features
+from src.prediction.online_features import OnlineFeatureExtractor
+
+@pytest.fixture
+def preprocessor(tmp_path, monkeypatch):
+    """DataPreprocessor with its storage config pointed at a temp directory"""
+    def load_config(self):
+        self.config = {'data_root': str(tmp_path)}
+    monkeypatch.setattr(DataPreprocessor, 'load_config', load_config)
+    return DataPreprocessor()
+
+def spins(count=500, seed=7):
+    rng = np.random.default_rng(seed)
+    numbers = rng.integers(0, 37, count)
+    # Few distinct numbers early on so repeats and short gaps are exercised
+    numbers[:40] = rng.integers(0, 4, 40)
+    start = datetime(2024, 3, 3, 23, 40)
+    offsets = np.cumsum(rng.integers(15, 90, count))
+    timestamps = [start + timedelta(seconds=int(s)) for s in offsets]
+    return numbers, timestamps
+
+def batch_features(preprocessor, numbers, timestamps):
+    df = pd.DataFrame({
+        'number': numbers,
+        'timestamp': timestamps,
+        'provider_id': 3,
+        'table_id': 5
+    })
+    df = preprocessor.extract_time_features(df)
+    df = preprocessor.extract_sequence_features(df)
+    df = preprocessor.extract_pattern_features(df)
+    return frame_to_features(df.fillna(0)).astype(np.float32)
+
+def test_online_rows_match_batch_pipeline(preprocessor):
+    numbers, timestamps = spins()
+    expected = batch_features(preprocessor, numbers, timestamps)
+
+    extractor = OnlineFeatureExtractor()
+    rows = np.array([
+        extractor.update('table', n, ts, provider_id=3, table_id=5)
+        for n, ts in zip(numbers, timestamps)
+    ])
+
+    assert rows.shape == (len(numbers), len(FEATURE_COLUMNS))
+    np.testing.assert_allclose(rows, expected, rtol=1e-6, atol=1e-5)
+    np.testing.assert_array_equal(extractor.latest('table'), rows[-1])
+
+def test_tables_keep_separate_state(preprocessor):
+    numbers, timestamps = spins(200)
+    extractor = OnlineFeatureExtractor()
+    for i, (n, ts) in enumerate(zip(numbers, timestamps)):
+        extractor.update('even' if i % 2 == 0 else 'odd', n, ts, provider_id=3, table_id=5)
+
+    expected = batch_features(preprocessor, numbers[1::2], timestamps[1::2])
+    np.testing.assert_allclose(extractor.latest('odd'), expected[-1], rtol=1e-6, atol=1e-5)
+
+def test_prepare_recent_data_matches_batch_last_row(preprocessor):
+    recent = [17, 4, 17, 0, 32, 17, 9, 9, 21, 4]
+    recent_df = preprocessor.prepare_recent_data(recent)
+    assert len(recent_df) == 1
+    assert list(recent_df.columns[:len(FEATURE_COLUMNS)]) == list(FEATURE_COLUMNS)
+
+    # Same synthetic timeline as prepare_recent_data, rebuilt for the batch path
+    end = datetime.now()
+    timestamps = [end - timedelta(seconds=30 * (len(recent) - i)) for i in range(len(recent))]
+    expected = batch_features(preprocessor, recent, timestamps)[-1]
+    row = frame_to_features(recent_df)[0]
+    # Skip minute/hour columns: the two timelines are built a moment apart
+    np.testing.assert_allclose(row[5:13], expected[5:13], rtol=1e-6, atol=1e-5)
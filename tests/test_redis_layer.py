@@ -0,0 +1,66 @@
+import asyncio
+import json
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from src.connectivity.redis_layer import RedisLayer
+from src.connectivity.sync_protocol import make_cursor, read_batches_async
+
+@pytest.fixture
+def layer():
+    return RedisLayer(client=fakeredis.aioredis.FakeRedis(), cache_ttl=60)
+
+def test_device_roundtrip_and_cache(layer):
+    async def run():
+        await layer.put_device("d1", {
+            "device_id": "d1",
+            "info": {"device_type": "mobile", "capabilities": ["sync"]},
+            "last_seen": "2024-03-03T12:00:00"
+        })
+        device = await layer.get_device("d1")
+        assert device["info"]["device_type"] == "mobile"
+        assert device["last_seen"] == "2024-03-03T12:00:00"
+
+        # Served from the cache until the device is written through the layer
+        await layer.redis.hset("device:d1", "last_seen", "changed")
+        assert (await layer.get_device("d1"))["last_seen"] == "2024-03-03T12:00:00"
+        await layer.put_device("d1", {"last_seen": "2024-03-04T08:00:00"})
+        assert (await layer.get_device("d1"))["last_seen"] == "2024-03-04T08:00:00"
+        assert await layer.get_device("missing") is None
+    asyncio.run(run())
+
+def test_pipelined_devices(layer):
+    async def run():
+        for i in range(5):
+            await layer.put_device(f"d{i}", {"device_id": f"d{i}", "last_seen": "old"})
+        await layer.get_device("d0")
+        await layer.touch_devices({f"d{i}": "new" for i in range(3)})
+        devices = await layer.get_devices([f"d{i}" for i in range(5)] + ["missing"])
+        assert [devices[f"d{i}"]["last_seen"] for i in range(5)] == ["new"] * 3 + ["old"] * 2
+        assert devices["missing"] is None
+    asyncio.run(run())
+
+def test_sync_batches_resume_across_equal_scores(layer):
+    async def run():
+        entries = [("d1", "spins", {"number": i % 37, "seq": i}, float(i // 4)) for i in range(50)]
+        assert await layer.add_sync_entries(entries) == 50
+
+        async def fetch(score, offset, count):
+            return await layer.sync_range("d1", "spins", score, offset, count)
+
+        received, cursor, has_more = [], make_cursor(0), True
+        while has_more:
+            async for batch, cursor, has_more in read_batches_async(fetch, cursor, 7, 20):
+                received.extend(json.loads(entry)["seq"] for entry in batch)
+        assert sorted(received) == list(range(50))
+        assert len(received) == 50
+    asyncio.run(run())
+
+def test_released_keys_can_be_claimed_again(layer):
+    async def run():
+        assert await layer.claim_keys("d1", ["a", "b"], 60) == [True, True]
+        assert await layer.claim_keys("d1", ["a", "b", "c"], 60) == [False, False, True]
+        await layer.release_keys("d1", ["b", "c"])
+        assert await layer.claim_keys("d1", ["a", "b", "c"], 60) == [False, True, True]
+    asyncio.run(run())